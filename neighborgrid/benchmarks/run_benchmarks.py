@@ -0,0 +1,188 @@
+"""
+Benchmark harness for dispatch, pool matching and data generation
+
+Times the engine entry points over a grid of community sizes and horizons
+and writes the results as JSON so runs can be compared between releases.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from neighborgrid.src import __version__
+from neighborgrid.src.simulator import make_single_home_timeseries, make_community_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single, run_dispatch_batch, compute_summary_stats
+from neighborgrid.src.kernels import resolve_backend
+from neighborgrid.src.run_multi import simulate_community_pool
+from neighborgrid.src.config import ALLOCATION_PRO_RATA
+
+DEFAULT_HOMES = [10, 100, 1000]
+DEFAULT_HOURS = [24, 24 * 7, 24 * 365]
+START_DATE = "2025-01-01"
+
+
+def _time_call(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'best_s': min(timings),
+        'mean_s': sum(timings) / len(timings),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def benchmark_size(n_homes: int, hours: int, repeat: int, seed: int = 0) -> List[dict]:
+    """
+    Benchmark every engine function for one community size.
+    
+    Args:
+        n_homes: Number of homes
+        hours: Number of hours
+        repeat: Timed repetitions per function (best and mean are reported)
+        seed: Seed for the synthetic inputs
+    
+    Returns:
+        List of result records
+    """
+    rng = np.random.default_rng(seed)
+    solar_kw = rng.uniform(3.0, 9.0, size=n_homes)
+    battery_kwh = rng.uniform(5.0, 14.0, size=n_homes)
+    shifts = rng.integers(0, 4, size=n_homes)
+    
+    def generate_per_home():
+        return [
+            make_single_home_timeseries(START_DATE, hours, solar_kw[i], load_pattern_shift=int(shifts[i]), seed=i)
+            for i in range(n_homes)
+        ]
+    
+    timeseries = generate_per_home()
+    
+    def dispatch_per_home():
+        results = []
+        for i, ts in enumerate(timeseries):
+            result = run_dispatch_single(ts, battery_kwh[i], solar_kw[i], pool_availability_kwh=[0] * hours)
+            result['home_id'] = f"H{i + 1:05d}"
+            results.append(result)
+        return results
+    
+    dispatch_results = dispatch_per_home()
+    _, pv, load = make_community_timeseries(START_DATE, hours, solar_kw, load_pattern_shift=shifts, seed=seed)
+    
+    cases = [
+        ('make_single_home_timeseries', generate_per_home),
+        ('make_community_timeseries', lambda: make_community_timeseries(
+            START_DATE, hours, solar_kw, load_pattern_shift=shifts, seed=seed)),
+        ('run_dispatch_single', dispatch_per_home),
+        ('run_dispatch_batch', lambda: run_dispatch_batch(pv, load, battery_kwh, pool_availability_kwh=0.0)),
+        ('simulate_community_pool', lambda: simulate_community_pool(dispatch_results, START_DATE, hours)),
+        ('simulate_community_pool_pro_rata', lambda: simulate_community_pool(
+            dispatch_results, START_DATE, hours, allocation=ALLOCATION_PRO_RATA)),
+        ('compute_summary_stats', lambda: [compute_summary_stats(df) for df in dispatch_results]),
+    ]
+    
+    records = []
+    for name, func in cases:
+        record = {'benchmark': name, 'homes': n_homes, 'hours': hours, 'repeat': repeat}
+        record.update(_time_call(func, repeat))
+        records.append(record)
+        print(f"  {name:<30} {n_homes:>6} homes x {hours:>5} h  best {record['best_s']:>9.4f} s")
+    return records
+
+
+def run_benchmarks(homes: List[int], hours: List[int], repeat: int = 3) -> dict:
+    """
+    Run the benchmark grid.
+    
+    Args:
+        homes: Community sizes to benchmark
+        hours: Horizons to benchmark
+        repeat: Timed repetitions per function
+    
+    Returns:
+        Dictionary with run metadata and a list of result records
+    """
+    results = []
+    for n_homes in homes:
+        for n_hours in hours:
+            results.extend(benchmark_size(n_homes, n_hours, repeat))
+    
+    return {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'neighborgrid_version': __version__,
+            'git_commit': _git_commit(),
+            'dispatch_backend': resolve_backend(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="NeighborGrid engine benchmarks"
+    )
+    parser.add_argument(
+        "--homes",
+        type=_int_list,
+        default=DEFAULT_HOMES,
+        help="Comma-separated community sizes (default: 10,100,1000)",
+    )
+    parser.add_argument(
+        "--hours",
+        type=_int_list,
+        default=DEFAULT_HOURS,
+        help="Comma-separated horizons in hours (default: 24,168,8760)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed repetitions per benchmark (default: 3)",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default="bench_results.json",
+        help="Output JSON filepath (default: bench_results.json)",
+    )
+    
+    args = parser.parse_args()
+    
+    print(f"\nNeighborGrid — Benchmarks")
+    print(f"Homes: {args.homes}  |  Hours: {args.hours}  |  Repeat: {args.repeat}")
+    
+    report = run_benchmarks(args.homes, args.hours, args.repeat)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to: {args.out}\n")
+
+
+if __name__ == "__main__":
+    main()
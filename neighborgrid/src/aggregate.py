@@ -0,0 +1,198 @@
+"""
+Vectorized rollups of dispatch results per home, day, hour of day and community
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from neighborgrid.src.config import FAIR_RATE_PER_KWH
+
+# Summed columns in every rollup
+SUM_COLUMNS = [
+    'pv_production_kwh',
+    'load_consumption_kwh',
+    'self_consumption_kwh',
+    'to_pool_kwh',
+    'from_pool_kwh',
+    'grid_import_kwh',
+    'grid_export_kwh',
+    'credits_delta_kwh',
+    'pool_earnings_usd',
+    'pool_payments_usd',
+    'net_pool_usd',
+]
+
+# Rollup levels returned by compute_rollups
+LEVEL_HOME = 'home'
+LEVEL_DAY = 'day'
+LEVEL_HOME_DAY = 'home_day'
+LEVEL_HOUR_OF_DAY = 'hour_of_day'
+LEVEL_COMMUNITY = 'community'
+
+
+def compute_rollups(
+    dispatch_df: pd.DataFrame,
+    fair_rate_per_kwh: float = FAIR_RATE_PER_KWH,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Roll up dispatch results at several levels in one group-by pass.
+    
+    Rows are binned once into a dense (home_id, date, hour_of_day) array;
+    every level is then a sum over its axes rather than a new group-by.
+    Each level carries the SUM_COLUMNS plus:
+    
+    - self_sufficiency_pct: share of load not imported from the grid
+    - self_consumption_pct: share of PV used directly by its own home
+    - pool_share_pct: share of load met by the community pool
+    
+    Self-consumption is PV used directly (min of PV and load in each step);
+    grid export is surplus that neither the battery nor the pool took.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+            (any number of homes, hourly or sub-hourly)
+        fair_rate_per_kwh: Price of pool energy in $/kWh
+    
+    Returns:
+        Dictionary of DataFrames keyed by level: 'home' (index home_id),
+        'day' (date), 'home_day' (home_id, date), 'hour_of_day' (0-23,
+        community totals) and 'community' (one row)
+    """
+    # Parse each distinct timestamp once; fleets repeat them for every home
+    timestamp_codes, unique_timestamps = pd.factorize(dispatch_df['timestamp_hour'])
+    unique_timestamps = pd.DatetimeIndex(pd.to_datetime(unique_timestamps))
+    pv = dispatch_df['pv_production_kwh'].to_numpy(dtype=float)
+    load = dispatch_df['load_consumption_kwh'].to_numpy(dtype=float)
+    to_pool = dispatch_df['to_pool_kwh'].to_numpy(dtype=float)
+    from_pool = dispatch_df['from_pool_kwh'].to_numpy(dtype=float)
+    grid_import = dispatch_df['grid_import_kwh'].to_numpy(dtype=float)
+    
+    values = {
+        'pv_production_kwh': pv,
+        'load_consumption_kwh': load,
+        'self_consumption_kwh': np.minimum(pv, load),
+        'to_pool_kwh': to_pool,
+        'from_pool_kwh': from_pool,
+        'grid_import_kwh': grid_import,
+        'grid_export_kwh': grid_export_kwh(dispatch_df),
+        'credits_delta_kwh': to_pool - from_pool,
+        'pool_earnings_usd': to_pool * fair_rate_per_kwh,
+        'pool_payments_usd': from_pool * fair_rate_per_kwh,
+        'net_pool_usd': (to_pool - from_pool) * fair_rate_per_kwh,
+    }
+    
+    # Single pass: bin every row into a dense (home, date, hour_of_day) cube
+    home_codes, home_ids = pd.factorize(dispatch_df['home_id'], sort=True)
+    dates, date_codes = np.unique(unique_timestamps.normalize(), return_inverse=True)
+    shape = (len(home_ids), len(dates), 24)
+    cell = np.ravel_multi_index(
+        (home_codes, date_codes[timestamp_codes], unique_timestamps.hour.to_numpy()[timestamp_codes]),
+        shape,
+    )
+    cube = np.stack(
+        [np.bincount(cell, weights=values[column], minlength=np.prod(shape)) for column in SUM_COLUMNS],
+        axis=-1,
+    ).reshape(shape + (len(SUM_COLUMNS),))
+    
+    home_index = pd.Index(home_ids, name='home_id')
+    date_index = pd.DatetimeIndex(dates, name='date')
+    rollups = {
+        LEVEL_HOME: pd.DataFrame(cube.sum(axis=(1, 2)), index=home_index, columns=SUM_COLUMNS),
+        LEVEL_DAY: pd.DataFrame(cube.sum(axis=(0, 2)), index=date_index, columns=SUM_COLUMNS),
+        LEVEL_HOME_DAY: pd.DataFrame(
+            cube.sum(axis=2).reshape(-1, len(SUM_COLUMNS)),
+            index=pd.MultiIndex.from_product([home_index, date_index]),
+            columns=SUM_COLUMNS,
+        ),
+        LEVEL_HOUR_OF_DAY: pd.DataFrame(
+            cube.sum(axis=(0, 1)), index=pd.RangeIndex(24, name='hour_of_day'), columns=SUM_COLUMNS
+        ),
+        LEVEL_COMMUNITY: pd.DataFrame(
+            cube.sum(axis=(0, 1, 2))[np.newaxis], index=pd.Index(['community'], name='level'), columns=SUM_COLUMNS
+        ),
+    }
+    return {level: _with_ratios(frame) for level, frame in rollups.items()}
+
+
+def grid_export_kwh(dispatch_df: pd.DataFrame) -> np.ndarray:
+    """
+    Surplus per row that went to neither the battery, the load nor the pool.
+    
+    Derived from the energy balance, so it works for any policy's output.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+    
+    Returns:
+        Array of exported kWh per row (never negative)
+    """
+    supply = (
+        dispatch_df['pv_production_kwh'].to_numpy(dtype=float)
+        + dispatch_df['from_pool_kwh'].to_numpy(dtype=float)
+        + dispatch_df['grid_import_kwh'].to_numpy(dtype=float)
+    )
+    demand = (
+        dispatch_df['load_consumption_kwh'].to_numpy(dtype=float)
+        + dispatch_df['battery_flow_kwh'].to_numpy(dtype=float)
+        + dispatch_df['to_pool_kwh'].to_numpy(dtype=float)
+    )
+    return np.maximum(supply - demand, 0.0)
+
+
+def _with_ratios(totals: pd.DataFrame) -> pd.DataFrame:
+    load = totals['load_consumption_kwh'].where(totals['load_consumption_kwh'] > 0)
+    pv = totals['pv_production_kwh'].where(totals['pv_production_kwh'] > 0)
+    return totals.assign(
+        self_sufficiency_pct=(1.0 - totals['grid_import_kwh'] / load) * 100,
+        self_consumption_pct=totals['self_consumption_kwh'] / pv * 100,
+        pool_share_pct=totals['from_pool_kwh'] / load * 100,
+    )
+
+
+def daily_rollups(rollups: Dict[str, pd.DataFrame]) -> List[dict]:
+    """
+    Convert rollups into records shaped like the simulator's DailyRollup.
+    
+    The Python engine has no supply limit, so unserved_kwh is always 0.
+    
+    Args:
+        rollups: Output of compute_rollups
+    
+    Returns:
+        List of dictionaries, one per day, with community totals and a
+        per-home breakdown
+    """
+    day = rollups[LEVEL_DAY]
+    home_day = rollups[LEVEL_HOME_DAY].reset_index()
+    homes_by_date = {date: group for date, group in home_day.groupby('date', sort=False)}
+    
+    records = []
+    for date, totals in day.iterrows():
+        homes = homes_by_date[date]
+        records.append({
+            'date': pd.Timestamp(date).strftime('%Y-%m-%d'),
+            'production_kwh': float(totals['pv_production_kwh']),
+            'microgrid_used_kwh': float(totals['from_pool_kwh']),
+            'grid_import_kwh': float(totals['grid_import_kwh']),
+            'grid_export_kwh': float(totals['grid_export_kwh']),
+            'unserved_kwh': 0.0,
+            'homes': [
+                {
+                    'id': home_id,
+                    'produced_kwh': float(produced),
+                    'consumed_kwh': float(consumed),
+                    'shared_kwh': float(shared),
+                    'received_kwh': float(received),
+                    'credits_net_kwh': float(credits),
+                }
+                for home_id, produced, consumed, shared, received, credits in zip(
+                    homes['home_id'],
+                    homes['pv_production_kwh'],
+                    homes['load_consumption_kwh'],
+                    homes['to_pool_kwh'],
+                    homes['from_pool_kwh'],
+                    homes['credits_delta_kwh'],
+                )
+            ],
+        })
+    return records
@@ -0,0 +1,180 @@
+"""
+Content-addressed on-disk cache for simulation results
+"""
+
+import glob
+import hashlib
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from typing import Callable, Optional, Tuple
+from neighborgrid.src import __version__
+from neighborgrid.src import config
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+ENTRY_SUFFIX = '.pkl'
+
+# Environment-driven settings that do not change results
+UNKEYED_CONFIG = {'DISPATCH_BACKEND'}
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """
+    Version string covering the package version and its source files.
+    
+    Any edit to the engine's source gives a new version, so cached results
+    are never reused across code changes, committed or not.
+    
+    Returns:
+        "<__version__>-<hash of neighborgrid/src/*.py>"
+    """
+    digest = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(src_dir, '*.py'))):
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return f"{__version__}-{digest.hexdigest()[:12]}"
+
+
+def config_constants() -> dict:
+    """
+    Model constants from config.py that feed into the cache key.
+    
+    Returns:
+        Dictionary of upper-case config names to values
+    """
+    return {
+        name: getattr(config, name)
+        for name in sorted(dir(config))
+        if name.isupper() and name not in UNKEYED_CONFIG
+    }
+
+
+def cache_key(kind: str, **inputs) -> str:
+    """
+    Content hash of a simulation's inputs.
+    
+    Args:
+        kind: Entry point name, e.g. "run_multi"
+        **inputs: JSON-serializable inputs (home configs, seed, dates, ...)
+    
+    Returns:
+        Hex SHA-256 key
+    """
+    payload = {
+        'kind': kind,
+        'inputs': inputs,
+        'config': config_constants(),
+        'code_version': code_version(),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_json_default).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of result DataFrames in a directory.
+    
+    Each entry is one pickled DataFrame named by its cache_key. A hit
+    refreshes the entry's modification time, and writes evict the least
+    recently used entries until the directory fits in max_bytes.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory for entries (created if missing)
+            max_bytes: Total size above which old entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Look up a result.
+        
+        Args:
+            key: Key from cache_key
+        
+        Returns:
+            Cached DataFrame, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            result = pd.read_pickle(path)
+        except (FileNotFoundError, EOFError):
+            self.misses += 1
+            return None
+        os.utime(path)  # Mark as recently used
+        self.hits += 1
+        return result
+    
+    def put(self, key: str, result: pd.DataFrame) -> None:
+        """
+        Store a result and evict old entries if over the size limit.
+        
+        Args:
+            key: Key from cache_key
+            result: DataFrame to store
+        """
+        path = self._path(key)
+        partial_path = path + '.partial'
+        result.to_pickle(partial_path)
+        os.replace(partial_path, path)
+        self.evict()
+    
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, bool]:
+        """
+        Return the cached result for key, computing and storing it on a miss.
+        
+        Args:
+            key: Key from cache_key
+            compute: Function producing the result
+        
+        Returns:
+            Tuple of (result, whether it came from the cache)
+        """
+        result = self.get(key)
+        if result is not None:
+            return result, True
+        result = compute()
+        self.put(key, result)
+        return result, False
+    
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, '*' + ENTRY_SUFFIX)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # Removed by a concurrent run
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,245 @@
+"""
+Multi-resolution, downsampled chart data for the dashboard
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+# Resolutions written for every home and the community, with their bucket rule
+RESOLUTIONS = {'hourly': 'h', 'daily': 'D', 'weekly': 'W'}
+
+# Energy columns are summed per bucket; state of charge is averaged
+SUM_METRICS = [
+    'pv_production_kwh',
+    'load_consumption_kwh',
+    'to_pool_kwh',
+    'from_pool_kwh',
+    'grid_import_kwh',
+]
+MEAN_METRICS = ['battery_soc_pct']
+
+CHART_MAX_POINTS = 1000
+CHART_DECIMALS = 3
+
+
+def _bucket_starts(timestamps: pd.DatetimeIndex, resolution: str) -> pd.DatetimeIndex:
+    rule = RESOLUTIONS[resolution]
+    if rule == 'W':
+        return timestamps.to_period('W').start_time  # Weeks start on Monday
+    return timestamps.floor(rule)
+
+
+def _dense_metrics(dispatch_df: pd.DataFrame) -> Tuple[pd.DatetimeIndex, np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    # Lay every metric out as a (ticks, homes) array of per-tick totals
+    tick_codes, ticks = pd.factorize(dispatch_df['timestamp_hour'], sort=True)
+    home_codes, home_ids = pd.factorize(dispatch_df['home_id'], sort=True)
+    shape = (len(ticks), len(home_ids))
+    cell = tick_codes * len(home_ids) + home_codes
+    counts = np.bincount(cell, minlength=np.prod(shape)).reshape(shape)
+    totals = {
+        metric: np.bincount(
+            cell, weights=dispatch_df[metric].to_numpy(dtype=float), minlength=np.prod(shape)
+        ).reshape(shape)
+        for metric in SUM_METRICS + MEAN_METRICS
+    }
+    return pd.DatetimeIndex(pd.to_datetime(ticks)), np.asarray(home_ids), totals, counts
+
+
+def _resample(
+    ticks: pd.DatetimeIndex,
+    totals: Dict[str, np.ndarray],
+    counts: np.ndarray,
+    resolution: str,
+) -> Tuple[pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution {resolution!r}; expected one of {sorted(RESOLUTIONS)}")
+    
+    # Ticks are sorted, so each bucket is a contiguous run of rows
+    bucket_starts = _bucket_starts(ticks, resolution)
+    first = np.flatnonzero(np.r_[True, bucket_starts[1:] != bucket_starts[:-1]])
+    bucket_counts = np.add.reduceat(counts, first, axis=0)
+    
+    metrics = {}
+    for metric, values in totals.items():
+        summed = np.add.reduceat(values, first, axis=0)
+        if metric in MEAN_METRICS:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                summed = np.where(bucket_counts > 0, summed / bucket_counts, np.nan)
+        metrics[metric] = summed
+    return bucket_starts[first], metrics
+
+
+def resample_dispatch(
+    dispatch_df: pd.DataFrame,
+    resolution: str,
+) -> Tuple[pd.DatetimeIndex, np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Aggregate dispatch results per home into hourly, daily or weekly buckets.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        resolution: One of RESOLUTIONS ('hourly', 'daily', 'weekly')
+    
+    Returns:
+        Tuple of (bucket start times, home_ids, dict of metric to an array
+        of shape (buckets, homes))
+    """
+    ticks, home_ids, totals, counts = _dense_metrics(dispatch_df)
+    times, metrics = _resample(ticks, totals, counts, resolution)
+    return times, home_ids, metrics
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling of evenly spaced series.
+    
+    Keeps the first and last points and, from each of n_out - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the next bucket's average. All series are
+    processed together, one bucket at a time.
+    
+    Args:
+        y: Array of shape (series, points)
+        n_out: Points to keep per series (>= 3)
+    
+    Returns:
+        Integer array of shape (series, min(n_out, points)) of kept indices
+    """
+    n_series, n = y.shape
+    if n <= n_out:
+        return np.broadcast_to(np.arange(n), (n_series, n)).copy()
+    if n_out < 3:
+        raise ValueError("n_out must be at least 3")
+    
+    # Bucket edges over the interior points, then the last point as a final bucket
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    x = np.arange(n, dtype=float)
+    rows = np.arange(n_series)
+    
+    kept = np.empty((n_series, n_out), dtype=np.int64)
+    kept[:, 0] = 0
+    kept[:, -1] = n - 1
+    previous = np.zeros(n_series, dtype=np.int64)
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        next_x = x[edges[b + 1]:edges[b + 2]].mean()
+        next_y = y[:, edges[b + 1]:edges[b + 2]].mean(axis=1)
+        
+        prev_x = x[previous]
+        prev_y = y[rows, previous]
+        area = np.abs(
+            (prev_x - next_x)[:, None] * (y[:, start:end] - prev_y[:, None])
+            - (prev_x[:, None] - x[start:end]) * (next_y - prev_y)[:, None]
+        )
+        previous = start + np.argmax(area, axis=1)
+        kept[:, b + 1] = previous
+    return kept
+
+
+def _series_block(
+    times: pd.DatetimeIndex,
+    values: np.ndarray,
+    max_points: int,
+) -> List[dict]:
+    # values: (buckets, series) -> one {"t", "v"} chart series per column
+    finite = np.nan_to_num(values.T)
+    kept = lttb_indices(finite, max_points)
+    epoch_seconds = times.asi8 // 10 ** _unit_exponent(times)
+    return [
+        {
+            't': epoch_seconds[idx].tolist(),
+            'v': np.round(finite[s, idx], CHART_DECIMALS).tolist(),
+        }
+        for s, idx in enumerate(kept)
+    ]
+
+
+def _unit_exponent(times: pd.DatetimeIndex) -> int:
+    # Digits below one second in the index's datetime64 unit
+    return {'s': 0, 'ms': 3, 'us': 6, 'ns': 9}[np.datetime_data(times.values.dtype)[0]]
+
+
+def build_chart_data(
+    dispatch_df: pd.DataFrame,
+    max_points: int = CHART_MAX_POINTS,
+) -> Tuple[dict, Dict[str, dict]]:
+    """
+    Build capped chart series at every resolution for the community and each home.
+    
+    Each series is {"t": [unix seconds], "v": [values]} with at most
+    max_points points; longer series are LTTB-downsampled. Community values
+    are sums over homes (mean for state of charge).
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        max_points: Maximum points per series
+    
+    Returns:
+        Tuple of (community charts, dict of home_id to home charts), each
+        shaped {resolution: {metric: series}}
+    """
+    ticks, home_ids, totals, counts = _dense_metrics(dispatch_df)
+    community: dict = {}
+    homes: Dict[str, dict] = {}
+    for resolution in RESOLUTIONS:
+        times, metrics = _resample(ticks, totals, counts, resolution)
+        community[resolution] = {}
+        for metric, values in metrics.items():
+            if metric in MEAN_METRICS:
+                total = np.nanmean(values, axis=1, keepdims=True)
+            else:
+                total = values.sum(axis=1, keepdims=True)
+            community[resolution][metric] = _series_block(times, total, max_points)[0]
+            
+            for home_id, series in zip(home_ids, _series_block(times, values, max_points)):
+                homes.setdefault(home_id, {}).setdefault(resolution, {})[metric] = series
+    return community, homes
+
+
+def write_chart_data(
+    dispatch_df: pd.DataFrame,
+    out_dir: str,
+    max_points: int = CHART_MAX_POINTS,
+) -> List[str]:
+    """
+    Write compact chart JSON so the dashboard never loads the full timeseries.
+    
+    Layout:
+        index.json          homes, time range, resolutions, metrics
+        community.json      community charts
+        homes/<home>.json   one file per home, fetched on demand
+    
+    File sizes depend only on max_points, not on the simulated period.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        out_dir: Output directory (created if missing)
+        max_points: Maximum points per series
+    
+    Returns:
+        List of written file paths
+    """
+    community, homes = build_chart_data(dispatch_df, max_points=max_points)
+    hourly_times = community['hourly']['pv_production_kwh']['t']
+    index = {
+        'homes': sorted(homes),
+        'start': pd.Timestamp(hourly_times[0], unit='s').isoformat(),
+        'end': pd.Timestamp(hourly_times[-1], unit='s').isoformat(),
+        'resolutions': list(RESOLUTIONS),
+        'metrics': SUM_METRICS + MEAN_METRICS,
+        'max_points': max_points,
+    }
+    
+    os.makedirs(os.path.join(out_dir, 'homes'), exist_ok=True)
+    written = []
+    files = [('index.json', index), ('community.json', community)]
+    files += [(os.path.join('homes', f'{home_id}.json'), charts) for home_id, charts in homes.items()]
+    for name, payload in files:
+        path = os.path.join(out_dir, name)
+        with open(path, 'w') as f:
+            f.write(json.dumps(payload, separators=(',', ':')))  # dumps uses the C encoder
+        written.append(path)
+    return written
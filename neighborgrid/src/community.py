@@ -0,0 +1,228 @@
+"""
+Incremental community simulation state for rolling operations
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from neighborgrid.src.config import (
+    BATTERY_MIN_SOC,
+    BATTERY_MAX_SOC,
+    DEFAULT_TIMESTEP_MINUTES,
+    ALLOCATION_GREEDY,
+)
+from neighborgrid.src.dispatch import run_dispatch_batch, batch_to_dataframe
+from neighborgrid.src.ledger import PoolLedger
+from neighborgrid.src.pool import apply_community_pool
+from neighborgrid.src.simulator import timestep_hours
+
+
+class CommunityState:
+    """
+    Persistent per-home battery SOC and credit balance for a community.
+    
+    Each call to advance() dispatches and pool-matches only the new steps,
+    starting from the stored state, so adding an hour costs O(homes)
+    regardless of how much history has already been simulated. Advancing
+    hour by hour gives the same rows as simulating the whole horizon at once
+    with run_dispatch_single and simulate_community_pool.
+    """
+    
+    def __init__(
+        self,
+        home_ids: List[str],
+        solar_capacity_kw,
+        battery_capacity_kwh,
+        start_date: str,
+        initial_soc=0.5,
+        backend: Optional[str] = None,
+        timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+        ledger: Optional[PoolLedger] = None,
+        allocation: str = ALLOCATION_GREEDY,
+    ):
+        """
+        Args:
+            home_ids: Home IDs in the community
+            solar_capacity_kw: Solar capacity per home (scalar or one per home)
+            battery_capacity_kwh: Battery capacity per home (scalar or one per home)
+            start_date: Timestamp of the first hour
+            initial_soc: Initial SOC per home as fraction 0-1 (scalar or one per home)
+            backend: Dispatch kernel backend (None = config default)
+            timestep_minutes: Length of each step in minutes
+            ledger: Append every advance's pool allocations to this ledger
+                (saved separately with PoolLedger.save)
+            allocation: Pool allocation, 'greedy' or 'pro_rata'
+        """
+        n_homes = len(home_ids)
+        # Pool matching works on homes sorted by ID, so keep state in that order
+        self._order = np.argsort(np.asarray(home_ids, dtype=object), kind='stable')
+        self.home_ids = [home_ids[i] for i in self._order]
+        self.solar_capacity_kw = np.broadcast_to(
+            np.asarray(solar_capacity_kw, dtype=float), (n_homes,))[self._order]
+        self.battery_capacity_kwh = np.broadcast_to(
+            np.asarray(battery_capacity_kwh, dtype=float), (n_homes,))[self._order]
+        self.soc = np.clip(
+            np.broadcast_to(np.asarray(initial_soc, dtype=float), (n_homes,))[self._order],
+            BATTERY_MIN_SOC,
+            BATTERY_MAX_SOC,
+        )
+        self.credits_kwh = np.zeros(n_homes)
+        self.start = pd.Timestamp(start_date)
+        self.steps_simulated = 0
+        self.backend = backend
+        self.timestep_minutes = timestep_minutes
+        self.ledger = ledger
+        self.allocation = allocation
+    
+    @classmethod
+    def from_homes(cls, homes: list, start_date: str, **kwargs) -> "CommunityState":
+        """
+        Build state for homes in run_multi.COMMUNITY_HOMES format.
+        
+        Args:
+            homes: List of tuples in COMMUNITY_HOMES format
+            start_date: Timestamp of the first hour
+            **kwargs: Passed to CommunityState
+        
+        Returns:
+            New CommunityState
+        """
+        return cls(
+            home_ids=[home[0] for home in homes],
+            solar_capacity_kw=[home[1] for home in homes],
+            battery_capacity_kwh=[home[2] for home in homes],
+            start_date=start_date,
+            **kwargs,
+        )
+    
+    @property
+    def next_timestamp(self) -> pd.Timestamp:
+        return self.start + pd.Timedelta(minutes=self.steps_simulated * self.timestep_minutes)
+    
+    def advance(self, pv_production_kwh: np.ndarray, load_consumption_kwh: np.ndarray) -> pd.DataFrame:
+        """
+        Dispatch and pool-match the next steps.
+        
+        Args:
+            pv_production_kwh: Array of shape (homes, new_steps) in the order of
+                the home_ids passed to the constructor
+            load_consumption_kwh: Array of shape (homes, new_steps), same order
+        
+        Returns:
+            DataFrame with community results for the new steps, in the
+            simulate_community_pool row order (step by step, homes sorted by ID)
+        """
+        pv = np.atleast_2d(np.asarray(pv_production_kwh, dtype=float))[self._order]
+        load = np.atleast_2d(np.asarray(load_consumption_kwh, dtype=float))[self._order]
+        new_hours = pv.shape[1]
+        timestamps = pd.date_range(
+            self.next_timestamp, periods=new_hours, freq=pd.Timedelta(minutes=self.timestep_minutes)
+        )
+        
+        # Individual dispatch (no community pool yet), resuming from stored SOC
+        batch = run_dispatch_batch(
+            pv,
+            load,
+            self.battery_capacity_kwh,
+            initial_soc=self.soc,
+            pool_availability_kwh=0.0,
+            backend=self.backend,
+            clip_initial_soc=False,
+            timestep_minutes=self.timestep_minutes,
+        )
+        individual = batch_to_dataframe(
+            batch,
+            timestamps=timestamps.to_numpy(),
+            home_ids=self.home_ids,
+            pv_production_kwh=pv,
+            load_consumption_kwh=load,
+            battery_capacity_kwh=self.battery_capacity_kwh,
+            solar_capacity_kw=self.solar_capacity_kw,
+            pool_availability_kwh=0.0,
+            timestep_minutes=self.timestep_minutes,
+        )
+        
+        # Community pool for the new hours only, on top of the stored credits,
+        # on hour-major rows (row = hour * n_homes + home)
+        result = individual.sort_values(['timestamp_hour', 'home_id']).reset_index(drop=True)
+        shape = (new_hours, len(self.home_ids))
+        
+        def as_matrix(column):
+            return result[column].to_numpy(dtype=float).reshape(shape)
+        
+        ledger_step = 0
+        if self.ledger is not None:
+            ledger_step = self.ledger.step_offset(
+                self.home_ids, timestamps[0], self.timestep_minutes, self.allocation
+            )
+        pooled = apply_community_pool(
+            as_matrix('pv_production_kwh'),
+            as_matrix('load_consumption_kwh'),
+            as_matrix('battery_flow_kwh'),
+            as_matrix('grid_import_kwh'),
+            self.credits_kwh,
+            timestep_hours(self.timestep_minutes),
+            self.allocation,
+            self.ledger,
+            ledger_step,
+        )
+        for column, values in pooled.items():
+            result[column] = values.ravel()
+        
+        self.soc = batch['final_soc']
+        self.credits_kwh = pooled['credits_balance_kwh'][-1].copy()
+        self.steps_simulated += new_hours
+        return result
+    
+    def save(self, filepath: str) -> None:
+        """
+        Save the state to an .npz file.
+        
+        Args:
+            filepath: Output file path
+        """
+        # Store per-home values in the caller's home order
+        def input_order(values):
+            unsorted = np.empty_like(values)
+            unsorted[self._order] = values
+            return unsorted
+        
+        np.savez(
+            filepath,
+            home_ids=input_order(np.asarray(self.home_ids, dtype=str)),
+            solar_capacity_kw=input_order(self.solar_capacity_kw),
+            battery_capacity_kwh=input_order(self.battery_capacity_kwh),
+            soc=input_order(self.soc),
+            credits_kwh=input_order(self.credits_kwh),
+            start=np.asarray(self.start.isoformat()),
+            steps_simulated=np.asarray(self.steps_simulated),
+            timestep_minutes=np.asarray(self.timestep_minutes),
+            allocation=np.asarray(self.allocation),
+        )
+    
+    @classmethod
+    def load(cls, filepath: str, backend: Optional[str] = None) -> "CommunityState":
+        """
+        Load state saved with save().
+        
+        Args:
+            filepath: Input .npz file
+            backend: Dispatch kernel backend (None = config default)
+        
+        Returns:
+            CommunityState ready to advance from where it was saved
+        """
+        with np.load(filepath) as data:
+            state = cls(
+                home_ids=data['home_ids'].tolist(),
+                solar_capacity_kw=data['solar_capacity_kw'],
+                battery_capacity_kwh=data['battery_capacity_kwh'],
+                start_date=str(data['start']),
+                backend=backend,
+                timestep_minutes=int(data['timestep_minutes']),
+                allocation=str(data['allocation']),
+            )
+            state.soc = data['soc'][state._order]
+            state.credits_kwh = data['credits_kwh'][state._order]
+            state.steps_simulated = int(data['steps_simulated'])
+        return state
@@ -2,6 +2,8 @@
 Configuration constants for NeighborGrid dispatch algorithm
 """
 
+import os
+
 # Battery parameters
 BATTERY_MIN_SOC = 0.20  # 20% minimum state of charge
 BATTERY_MAX_SOC = 0.95  # 95% maximum state of charge
@@ -9,13 +11,27 @@ BATTERY_EFFICIENCY = 0.95  # Round-trip efficiency
 
 # Pool sharing parameters
 FAIR_RATE_PER_KWH = 0.18  # $0.18/kWh for credit transactions
+POOL_MATCH_THRESHOLD_KWH = 0.01  # Smallest surplus/deficit that joins pool matching
+POOL_EXHAUSTED_KWH = 0.001  # Remaining amount treated as fully allocated
+
+# Pool allocation modes (how matched surplus is split between consumers)
+ALLOCATION_GREEDY = "greedy"  # Largest producer to largest consumer, hour by hour
+ALLOCATION_PRO_RATA = "pro_rata"  # Shares proportional to deficit ('need_based' in allocation_policies)
 
 # Policy modes
 POLICY_SELF_FIRST = "self_first"
 POLICY_COMMUNITY_FIRST = "community_first"
+POLICY_OPTIMAL = "optimal"  # LP dispatch (neighborgrid.src.optimize)
+
+# Rolling-horizon LP dispatch
+OPTIMIZE_HORIZON_HOURS = 48  # Hours of lookahead in each LP window
+OPTIMIZE_STEP_HOURS = 24  # Hours committed before the window rolls forward
 
 # Default simulation parameters
 DEFAULT_SOLAR_KW = 6.0
 DEFAULT_BATTERY_KWH = 10.0
 DEFAULT_HOURS = 24
+DEFAULT_TIMESTEP_MINUTES = 60  # Simulation step; energy columns are kWh per step
 
+# Dispatch kernel backend: "auto" (Numba if installed), "numba" or "python"
+DISPATCH_BACKEND = os.environ.get("NEIGHBORGRID_DISPATCH_BACKEND", "auto")
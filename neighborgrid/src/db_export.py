@@ -0,0 +1,501 @@
+"""
+Bulk export of dispatch results into the Supabase tick/rollup/ledger tables
+"""
+
+import io
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, Optional, Tuple
+from neighborgrid.src.aggregate import compute_rollups, grid_export_kwh, LEVEL_DAY, LEVEL_HOME_DAY
+from neighborgrid.src.config import DEFAULT_TIMESTEP_MINUTES
+from neighborgrid.src.ledger import PoolLedger
+
+try:
+    import psycopg2
+    import psycopg2.pool
+except ImportError:  # Postgres export is optional
+    psycopg2 = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # Falls back to pandas' slower CSV writer
+    pa = None
+
+# Columns written to each table, in the order of supabase/migrations
+TABLE_COLUMNS = {
+    'tick_state': [
+        'ts', 'microgrid_id', 'home_id', 'pv_w', 'load_w', 'soc_pct', 'sharing_w',
+        'receiving_w', 'grid_import_w', 'grid_export_w', 'credits_delta_wh',
+    ],
+    'tick_state_community': [
+        'ts', 'microgrid_id', 'production_w', 'microgrid_used_w', 'grid_import_w',
+        'grid_export_w', 'unserved_w',
+    ],
+    'rollup_daily_home': [
+        'day', 'microgrid_id', 'home_id', 'prod_wh', 'use_wh', 'mg_used_wh',
+        'grid_import_wh', 'grid_export_wh', 'credits_net_wh',
+    ],
+    'rollup_daily_community': [
+        'day', 'microgrid_id', 'prod_wh', 'mg_used_wh', 'grid_import_wh',
+        'grid_export_wh', 'unserved_wh',
+    ],
+    'pool_ledger': ['ts', 'microgrid_id', 'from_home', 'to_home', 'kwh'],
+}
+
+# Stand-in schema for SQLite (same columns and keys, without the foreign keys)
+SQLITE_SCHEMA = """
+create table if not exists tick_state (
+  ts text not null, microgrid_id text not null, home_id text not null,
+  pv_w integer not null, load_w integer not null, soc_pct integer not null,
+  sharing_w integer not null, receiving_w integer not null,
+  grid_import_w integer not null, grid_export_w integer not null,
+  credits_delta_wh integer not null,
+  primary key (ts, home_id, microgrid_id)
+);
+create table if not exists tick_state_community (
+  ts text not null, microgrid_id text not null, production_w integer not null,
+  microgrid_used_w integer not null, grid_import_w integer not null,
+  grid_export_w integer not null, unserved_w integer not null default 0,
+  primary key (ts, microgrid_id)
+);
+create table if not exists rollup_daily_home (
+  day text not null, microgrid_id text not null, home_id text not null,
+  prod_wh integer not null, use_wh integer not null, mg_used_wh integer not null,
+  grid_import_wh integer not null, grid_export_wh integer not null,
+  credits_net_wh integer not null,
+  primary key (day, home_id, microgrid_id)
+);
+create table if not exists rollup_daily_community (
+  day text not null, microgrid_id text not null, prod_wh integer not null,
+  mg_used_wh integer not null, grid_import_wh integer not null,
+  grid_export_wh integer not null, unserved_wh integer not null,
+  primary key (day, microgrid_id)
+);
+create table if not exists pool_ledger (
+  id integer primary key autoincrement, ts text not null, microgrid_id text not null,
+  from_home text not null, to_home text not null, kwh integer not null
+);
+"""
+
+EXPORT_BATCH_ROWS = 200_000
+
+
+def _require_psycopg2() -> None:
+    if psycopg2 is None:
+        raise ImportError("Postgres export requires psycopg2 (pip install psycopg2-binary)")
+
+
+def _encode_csv(frame: pd.DataFrame) -> io.BytesIO:
+    buffer = io.BytesIO()
+    if pa is not None:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        pa_csv.write_csv(table, buffer, pa_csv.WriteOptions(include_header=False))
+    else:
+        frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    return buffer
+
+
+def _as_int(values: np.ndarray) -> np.ndarray:
+    return np.rint(values).astype(np.int64)
+
+
+def _format_timestamps(timestamps: pd.Series, timezone: str) -> np.ndarray:
+    # Format each distinct timestamp once; fleets repeat them for every home
+    codes, unique = pd.factorize(timestamps)
+    unique = pd.DatetimeIndex(pd.to_datetime(unique))
+    if unique.tz is None:
+        unique = unique.tz_localize(timezone)
+    return unique.strftime('%Y-%m-%d %H:%M:%S%z').to_numpy()[codes]
+
+
+def tick_state_frame(
+    dispatch_df: pd.DataFrame,
+    microgrid_id: str,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    timezone: str = 'UTC',
+) -> pd.DataFrame:
+    """
+    Convert dispatch rows into tick_state rows.
+    
+    Energy per step becomes average power in W (identical numbers for
+    hourly steps); credits stay energy in Wh.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        microgrid_id: Microgrid UUID the homes belong to
+        timestep_minutes: Length of each dispatch step
+        timezone: Zone for naive timestamps
+    
+    Returns:
+        DataFrame with TABLE_COLUMNS['tick_state']
+    """
+    to_w = 1000.0 * 60 / timestep_minutes
+    to_pool = dispatch_df['to_pool_kwh'].to_numpy(dtype=float)
+    from_pool = dispatch_df['from_pool_kwh'].to_numpy(dtype=float)
+    return pd.DataFrame({
+        'ts': _format_timestamps(dispatch_df['timestamp_hour'], timezone),
+        'microgrid_id': microgrid_id,
+        'home_id': dispatch_df['home_id'].to_numpy(),
+        'pv_w': _as_int(dispatch_df['pv_production_kwh'].to_numpy(dtype=float) * to_w),
+        'load_w': _as_int(dispatch_df['load_consumption_kwh'].to_numpy(dtype=float) * to_w),
+        'soc_pct': _as_int(np.clip(dispatch_df['battery_soc_pct'].to_numpy(dtype=float), 0, 100)),
+        'sharing_w': _as_int(to_pool * to_w),
+        'receiving_w': _as_int(from_pool * to_w),
+        'grid_import_w': _as_int(dispatch_df['grid_import_kwh'].to_numpy(dtype=float) * to_w),
+        'grid_export_w': _as_int(grid_export_kwh(dispatch_df) * to_w),
+        'credits_delta_wh': _as_int((to_pool - from_pool) * 1000),
+    })
+
+
+def tick_state_community_frame(
+    dispatch_df: pd.DataFrame,
+    microgrid_id: str,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    timezone: str = 'UTC',
+) -> pd.DataFrame:
+    """
+    Sum dispatch rows per timestamp into tick_state_community rows.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        microgrid_id: Microgrid UUID the homes belong to
+        timestep_minutes: Length of each dispatch step
+        timezone: Zone for naive timestamps
+    
+    Returns:
+        DataFrame with TABLE_COLUMNS['tick_state_community']
+    """
+    to_w = 1000.0 * 60 / timestep_minutes
+    codes, timestamps = pd.factorize(dispatch_df['timestamp_hour'], sort=True)
+    
+    def per_tick(values: np.ndarray) -> np.ndarray:
+        return _as_int(np.bincount(codes, weights=values, minlength=len(timestamps)) * to_w)
+    
+    return pd.DataFrame({
+        'ts': _format_timestamps(pd.Series(timestamps), timezone),
+        'microgrid_id': microgrid_id,
+        'production_w': per_tick(dispatch_df['pv_production_kwh'].to_numpy(dtype=float)),
+        'microgrid_used_w': per_tick(dispatch_df['from_pool_kwh'].to_numpy(dtype=float)),
+        'grid_import_w': per_tick(dispatch_df['grid_import_kwh'].to_numpy(dtype=float)),
+        'grid_export_w': per_tick(grid_export_kwh(dispatch_df)),
+        'unserved_w': 0,
+    })
+
+
+def rollup_frames(rollups: Dict[str, pd.DataFrame], microgrid_id: str) -> Dict[str, pd.DataFrame]:
+    """
+    Convert compute_rollups output into rollup_daily_home/community rows.
+    
+    The Python engine has no supply limit, so unserved_wh is always 0.
+    
+    Args:
+        rollups: Output of aggregate.compute_rollups
+        microgrid_id: Microgrid UUID the homes belong to
+    
+    Returns:
+        Dictionary of table name to DataFrame
+    """
+    home_day = rollups[LEVEL_HOME_DAY].reset_index()
+    day = rollups[LEVEL_DAY].reset_index()
+    
+    def wh(frame: pd.DataFrame, column: str) -> np.ndarray:
+        return _as_int(frame[column].to_numpy(dtype=float) * 1000)
+    
+    return {
+        'rollup_daily_home': pd.DataFrame({
+            'day': home_day['date'].dt.strftime('%Y-%m-%d'),
+            'microgrid_id': microgrid_id,
+            'home_id': home_day['home_id'],
+            'prod_wh': wh(home_day, 'pv_production_kwh'),
+            'use_wh': wh(home_day, 'load_consumption_kwh'),
+            'mg_used_wh': wh(home_day, 'from_pool_kwh'),
+            'grid_import_wh': wh(home_day, 'grid_import_kwh'),
+            'grid_export_wh': wh(home_day, 'grid_export_kwh'),
+            'credits_net_wh': wh(home_day, 'credits_delta_kwh'),
+        }),
+        'rollup_daily_community': pd.DataFrame({
+            'day': day['date'].dt.strftime('%Y-%m-%d'),
+            'microgrid_id': microgrid_id,
+            'prod_wh': wh(day, 'pv_production_kwh'),
+            'mg_used_wh': wh(day, 'from_pool_kwh'),
+            'grid_import_wh': wh(day, 'grid_import_kwh'),
+            'grid_export_wh': wh(day, 'grid_export_kwh'),
+            'unserved_wh': 0,
+        }),
+    }
+
+
+def _recorded_daily_pairs(ledger: PoolLedger) -> pd.DataFrame:
+    # Recorded allocations summed per (day, from, to) by the ledger itself
+    days, senders, receivers, kwh = [], [], [], []
+    for day, sender, receiver, flows in ledger.period_pairs('D'):
+        flows = _as_int(flows)
+        keep = flows != 0
+        days.append(np.full(keep.sum(), day))
+        senders.append(sender[keep])
+        receivers.append(receiver[keep])
+        kwh.append(flows[keep])
+    home_ids = np.asarray(ledger.home_ids, dtype=object)
+    return pd.DataFrame({
+        'day': pd.DatetimeIndex(np.concatenate(days)),
+        'from_home': home_ids[np.concatenate(senders)],
+        'to_home': home_ids[np.concatenate(receivers)],
+        'kwh': np.concatenate(kwh),
+    })
+
+
+def pool_ledger_frame(
+    dispatch_df: pd.DataFrame,
+    microgrid_id: str,
+    timezone: str = 'UTC',
+    ledger: Optional[PoolLedger] = None,
+) -> pd.DataFrame:
+    """
+    Attribute pool flows to sender/receiver pairs as daily ledger rows.
+    
+    With a recorded PoolLedger the pairs are the actual allocations.
+    Otherwise, within each step, matched energy is split pro rata: every
+    sender supplies each receiver in proportion to its share of the step's
+    pool deposits. The schema stores whole kWh, so pairs are summed per day
+    before rounding; pairs that round to 0 kWh and a home's flows to itself
+    are dropped.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        microgrid_id: Microgrid UUID the homes belong to
+        timezone: Zone for naive timestamps
+        ledger: Allocations recorded while simulating dispatch_df
+    
+    Returns:
+        DataFrame with TABLE_COLUMNS['pool_ledger'], ts at the start of the day
+    """
+    if ledger is not None and len(ledger):
+        return _ledger_rows(_recorded_daily_pairs(ledger), microgrid_id, timezone)
+    
+    tick_codes, ticks = pd.factorize(dispatch_df['timestamp_hour'], sort=True)
+    home_codes, home_ids = pd.factorize(dispatch_df['home_id'], sort=True)
+    cell = tick_codes * len(home_ids) + home_codes
+    shape = (len(ticks), len(home_ids))
+    sent = np.bincount(
+        cell, weights=dispatch_df['to_pool_kwh'].to_numpy(dtype=float), minlength=np.prod(shape)
+    ).reshape(shape)
+    received = np.bincount(
+        cell, weights=dispatch_df['from_pool_kwh'].to_numpy(dtype=float), minlength=np.prod(shape)
+    ).reshape(shape)
+    
+    total_sent = sent.sum(axis=1, keepdims=True)
+    total_received = received.sum(axis=1, keepdims=True)
+    matched = np.minimum(total_sent, total_received)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sender_share = np.where(total_sent > 0, sent / total_sent, 0.0)
+        receiver_share = np.where(total_received > 0, received * matched / total_received, 0.0)
+    
+    days = pd.DatetimeIndex(pd.to_datetime(ticks)).normalize()
+    unique_days, day_codes = np.unique(days, return_inverse=True)
+    parts = []
+    for d, day in enumerate(unique_days):
+        in_day = day_codes == d
+        senders = np.flatnonzero(sent[in_day].sum(axis=0) > 0)
+        receivers = np.flatnonzero(received[in_day].sum(axis=0) > 0)
+        if len(senders) == 0 or len(receivers) == 0:
+            continue
+        # flows[i, j]: kWh from senders[i] to receivers[j] over the day
+        flows = sender_share[in_day][:, senders].T @ receiver_share[in_day][:, receivers]
+        kwh = _as_int(flows)
+        i, j = np.nonzero(kwh)
+        keep = senders[i] != receivers[j]
+        parts.append(pd.DataFrame({
+            'day': day,
+            'from_home': home_ids[senders[i[keep]]],
+            'to_home': home_ids[receivers[j[keep]]],
+            'kwh': kwh[i[keep], j[keep]],
+        }))
+    
+    pairs = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        {'day': pd.Series(dtype='datetime64[ns]'), 'from_home': [], 'to_home': [], 'kwh': pd.Series(dtype=np.int64)}
+    )
+    return _ledger_rows(pairs, microgrid_id, timezone)
+
+
+def _ledger_rows(pairs: pd.DataFrame, microgrid_id: str, timezone: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        'ts': _format_timestamps(pairs['day'], timezone),
+        'microgrid_id': microgrid_id,
+        'from_home': pairs['from_home'],
+        'to_home': pairs['to_home'],
+        'kwh': pairs['kwh'],
+    })
+
+
+def iter_table_batches(
+    dispatch_df: pd.DataFrame,
+    microgrid_id: str,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+    timezone: str = 'UTC',
+    ledger: Optional[PoolLedger] = None,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Yield (table, rows) batches for every table.
+    
+    tick_state is converted one slice of batch_rows dispatch rows at a
+    time, so only one batch of output rows is held in memory.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        microgrid_id: Microgrid UUID the homes belong to
+        timestep_minutes: Length of each dispatch step
+        batch_rows: Maximum rows per yielded batch
+        timezone: Zone for naive timestamps
+        ledger: Recorded pool allocations for pool_ledger (None = pro rata)
+    
+    Yields:
+        Tuples of (table name, DataFrame in TABLE_COLUMNS order)
+    """
+    for start in range(0, len(dispatch_df), batch_rows):
+        chunk = dispatch_df.iloc[start:start + batch_rows]
+        yield 'tick_state', tick_state_frame(chunk, microgrid_id, timestep_minutes, timezone)
+    
+    yield 'tick_state_community', tick_state_community_frame(
+        dispatch_df, microgrid_id, timestep_minutes, timezone
+    )
+    for table, frame in rollup_frames(compute_rollups(dispatch_df), microgrid_id).items():
+        yield table, frame
+    yield 'pool_ledger', pool_ledger_frame(dispatch_df, microgrid_id, timezone, ledger)
+
+
+class PostgresLoader:
+    """
+    Loads batches with COPY FROM STDIN over a pool of connections.
+    
+    Each batch is copied and committed on its own pooled connection, so up
+    to max_connections batches load concurrently.
+    """
+    
+    def __init__(self, dsn: str, max_connections: int = 4):
+        """
+        Args:
+            dsn: libpq connection string, e.g. "postgresql://user@host/db"
+            max_connections: Pool size (and number of concurrent COPYs)
+        """
+        _require_psycopg2()
+        self.max_workers = max_connections
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, max_connections, dsn)
+    
+    def copy(self, table: str, frame: pd.DataFrame) -> None:
+        """
+        COPY one batch into a table.
+        
+        Args:
+            table: Table name from TABLE_COLUMNS
+            frame: Rows in TABLE_COLUMNS[table] order
+        """
+        buffer = _encode_csv(frame)
+        columns = ', '.join(TABLE_COLUMNS[table])
+        
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+    
+    def close(self) -> None:
+        self.pool.closeall()
+
+
+class SQLiteLoader:
+    """
+    Local stand-in for PostgresLoader backed by an SQLite file.
+    
+    Creates the tables if needed and inserts each batch with executemany;
+    everything is committed on close.
+    """
+    
+    max_workers = 1  # One connection; sqlite3 objects are not shared across threads
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file (or ":memory:")
+        """
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SQLITE_SCHEMA)
+    
+    def copy(self, table: str, frame: pd.DataFrame) -> None:
+        """
+        Insert one batch into a table.
+        
+        Args:
+            table: Table name from TABLE_COLUMNS
+            frame: Rows in TABLE_COLUMNS[table] order
+        """
+        columns = TABLE_COLUMNS[table]
+        placeholders = ', '.join('?' * len(columns))
+        rows = zip(*(frame[column].tolist() for column in columns))
+        self.conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+    
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def export_results(
+    dispatch_df: pd.DataFrame,
+    loader,
+    microgrid_id: str,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+    timezone: str = 'UTC',
+    ledger: Optional[PoolLedger] = None,
+) -> Dict[str, int]:
+    """
+    Export dispatch results into all five tables.
+    
+    Batches are converted on the calling thread while up to
+    loader.max_workers earlier batches are being copied. The tables are
+    expected to be empty for this microgrid and time range (COPY does not
+    upsert), and the microgrids/homes rows the foreign keys point at must
+    already exist.
+    
+    Args:
+        dispatch_df: Results in the run_dispatch_single / run_multi schema
+        loader: PostgresLoader or SQLiteLoader
+        microgrid_id: Microgrid UUID the homes belong to
+        timestep_minutes: Length of each dispatch step
+        batch_rows: Maximum rows per COPY
+        timezone: Zone for naive timestamps
+        ledger: Recorded pool allocations for pool_ledger (None = pro rata)
+    
+    Returns:
+        Dictionary of table name to rows written
+    """
+    counts = {table: 0 for table in TABLE_COLUMNS}
+    batches = iter_table_batches(dispatch_df, microgrid_id, timestep_minutes, batch_rows, timezone, ledger)
+    
+    if loader.max_workers <= 1:
+        for table, frame in batches:
+            loader.copy(table, frame)
+            counts[table] += len(frame)
+        return counts
+    
+    with ThreadPoolExecutor(max_workers=loader.max_workers) as executor:
+        pending = []
+        for table, frame in batches:
+            pending.append(executor.submit(loader.copy, table, frame))
+            counts[table] += len(frame)
+            if len(pending) >= loader.max_workers:  # Bound batches held in memory
+                pending.pop(0).result()
+        for future in pending:
+            future.result()
+    return counts
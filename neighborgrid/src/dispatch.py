@@ -2,13 +2,25 @@
 Core dispatch algorithm for single-home energy management
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
 from neighborgrid.src.config import (
     BATTERY_MIN_SOC,
     BATTERY_MAX_SOC,
     BATTERY_EFFICIENCY,
     POLICY_SELF_FIRST,
+    POLICY_COMMUNITY_FIRST,
+    DEFAULT_TIMESTEP_MINUTES,
+)
+from neighborgrid.src.results import DispatchResult
+from neighborgrid.src.kernels import (
+    BACKEND_NUMBA,
+    battery_step_limit,
+    dispatch_series,
+    dispatch_fleet_compiled,
+    resolve_backend,
 )
 
 
@@ -19,9 +31,15 @@ def run_dispatch_single(
     initial_soc: float = 0.5,
     pool_availability_kwh: list = None,
     policy_mode: str = POLICY_SELF_FIRST,
-) -> pd.DataFrame:
+    backend: Optional[str] = None,
+    as_frame: bool = True,
+    battery_power_kw: Optional[float] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> Union[pd.DataFrame, DispatchResult]:
     """
-    Run hour-by-hour dispatch for a single home with battery and pool sharing.
+    Run step-by-step dispatch for a single home with battery and pool sharing.
+    
+    All energies are kWh per step (per hour at the default 60-minute step).
     
     Dispatch logic (self_first mode):
     1. Solar covers load first
@@ -37,89 +55,435 @@ def run_dispatch_single(
         solar_capacity_kw: Solar capacity in kW (for metadata)
         initial_soc: Initial battery state of charge (0.0-1.0)
         pool_availability_kwh: List of available kWh from pool per hour (None = unlimited)
-        policy_mode: Dispatch policy (currently only 'self_first' implemented)
+        policy_mode: Dispatch policy. Only 'self_first' applies to a single
+            home; community_first needs the whole community (use
+            run_dispatch_batch)
+        backend: Kernel backend "auto", "numba" or "python" (None = config default)
+        as_frame: Return a rounded DataFrame; False returns the unrounded
+            DispatchResult arrays instead
+        battery_power_kw: Battery charge/discharge power limit in kW (None = unlimited)
+        timestep_minutes: Step length of the timeseries, used to convert
+            battery_power_kw into kWh per step
     
     Returns:
-        DataFrame with dispatch results for each hour
+        DataFrame (or DispatchResult) with dispatch results for each step
     """
-    results = []
+    _check_single_home_policy(policy_mode)
+    hours = len(timeseries)
+    if pool_availability_kwh is None:
+        pool_availability_kwh = [999999.0] * hours  # Effectively unlimited
+    
+    pv = timeseries['pv_production_kwh'].to_numpy(dtype=float)
+    load = timeseries['load_consumption_kwh'].to_numpy(dtype=float)
+    pool_cap = np.asarray(pool_availability_kwh, dtype=float)[:hours]
+    if len(pool_cap) < hours:
+        raise ValueError("pool_availability_kwh is shorter than the timeseries")
+    
+    # The SOC recurrence is sequential, so it runs in a (possibly compiled) kernel
+    series = dispatch_series(
+        pv, load, pool_cap,
+        battery_capacity_kwh=battery_capacity_kwh,
+        initial_soc=max(BATTERY_MIN_SOC, min(BATTERY_MAX_SOC, initial_soc)),
+        backend=backend,
+        max_step_kwh=battery_step_limit(battery_power_kw, timestep_minutes),
+    )
+    
+    result = _series_to_result(
+        series, timeseries, pool_cap, battery_capacity_kwh, solar_capacity_kw, policy_mode,
+        timestep_minutes,
+    )
+    return result.to_dataframe() if as_frame else result
+
+
+def iter_dispatch_chunks(
+    chunks: Iterable[pd.DataFrame],
+    battery_capacity_kwh: float,
+    solar_capacity_kw: float,
+    initial_soc: float = 0.5,
+    pool_availability_kwh: Optional[Iterable[float]] = None,
+    policy_mode: str = POLICY_SELF_FIRST,
+    backend: Optional[str] = None,
+    as_frame: bool = True,
+    battery_power_kw: Optional[float] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> Iterator[Union[pd.DataFrame, DispatchResult]]:
+    """
+    Run dispatch over a timeseries delivered in chunks.
+    
+    Battery SOC and credit balance are carried across chunk boundaries, so
+    concatenating the yielded chunks gives the same result as running
+    run_dispatch_single on the whole timeseries. Only one chunk is held in
+    memory at a time, whatever the horizon.
+    
+    Args:
+        chunks: Iterable of DataFrames with columns [timestamp_hour, pv_production_kwh, load_consumption_kwh]
+        battery_capacity_kwh: Battery capacity in kWh
+        solar_capacity_kw: Solar capacity in kW (for metadata)
+        initial_soc: Initial battery state of charge (0.0-1.0)
+        pool_availability_kwh: Iterable of available kWh from pool per hour,
+            consumed as chunks arrive (None = unlimited)
+        policy_mode: Dispatch policy (only 'self_first', as for run_dispatch_single)
+        backend: Kernel backend "auto", "numba" or "python" (None = config default)
+        as_frame: Yield rounded DataFrames; False yields DispatchResult chunks
+        battery_power_kw: Battery charge/discharge power limit in kW (None = unlimited)
+        timestep_minutes: Step length of the timeseries
+    
+    Yields:
+        DataFrame (or DispatchResult) with dispatch results for each chunk
+    """
+    _check_single_home_policy(policy_mode)
+    max_step = battery_step_limit(battery_power_kw, timestep_minutes)
     soc = max(BATTERY_MIN_SOC, min(BATTERY_MAX_SOC, initial_soc))
     credits_balance = 0.0
+    pool_iter = None if pool_availability_kwh is None else iter(pool_availability_kwh)
     
-    hours = len(timeseries)
+    for timeseries in chunks:
+        hours = len(timeseries)
+        if hours == 0:
+            continue
+        if pool_iter is None:
+            pool_cap = np.full(hours, 999999.0)  # Effectively unlimited
+        else:
+            pool_cap = np.fromiter(islice(pool_iter, hours), dtype=float)
+            if len(pool_cap) < hours:
+                raise ValueError("pool_availability_kwh is shorter than the timeseries")
+        
+        series = dispatch_series(
+            timeseries['pv_production_kwh'].to_numpy(dtype=float),
+            timeseries['load_consumption_kwh'].to_numpy(dtype=float),
+            pool_cap,
+            battery_capacity_kwh=battery_capacity_kwh,
+            initial_soc=soc,
+            initial_credits_kwh=credits_balance,
+            backend=backend,
+            max_step_kwh=max_step,
+        )
+        soc = series['final_soc']
+        credits_balance = series['final_credits_kwh']
+        
+        result = _series_to_result(
+            series, timeseries, pool_cap, battery_capacity_kwh, solar_capacity_kw, policy_mode,
+            timestep_minutes,
+        )
+        yield result.to_dataframe() if as_frame else result
+
+
+def _check_single_home_policy(policy_mode: str) -> None:
+    if policy_mode != POLICY_SELF_FIRST:
+        raise ValueError(
+            f"Single-home dispatch only supports '{POLICY_SELF_FIRST}'; "
+            f"use run_dispatch_batch for '{policy_mode}'"
+        )
+
+
+def _series_to_result(
+    series: Dict[str, np.ndarray],
+    timeseries: pd.DataFrame,
+    pool_cap: np.ndarray,
+    battery_capacity_kwh: float,
+    solar_capacity_kw: float,
+    policy_mode: str,
+    timestep_minutes: int,
+) -> DispatchResult:
+    return DispatchResult.from_batch(
+        {key: np.atleast_2d(values) for key, values in series.items()},
+        timestamps=timeseries['timestamp_hour'].to_numpy(),
+        home_ids=['H001'],
+        pv_production_kwh=timeseries['pv_production_kwh'].to_numpy(dtype=float)[np.newaxis, :],
+        load_consumption_kwh=timeseries['load_consumption_kwh'].to_numpy(dtype=float)[np.newaxis, :],
+        battery_capacity_kwh=battery_capacity_kwh,
+        solar_capacity_kw=solar_capacity_kw,
+        pool_availability_kwh=pool_cap[np.newaxis, :],
+        policy_mode=policy_mode,
+        timestep_minutes=timestep_minutes,
+    )
+
+
+def run_dispatch_batch(
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    battery_capacity_kwh,
+    initial_soc=0.5,
+    pool_availability_kwh: Optional[np.ndarray] = None,
+    initial_credits_kwh=0.0,
+    backend: Optional[str] = None,
+    clip_initial_soc: bool = True,
+    policy_mode: str = POLICY_SELF_FIRST,
+    battery_power_kw=None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> Dict[str, np.ndarray]:
+    """
+    Run dispatch for many homes at once.
+    
+    Steps all homes together with one vector operation per hour. For
+    self_first the per-hour logic is the same as run_dispatch_single, so
+    each home's SOC, battery flow, pool and grid values match the scalar
+    version. community_first treats the homes as one community and shares
+    surplus between them before any battery charges (see
+    _dispatch_community_first).
+    
+    Args:
+        pv_production_kwh: Array of shape (homes, hours) with PV production
+        load_consumption_kwh: Array of shape (homes, hours) with load
+        battery_capacity_kwh: Battery capacity per home (scalar or shape (homes,))
+        initial_soc: Initial SOC per home as fraction 0-1 (scalar or shape (homes,))
+        pool_availability_kwh: Available kWh from pool, broadcastable to
+            (homes, hours) (None = unlimited)
+        initial_credits_kwh: Starting credit balance per home (scalar or shape (homes,))
+        backend: Kernel backend "auto", "numba" or "python" (None = config default).
+            The Numba backend runs the compiled per-home recurrence; the Python
+            backend steps all homes with NumPy.
+        clip_initial_soc: Clip initial_soc to the SOC limits. Pass False when
+            resuming from a previous batch's 'final_soc' so the carried state
+            is used unchanged.
+        policy_mode: 'self_first' or 'community_first'. community_first
+            always runs the NumPy path and ignores backend.
+        battery_power_kw: Battery power limit in kW (scalar or shape (homes,);
+            None = unlimited)
+        timestep_minutes: Step length of the arrays, used to convert
+            battery_power_kw into kWh per step
+    
+    Returns:
+        Dictionary of (homes, hours) arrays keyed by dispatch column name
+        (unrounded), plus 'final_soc' and 'final_credits_kwh' per home
+    """
+    pv = np.asarray(pv_production_kwh, dtype=float)
+    load = np.asarray(load_consumption_kwh, dtype=float)
+    if pv.ndim != 2 or pv.shape != load.shape:
+        raise ValueError(
+            f"PV and load must be 2-D arrays of the same shape, got {pv.shape} and {load.shape}"
+        )
+    n_homes, hours = pv.shape
+    
+    capacity = np.broadcast_to(np.asarray(battery_capacity_kwh, dtype=float), (n_homes,))
+    soc = np.array(np.broadcast_to(np.asarray(initial_soc, dtype=float), (n_homes,)))
+    if clip_initial_soc:
+        soc = np.clip(soc, BATTERY_MIN_SOC, BATTERY_MAX_SOC)
+    credits_balance = np.array(
+        np.broadcast_to(np.asarray(initial_credits_kwh, dtype=float), (n_homes,))
+    )
     if pool_availability_kwh is None:
-        pool_availability_kwh = [999999.0] * hours  # Effectively unlimited
+        pool_cap = np.full((n_homes, hours), 999999.0)  # Effectively unlimited
+    else:
+        pool_cap = np.broadcast_to(np.asarray(pool_availability_kwh, dtype=float), (n_homes, hours))
+    max_step = np.broadcast_to(battery_step_limit(battery_power_kw, timestep_minutes), (n_homes,))
+    
+    if policy_mode == POLICY_COMMUNITY_FIRST:
+        return _dispatch_community_first(pv, load, pool_cap, capacity, max_step, soc, credits_balance)
+    if policy_mode != POLICY_SELF_FIRST:
+        raise ValueError(f"Unknown policy_mode: {policy_mode}")
+    
+    if resolve_backend(backend) == BACKEND_NUMBA:
+        return dispatch_fleet_compiled(pv, load, pool_cap, capacity, soc, credits_balance, max_step)
     
-    for idx, row in timeseries.iterrows():
-        ts = row['timestamp_hour']
-        pv = row['pv_production_kwh']
-        load = row['load_consumption_kwh']
-        pool_cap = pool_availability_kwh[idx]
+    soc_out = np.empty((n_homes, hours))
+    battery_flow_out = np.empty((n_homes, hours))
+    to_pool_out = np.empty((n_homes, hours))
+    from_pool_out = np.empty((n_homes, hours))
+    grid_import_out = np.empty((n_homes, hours))
+    credits_balance_out = np.empty((n_homes, hours))
+    has_battery = capacity > 0
+    
+    for h in range(hours):
+        # Step 1: Solar covers load
+        net = pv[:, h] - load[:, h]
+        surplus = net > 0
+        
+        # Step 2: Charge battery with excess
+        max_charge = np.minimum((BATTERY_MAX_SOC - soc) * capacity / BATTERY_EFFICIENCY, max_step)
+        battery_charge = np.where(surplus, np.minimum(net, max_charge), 0.0)
+        
+        # Step 3: Send remaining excess to pool
+        to_pool = np.where(surplus, net - battery_charge, 0.0)
+        
+        # Step 4: Discharge battery to cover deficit
+        deficit = np.where(surplus, 0.0, -net)
+        max_discharge = np.minimum((soc - BATTERY_MIN_SOC) * capacity * BATTERY_EFFICIENCY, max_step)
+        battery_discharge = np.where(surplus, 0.0, np.minimum(deficit, max_discharge))
+        deficit = deficit - battery_discharge
+        
+        soc_gain = np.divide(
+            battery_charge * BATTERY_EFFICIENCY, capacity,
+            out=np.zeros(n_homes), where=has_battery,
+        )
+        soc_loss = np.divide(
+            battery_discharge, capacity * BATTERY_EFFICIENCY,
+            out=np.zeros(n_homes), where=has_battery,
+        )
+        soc = np.where(surplus, soc + soc_gain, soc - soc_loss)
         
-        # Initialize hour results
-        battery_flow = 0.0  # Positive = charging, negative = discharging
-        to_pool = 0.0
-        from_pool = 0.0
-        grid_import = 0.0
+        # Step 5: Draw from pool if still in deficit and have credits
+        in_deficit = deficit > 0
+        from_pool = np.where(
+            in_deficit,
+            np.minimum(np.minimum(deficit, pool_cap[:, h]), np.maximum(credits_balance, 0.0)),
+            0.0,
+        )
+        credits_balance = credits_balance + to_pool - from_pool
+        deficit = deficit - from_pool
         
+        # Step 6: Import from grid as last resort
+        grid_import = np.where(deficit > 0, deficit, 0.0)
+        
+        soc_out[:, h] = soc
+        battery_flow_out[:, h] = battery_charge - battery_discharge
+        to_pool_out[:, h] = to_pool
+        from_pool_out[:, h] = from_pool
+        grid_import_out[:, h] = grid_import
+        credits_balance_out[:, h] = credits_balance
+    
+    return {
+        'battery_soc_pct': soc_out * 100,
+        'battery_flow_kwh': battery_flow_out,
+        'to_pool_kwh': to_pool_out,
+        'from_pool_kwh': from_pool_out,
+        'grid_import_kwh': grid_import_out,
+        'credits_delta_kwh': to_pool_out - from_pool_out,
+        'credits_balance_kwh': credits_balance_out,
+        'final_soc': soc,
+        'final_credits_kwh': credits_balance,
+    }
+
+
+def _dispatch_community_first(
+    pv: np.ndarray,
+    load: np.ndarray,
+    pool_cap: np.ndarray,
+    capacity: np.ndarray,
+    max_step: np.ndarray,
+    soc: np.ndarray,
+    credits_balance: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Community-first dispatch for all homes of one community.
+    
+    Each hour:
+    1. Solar covers each home's own load
+    2. Surplus homes send excess to deficit homes through the pool. When
+       supply and demand differ, the scarce side is shared pro rata
+       (each home's demand is capped by its pool availability)
+    3. Surplus left after sharing charges the home's battery
+    4. Anything still left is exported to the grid (earning no credits)
+    5. Deficit left after sharing is covered by the home's battery
+    6. Then by grid import
+    
+    Only energy a neighbour receives counts as to_pool and earns credits,
+    so the pool balances every hour. Energy received is debited from the
+    credit balance even when that takes it below zero, so credits settle
+    between homes.
+    """
+    n_homes, hours = pv.shape
+    soc = soc.copy()
+    credits_balance = credits_balance.copy()
+    has_battery = capacity > 0
+    
+    soc_out = np.empty((n_homes, hours))
+    battery_flow_out = np.empty((n_homes, hours))
+    to_pool_out = np.empty((n_homes, hours))
+    from_pool_out = np.empty((n_homes, hours))
+    grid_import_out = np.empty((n_homes, hours))
+    credits_balance_out = np.empty((n_homes, hours))
+    
+    for h in range(hours):
         # Step 1: Solar covers load
-        net = pv - load
+        net = pv[:, h] - load[:, h]
+        excess = np.maximum(net, 0.0)
+        deficit = np.maximum(-net, 0.0)
         
-        if net > 0:
-            # Excess solar available
-            # Step 2: Charge battery with excess
-            max_charge = (BATTERY_MAX_SOC - soc) * battery_capacity_kwh / BATTERY_EFFICIENCY
-            battery_charge = min(net, max_charge)
-            battery_flow = battery_charge
-            soc += (battery_charge * BATTERY_EFFICIENCY) / battery_capacity_kwh
-            net -= battery_charge
-            
-            # Step 3: Send remaining excess to pool
-            if net > 0:
-                to_pool = net
-                credits_balance += to_pool
-        else:
-            # Solar insufficient, need more energy
-            deficit = -net
-            
-            # Step 4: Discharge battery to cover deficit
-            max_discharge = (soc - BATTERY_MIN_SOC) * battery_capacity_kwh * BATTERY_EFFICIENCY
-            battery_discharge = min(deficit, max_discharge)
-            battery_flow = -battery_discharge
-            soc -= battery_discharge / (battery_capacity_kwh * BATTERY_EFFICIENCY)
-            deficit -= battery_discharge
-            
-            # Step 5: Draw from pool if still in deficit and have credits
-            if deficit > 0:
-                from_pool_max = min(deficit, pool_cap, credits_balance if credits_balance > 0 else 0)
-                from_pool = from_pool_max
-                credits_balance -= from_pool
-                deficit -= from_pool
-            
-            # Step 6: Import from grid as last resort
-            if deficit > 0:
-                grid_import = deficit
+        # Step 2: Share surplus with neighbours' deficits, pro rata
+        demand = np.minimum(deficit, pool_cap[:, h])
+        total_excess = excess.sum()
+        total_demand = demand.sum()
+        shared = min(total_excess, total_demand)
+        sent = excess * (shared / total_excess) if total_excess > 0 else np.zeros(n_homes)
+        received = demand * (shared / total_demand) if total_demand > 0 else np.zeros(n_homes)
+        excess = excess - sent
+        deficit = deficit - received
+        
+        # Step 3: Charge battery with what is left
+        max_charge = np.minimum((BATTERY_MAX_SOC - soc) * capacity / BATTERY_EFFICIENCY, max_step)
+        battery_charge = np.minimum(excess, max_charge)
+        
+        # Step 4: Remaining excess is exported (implied by the energy balance)
+        to_pool = sent
         
-        # Record hour results
-        results.append({
-            'timestamp_hour': ts,
-            'home_id': 'H001',
-            'solar_capacity_kw': solar_capacity_kw,
-            'battery_capacity_kwh': battery_capacity_kwh,
-            'pv_production_kwh': round(pv, 2),
-            'load_consumption_kwh': round(load, 2),
-            'from_pool_cap_kwh': round(pool_cap, 2),
-            'battery_soc_pct': round(soc * 100, 1),
-            'battery_flow_kwh': round(battery_flow, 3),
-            'to_pool_kwh': round(to_pool, 3),
-            'from_pool_kwh': round(from_pool, 3),
-            'grid_import_kwh': round(grid_import, 3),
-            'credits_delta_kwh': round((to_pool - from_pool), 3),
-            'credits_balance_kwh': round(credits_balance, 3),
-            'policy_mode': policy_mode,
-        })
-    
-    return pd.DataFrame(results)
+        # Step 5: Discharge battery to cover the remaining deficit
+        max_discharge = np.minimum((soc - BATTERY_MIN_SOC) * capacity * BATTERY_EFFICIENCY, max_step)
+        battery_discharge = np.minimum(deficit, max_discharge)
+        deficit = deficit - battery_discharge
+        
+        soc_gain = np.divide(
+            battery_charge * BATTERY_EFFICIENCY, capacity,
+            out=np.zeros(n_homes), where=has_battery,
+        )
+        soc_loss = np.divide(
+            battery_discharge, capacity * BATTERY_EFFICIENCY,
+            out=np.zeros(n_homes), where=has_battery,
+        )
+        soc = soc + soc_gain - soc_loss
+        credits_balance = credits_balance + to_pool - received
+        
+        # Step 6: Import from grid as last resort
+        soc_out[:, h] = soc
+        battery_flow_out[:, h] = battery_charge - battery_discharge
+        to_pool_out[:, h] = to_pool
+        from_pool_out[:, h] = received
+        grid_import_out[:, h] = deficit
+        credits_balance_out[:, h] = credits_balance
+    
+    return {
+        'battery_soc_pct': soc_out * 100,
+        'battery_flow_kwh': battery_flow_out,
+        'to_pool_kwh': to_pool_out,
+        'from_pool_kwh': from_pool_out,
+        'grid_import_kwh': grid_import_out,
+        'credits_delta_kwh': to_pool_out - from_pool_out,
+        'credits_balance_kwh': credits_balance_out,
+        'final_soc': soc,
+        'final_credits_kwh': credits_balance,
+    }
+
+
+def batch_to_dataframe(
+    batch: Dict[str, np.ndarray],
+    timestamps,
+    home_ids: List[str],
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    battery_capacity_kwh,
+    solar_capacity_kw,
+    pool_availability_kwh: Optional[np.ndarray] = None,
+    policy_mode: str = POLICY_SELF_FIRST,
+    timestep_minutes: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Flatten run_dispatch_batch output into the run_dispatch_single schema.
+    
+    Shorthand for DispatchResult.from_batch(...).to_dataframe(): rows are
+    ordered home by home and values are rounded like run_dispatch_single.
+    
+    Args:
+        batch: Dictionary from run_dispatch_batch
+        timestamps: Sequence of hourly timestamps, length = hours
+        home_ids: Home ID for each row of the batch arrays
+        pv_production_kwh: Array of shape (homes, hours) passed to the batch
+        load_consumption_kwh: Array of shape (homes, hours) passed to the batch
+        battery_capacity_kwh: Battery capacity per home (scalar or shape (homes,))
+        solar_capacity_kw: Solar capacity per home (scalar or shape (homes,))
+        pool_availability_kwh: Pool availability passed to the batch (None = unlimited)
+        policy_mode: Dispatch policy recorded in the output
+        timestep_minutes: Step length (None = inferred from timestamps)
+    
+    Returns:
+        DataFrame with dispatch results for every home and hour
+    """
+    return DispatchResult.from_batch(
+        batch, timestamps, home_ids, pv_production_kwh, load_consumption_kwh,
+        battery_capacity_kwh, solar_capacity_kw,
+        pool_availability_kwh=pool_availability_kwh,
+        policy_mode=policy_mode,
+        timestep_minutes=timestep_minutes,
+    ).to_dataframe()
 
 
 def compute_summary_stats(dispatch_df: pd.DataFrame) -> Dict[str, Any]:
@@ -151,3 +515,36 @@ def compute_summary_stats(dispatch_df: pd.DataFrame) -> Dict[str, Any]:
         'final_credits_kwh': round(final_credits, 1),
     }
 
+
+def compute_summary_stats_batch(
+    batch: Dict[str, np.ndarray],
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Compute summary statistics for every home in a batch dispatch.
+    
+    Hourly values are rounded the same way as the dispatch output before
+    summing, so each home's statistics match compute_summary_stats on its
+    run_dispatch_single result.
+    
+    Args:
+        batch: Dictionary from run_dispatch_batch
+        pv_production_kwh: Array of shape (homes, hours) passed to the batch
+        load_consumption_kwh: Array of shape (homes, hours) passed to the batch
+    
+    Returns:
+        Dictionary of per-home arrays with the compute_summary_stats keys
+    """
+    def total(values, decimals):
+        return np.round(np.round(values, decimals).sum(axis=1), 1)
+    
+    return {
+        'total_pv_kwh': total(pv_production_kwh, 2),
+        'total_load_kwh': total(load_consumption_kwh, 2),
+        'total_to_pool_kwh': total(batch['to_pool_kwh'], 3),
+        'total_from_pool_kwh': total(batch['from_pool_kwh'], 3),
+        'total_grid_import_kwh': total(batch['grid_import_kwh'], 3),
+        'final_soc_pct': np.round(np.round(batch['battery_soc_pct'][:, -1], 1), 1),
+        'final_credits_kwh': np.round(np.round(batch['credits_balance_kwh'][:, -1], 3), 1),
+    }
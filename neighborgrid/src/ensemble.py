@@ -0,0 +1,210 @@
+"""
+Monte Carlo ensembles of community simulations with streaming statistics
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+from neighborgrid.src.run_multi import simulate_community
+
+# Per-home metrics reduced across replicas
+ENSEMBLE_METRICS = ['grid_import_kwh', 'from_pool_kwh', 'to_pool_kwh', 'final_credits_kwh']
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+
+class P2Quantile:
+    """
+    Streaming P-square quantile estimate for many series at once.
+    
+    Implements the P² algorithm (Jain & Chlamtac, 1985): five markers per
+    series track the minimum, maximum and target quantile, so memory is
+    constant in the number of observations. Each update takes one new
+    observation for every series.
+    """
+    
+    def __init__(self, quantile: float, n_series: int):
+        self.quantile = quantile
+        self.count = 0
+        self._buffer = np.empty((5, n_series))
+        self._heights = None
+        self._positions = None
+        self._desired = np.array([1.0, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5.0])
+        self._increments = np.array([0.0, quantile / 2, quantile, (1 + quantile) / 2, 1.0])
+    
+    def update(self, values: np.ndarray) -> None:
+        x = np.asarray(values, dtype=float)
+        if self.count < 5:
+            self._buffer[self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self._heights = np.sort(self._buffer, axis=0)
+                self._positions = np.tile(np.arange(1.0, 6.0)[:, np.newaxis], (1, x.shape[0]))
+            return
+        
+        q = self._heights
+        n = self._positions
+        self.count += 1
+        
+        # Extend the extremes and find the cell each observation falls in
+        q[0] = np.minimum(q[0], x)
+        q[4] = np.maximum(q[4], x)
+        cell = np.clip((x[np.newaxis, :] >= q[1:4]).sum(axis=0), 0, 3)
+        n += np.arange(5)[:, np.newaxis] > cell[np.newaxis, :]
+        self._desired = self._desired + self._increments
+        
+        # Adjust the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+            if not move.any():
+                continue
+            step = np.where(d >= 0, 1.0, -1.0)
+            parabolic = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+            )
+            neighbor = np.where(step > 0, q[i + 1], q[i - 1])
+            neighbor_pos = np.where(step > 0, n[i + 1], n[i - 1])
+            linear = q[i] + step * (neighbor - q[i]) / (neighbor_pos - n[i])
+            in_order = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+            q[i] = np.where(move, np.where(in_order, parabolic, linear), q[i])
+            n[i] = np.where(move, n[i] + step, n[i])
+    
+    def value(self) -> np.ndarray:
+        if self.count == 0:
+            raise ValueError("No observations")
+        if self.count < 5:
+            return np.quantile(self._buffer[:self.count], self.quantile, axis=0)
+        return self._heights[2].copy()
+
+
+class EnsembleAccumulator:
+    """
+    Reduce per-home replica metrics into streaming summary statistics.
+    
+    Keeps a running mean and P² quantile estimates per home and metric, so
+    memory does not depend on the number of replicas.
+    """
+    
+    def __init__(
+        self,
+        home_ids: List[str],
+        metrics: Sequence[str] = ENSEMBLE_METRICS,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ):
+        self.home_ids = list(home_ids)
+        self.metrics = list(metrics)
+        self.quantiles = list(quantiles)
+        self.count = 0
+        self._means = {metric: np.zeros(len(self.home_ids)) for metric in self.metrics}
+        self._estimators = {
+            metric: [P2Quantile(q, len(self.home_ids)) for q in self.quantiles]
+            for metric in self.metrics
+        }
+    
+    def update(self, replica: Dict[str, np.ndarray]) -> None:
+        self.count += 1
+        for metric in self.metrics:
+            values = np.asarray(replica[metric], dtype=float)
+            self._means[metric] += (values - self._means[metric]) / self.count
+            for estimator in self._estimators[metric]:
+                estimator.update(values)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns:
+            Tidy DataFrame with one row per home and metric: mean, one
+            column per quantile (p10, p50, ...) and the replica count
+        """
+        frames = []
+        for metric in self.metrics:
+            frame = pd.DataFrame({
+                'home_id': self.home_ids,
+                'metric': metric,
+                'mean': self._means[metric],
+            })
+            for estimator in self._estimators[metric]:
+                frame[f"p{round(estimator.quantile * 100):g}"] = estimator.value()
+            frames.append(frame)
+        result = pd.concat(frames, ignore_index=True)
+        result['replicas'] = self.count
+        return result
+
+
+def simulate_replica(homes: list, start_date: str, hours: int, seed: int) -> Dict[str, np.ndarray]:
+    """
+    Run one seeded community simulation and reduce it to per-home metrics.
+    
+    Args:
+        homes: List of tuples in COMMUNITY_HOMES format
+        start_date: Start date string
+        hours: Number of hours
+        seed: Replica seed
+    
+    Returns:
+        Dictionary of per-home arrays (homes sorted by ID) for each
+        ENSEMBLE_METRICS entry
+    """
+    result = simulate_community(homes, start_date, hours, seed=seed)
+    per_home = result.groupby('home_id', sort=True)
+    totals = per_home[['grid_import_kwh', 'from_pool_kwh', 'to_pool_kwh']].sum()
+    return {
+        'grid_import_kwh': totals['grid_import_kwh'].to_numpy(),
+        'from_pool_kwh': totals['from_pool_kwh'].to_numpy(),
+        'to_pool_kwh': totals['to_pool_kwh'].to_numpy(),
+        'final_credits_kwh': per_home['credits_balance_kwh'].last().to_numpy(),
+    }
+
+
+def run_ensemble(
+    homes: list,
+    start_date: str,
+    hours: int,
+    replicas: int,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+) -> pd.DataFrame:
+    """
+    Run seeded replicas of a community simulation and summarize them.
+    
+    Replicas are reduced in order as they finish, with at most a few per
+    worker in flight, so memory stays flat however many replicas are run
+    and results do not depend on the worker count.
+    
+    Args:
+        homes: List of tuples in COMMUNITY_HOMES format
+        start_date: Start date string
+        hours: Number of hours
+        replicas: Number of replicas (K)
+        seed: Ensemble seed; replica seeds are spawned from it (None = fresh entropy)
+        workers: Number of worker processes (1 = run in this process)
+        quantiles: Quantiles to estimate
+    
+    Returns:
+        DataFrame from EnsembleAccumulator.to_frame
+    """
+    home_ids = sorted(home[0] for home in homes)
+    accumulator = EnsembleAccumulator(home_ids, quantiles=quantiles)
+    root = np.random.SeedSequence(seed)
+    
+    def next_seed() -> int:
+        # Spawn children one at a time so no list of K seeds is held
+        return int(root.spawn(1)[0].generate_state(1, dtype=np.uint64)[0])
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for _ in range(replicas):
+                in_flight.append(executor.submit(simulate_replica, homes, start_date, hours, next_seed()))
+                if len(in_flight) >= 2 * workers:
+                    accumulator.update(in_flight.popleft().result())
+            while in_flight:
+                accumulator.update(in_flight.popleft().result())
+    else:
+        for _ in range(replicas):
+            accumulator.update(simulate_replica(homes, start_date, hours, next_seed()))
+    
+    return accumulator.to_frame()
@@ -2,7 +2,50 @@
 Input/output utilities for NeighborGrid
 """
 
+import hashlib
+import os
+import numpy as np
 import pandas as pd
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet support is optional
+    pa = None
+
+# Dispatch columns stored compactly in Parquet
+CATEGORICAL_COLUMNS = ['home_id', 'policy_mode']
+ENERGY_COLUMNS = [
+    'solar_capacity_kw',
+    'battery_capacity_kwh',
+    'pv_production_kwh',
+    'load_consumption_kwh',
+    'from_pool_cap_kwh',
+    'battery_soc_pct',
+    'battery_flow_kwh',
+    'to_pool_kwh',
+    'from_pool_kwh',
+    'grid_import_kwh',
+    'credits_delta_kwh',
+    'credits_balance_kwh',
+]
+
+# Meter tables: required long-format columns and optional per-home sizes
+METER_COLUMNS = ['timestamp_hour', 'home_id', 'pv_production_kwh', 'load_consumption_kwh']
+METER_SIZE_COLUMNS = ['solar_capacity_kw', 'battery_capacity_kwh']
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+METER_CACHE_VERSION = 1  # Bump when the cached array layout changes
+
+# Supported Parquet partition layouts
+PARTITION_DAY = 'day'
+PARTITION_HOME = 'home_id'
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet support requires pyarrow (pip install pyarrow)")
 
 
 def write_dispatch_csv(df: pd.DataFrame, filepath: str) -> None:
@@ -31,3 +74,352 @@ def read_dispatch_csv(filepath: str) -> pd.DataFrame:
     df['timestamp_hour'] = pd.to_datetime(df['timestamp_hour'])
     return df
 
+
+def read_timeseries_chunks(filepath: str, chunk_hours: int = 24 * 30) -> Iterator[pd.DataFrame]:
+    """
+    Read an hourly timeseries CSV in chunks.
+    
+    Args:
+        filepath: CSV with columns [timestamp_hour, pv_production_kwh, load_consumption_kwh]
+        chunk_hours: Number of rows per chunk
+    
+    Yields:
+        DataFrame chunks with parsed timestamps
+    """
+    for chunk in pd.read_csv(filepath, chunksize=chunk_hours):
+        chunk['timestamp_hour'] = pd.to_datetime(chunk['timestamp_hour'])
+        yield chunk
+
+
+class DispatchCsvWriter:
+    """
+    Append dispatch result chunks to a single CSV file.
+    
+    The header is written with the first chunk; later chunks are appended.
+    """
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.rows_written = 0
+    
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(
+            self.filepath,
+            mode='a' if self.rows_written else 'w',
+            header=not self.rows_written,
+            index=False,
+        )
+        self.rows_written += len(df)
+    
+    def close(self) -> None:
+        if not self.rows_written:
+            raise ValueError(f"No dispatch rows were written to {self.filepath}")
+        print(f"CSV written to: {self.filepath}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class DispatchParquetWriter:
+    """
+    Append dispatch result chunks to a single Parquet file.
+    
+    Each chunk becomes one row group with compact dtypes; the file schema
+    is taken from the first chunk.
+    """
+    
+    def __init__(self, path: str):
+        _require_pyarrow()
+        self.path = path
+        self.rows_written = 0
+        self._writer = None
+    
+    def write(self, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(to_compact_dtypes(df), preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema.remove_metadata())
+        self._writer.write_table(table.replace_schema_metadata(None))
+        self.rows_written += len(df)
+    
+    def close(self) -> None:
+        if self._writer is None:
+            raise ValueError(f"No dispatch rows were written to {self.path}")
+        self._writer.close()
+        print(f"Parquet written to: {self.path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+def to_compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert dispatch results to compact column types.
+    
+    home_id and policy_mode become categoricals, energy columns become
+    float32 and timestamp_hour becomes a native datetime column.
+    
+    Args:
+        df: DataFrame with dispatch results
+    
+    Returns:
+        New DataFrame with compact dtypes
+    """
+    df = df.copy()
+    if 'timestamp_hour' in df.columns:
+        df['timestamp_hour'] = pd.to_datetime(df['timestamp_hour'])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str).astype('category')
+    for column in ENERGY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('float32')
+    return df
+
+
+def write_dispatch_parquet(
+    df: pd.DataFrame,
+    path: str,
+    partition_by: Optional[str] = None,
+) -> None:
+    """
+    Write dispatch results to Parquet with compact dtypes.
+    
+    Args:
+        df: DataFrame with dispatch results
+        path: Output file path, or dataset directory when partitioned
+        partition_by: None for a single file, 'day' or 'home_id' for a
+            hive-partitioned dataset directory
+    """
+    _require_pyarrow()
+    df = to_compact_dtypes(df)
+    
+    if partition_by is None:
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+    elif partition_by in (PARTITION_DAY, PARTITION_HOME):
+        if partition_by == PARTITION_DAY:
+            df[PARTITION_DAY] = df['timestamp_hour'].dt.strftime('%Y-%m-%d')
+        else:
+            df[PARTITION_HOME] = df[PARTITION_HOME].astype(str)
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            root_path=path,
+            partition_cols=[partition_by],
+            existing_data_behavior='delete_matching',
+        )
+    else:
+        raise ValueError(f"Unknown partition_by: {partition_by!r}")
+    
+    print(f"Parquet written to: {path}")
+
+
+def read_dispatch_parquet(
+    path: str,
+    columns: Optional[List[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    home_ids: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read dispatch results from a Parquet file or partitioned dataset.
+    
+    Filters are pushed down to Parquet, so partitions and row groups
+    outside the requested homes and date range are skipped.
+    
+    Args:
+        path: Parquet file or dataset directory
+        columns: Columns to load (None = all dispatch columns)
+        start: Earliest timestamp to include (inclusive)
+        end: Latest timestamp to include (exclusive)
+        home_ids: Homes to include (None = all)
+    
+    Returns:
+        DataFrame with dispatch results
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    partitioned_by_day = PARTITION_DAY in dataset.schema.names
+    
+    filters = []
+    if start is not None:
+        start_ts = pd.Timestamp(start)
+        filters.append(ds.field('timestamp_hour') >= start_ts.to_pydatetime())
+        if partitioned_by_day:
+            filters.append(ds.field(PARTITION_DAY) >= start_ts.strftime('%Y-%m-%d'))
+    if end is not None:
+        end_ts = pd.Timestamp(end)
+        filters.append(ds.field('timestamp_hour') < end_ts.to_pydatetime())
+        if partitioned_by_day:
+            filters.append(ds.field(PARTITION_DAY) <= end_ts.strftime('%Y-%m-%d'))
+    if home_ids is not None:
+        filters.append(ds.field('home_id').isin([str(h) for h in home_ids]))
+    
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+    
+    if columns is None:
+        # Partition columns come last in the dataset schema; restore dispatch order
+        names = [name for name in dataset.schema.names if name != PARTITION_DAY or not partitioned_by_day]
+        ordered = ['timestamp_hour', 'home_id'] + ENERGY_COLUMNS + ['policy_mode']
+        columns = [name for name in ordered if name in names]
+        columns += [name for name in names if name not in columns]
+    table = dataset.to_table(columns=columns, filter=expression)
+    return to_compact_dtypes(table.to_pandas())
+
+
+def read_meter_table(filepath: str, sheet_name=0) -> pd.DataFrame:
+    """
+    Read a long-format meter table from an Excel workbook or CSV file.
+    
+    Args:
+        filepath: .xlsx/.xlsm/.xls workbook (needs openpyxl or xlrd) or CSV
+        sheet_name: Worksheet to read from workbooks
+    
+    Returns:
+        DataFrame with one row per home and hour
+    """
+    if filepath.lower().endswith(EXCEL_EXTENSIONS):
+        return pd.read_excel(filepath, sheet_name=sheet_name)
+    return pd.read_csv(filepath)
+
+
+def meter_table_to_arrays(
+    table: pd.DataFrame,
+    metadata: Optional[pd.DataFrame] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Reshape a long meter table into the engine's (homes, hours) layout.
+    
+    Homes are sorted by home_id and hours by timestamp. Every home must
+    have exactly one reading for every hour.
+    
+    Args:
+        table: DataFrame with columns [timestamp_hour, home_id,
+            pv_production_kwh, load_consumption_kwh], optionally with
+            solar_capacity_kw and battery_capacity_kwh per row
+        metadata: Optional per-home table with home_id and size columns,
+            which takes precedence over sizes found in the meter table
+    
+    Returns:
+        Dictionary with 'timestamps' (datetime64), 'home_ids',
+        'pv_production_kwh' and 'load_consumption_kwh' of shape
+        (homes, hours), and 'solar_capacity_kw' / 'battery_capacity_kwh'
+        per home (NaN where unknown)
+    """
+    missing = [column for column in METER_COLUMNS if column not in table.columns]
+    if missing:
+        raise ValueError(f"Meter table is missing columns: {missing}")
+    
+    home_ids, home_idx = np.unique(table['home_id'].to_numpy(dtype=str), return_inverse=True)
+    timestamps, hour_idx = np.unique(
+        pd.to_datetime(table['timestamp_hour']).to_numpy(dtype='datetime64[ns]'),
+        return_inverse=True,
+    )
+    shape = (len(home_ids), len(timestamps))
+    cell = home_idx * shape[1] + hour_idx
+    if len(np.unique(cell)) != len(cell):
+        raise ValueError("Meter table has more than one reading for some home and hour")
+    if len(cell) != shape[0] * shape[1]:
+        raise ValueError(
+            f"Meter table has {len(cell)} readings, expected {shape[0] * shape[1]} "
+            f"({shape[0]} homes x {shape[1]} hours)"
+        )
+    
+    arrays = {'timestamps': timestamps, 'home_ids': home_ids}
+    for column in ['pv_production_kwh', 'load_consumption_kwh']:
+        values = np.empty(shape)
+        values.ravel()[cell] = table[column].to_numpy(dtype=float)
+        arrays[column] = values
+    
+    sizes = table[['home_id'] + [c for c in METER_SIZE_COLUMNS if c in table.columns]]
+    sizes = sizes.assign(home_id=sizes['home_id'].astype(str)).drop_duplicates('home_id')
+    if metadata is not None:
+        metadata = metadata.assign(home_id=metadata['home_id'].astype(str))
+        sizes = metadata.set_index('home_id').combine_first(sizes.set_index('home_id')).reset_index()
+    sizes = sizes.set_index('home_id').reindex(home_ids)
+    for column in METER_SIZE_COLUMNS:
+        if column in sizes.columns:
+            arrays[column] = sizes[column].to_numpy(dtype=float)
+        else:
+            arrays[column] = np.full(len(home_ids), np.nan)
+    
+    return arrays
+
+
+def file_digest(filepath: str) -> str:
+    """
+    SHA-256 of a file's contents.
+    
+    Args:
+        filepath: File to hash
+    
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_meter_data(
+    filepath: str,
+    metadata_path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    sheet_name=0,
+    metadata_sheet_name=0,
+) -> Dict[str, np.ndarray]:
+    """
+    Load metered home data into the engine's array layout, with caching.
+    
+    Parsed arrays are cached as an .npz file keyed on the SHA-256 of the
+    input files, so repeated runs on an unchanged workbook skip the Excel
+    parse; any edit to the files produces a new cache entry.
+    
+    Args:
+        filepath: Meter workbook or CSV (see read_meter_table)
+        metadata_path: Optional per-home metadata workbook or CSV with
+            home_id, solar_capacity_kw and battery_capacity_kwh
+        cache_dir: Directory for cached .npz files (None = no caching)
+        sheet_name: Worksheet to read from the meter workbook
+        metadata_sheet_name: Worksheet to read from the metadata workbook
+    
+    Returns:
+        Dictionary as returned by meter_table_to_arrays
+    """
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(
+            f"{METER_CACHE_VERSION}:{sheet_name}:{file_digest(filepath)}".encode()
+        )
+        if metadata_path is not None:
+            digest.update(f"{metadata_sheet_name}:{file_digest(metadata_path)}".encode())
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        cache_path = os.path.join(cache_dir, f"{stem}-{digest.hexdigest()[:16]}.npz")
+        if os.path.exists(cache_path):
+            with np.load(cache_path, allow_pickle=False) as cached:
+                return {key: cached[key] for key in cached.files}
+    
+    metadata = None
+    if metadata_path is not None:
+        metadata = read_meter_table(metadata_path, sheet_name=metadata_sheet_name)
+    arrays = meter_table_to_arrays(read_meter_table(filepath, sheet_name=sheet_name), metadata)
+    
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a temporary name so an interrupted run never leaves a partial entry
+        partial_path = cache_path[:-len('.npz')] + '.partial.npz'
+        np.savez(partial_path, **arrays)
+        os.replace(partial_path, cache_path)
+    return arrays
@@ -0,0 +1,265 @@
+"""
+Sequential SOC recurrence kernels, JIT-compiled with Numba when installed
+"""
+
+import numpy as np
+from typing import Dict, Optional
+from neighborgrid.src.config import (
+    BATTERY_MIN_SOC,
+    BATTERY_MAX_SOC,
+    BATTERY_EFFICIENCY,
+    DEFAULT_TIMESTEP_MINUTES,
+    DISPATCH_BACKEND,
+)
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the pure-Python kernel is always available
+    numba = None
+
+BACKEND_AUTO = "auto"
+BACKEND_NUMBA = "numba"
+BACKEND_PYTHON = "python"
+
+# Rows of the kernel output block
+OUT_SOC, OUT_BATTERY_FLOW, OUT_TO_POOL, OUT_FROM_POOL, OUT_GRID_IMPORT, OUT_CREDITS = range(6)
+N_OUTPUTS = 6
+
+
+def _dispatch_series(pv, load, pool_cap, capacity, max_step, soc, credits_balance, out):
+    """
+    Run self_first dispatch over one home's steps.
+    
+    Written against plain indexing so the same source runs as Python (on
+    lists) and as a Numba-compiled kernel (on arrays).
+    
+    Args:
+        pv: PV production per step
+        load: Load consumption per step
+        pool_cap: Available kWh from pool per step
+        capacity: Battery capacity in kWh
+        max_step: Most the battery can charge or discharge in one step, kWh
+            (inf = limited by SOC only)
+        soc: Initial SOC as fraction 0-1 (already clipped to limits)
+        credits_balance: Initial credit balance in kWh
+        out: Output block indexed [OUT_*][step]
+    
+    Returns:
+        Tuple of (final SOC, final credit balance)
+    """
+    for h in range(len(pv)):
+        battery_flow = 0.0
+        to_pool = 0.0
+        from_pool = 0.0
+        grid_import = 0.0
+        
+        # Step 1: Solar covers load
+        net = pv[h] - load[h]
+        
+        if net > 0:
+            # Step 2: Charge battery with excess
+            max_charge = min((BATTERY_MAX_SOC - soc) * capacity / BATTERY_EFFICIENCY, max_step)
+            battery_charge = min(net, max_charge)
+            battery_flow = battery_charge
+            if capacity > 0:
+                soc += (battery_charge * BATTERY_EFFICIENCY) / capacity
+            net -= battery_charge
+            
+            # Step 3: Send remaining excess to pool
+            if net > 0:
+                to_pool = net
+                credits_balance += to_pool
+        else:
+            deficit = -net
+            
+            # Step 4: Discharge battery to cover deficit
+            max_discharge = min((soc - BATTERY_MIN_SOC) * capacity * BATTERY_EFFICIENCY, max_step)
+            battery_discharge = min(deficit, max_discharge)
+            battery_flow = -battery_discharge
+            if capacity > 0:
+                soc -= battery_discharge / (capacity * BATTERY_EFFICIENCY)
+            deficit -= battery_discharge
+            
+            # Step 5: Draw from pool if still in deficit and have credits
+            if deficit > 0:
+                from_pool = min(deficit, pool_cap[h], credits_balance if credits_balance > 0 else 0.0)
+                credits_balance -= from_pool
+                deficit -= from_pool
+            
+            # Step 6: Import from grid as last resort
+            if deficit > 0:
+                grid_import = deficit
+        
+        out[OUT_SOC][h] = soc
+        out[OUT_BATTERY_FLOW][h] = battery_flow
+        out[OUT_TO_POOL][h] = to_pool
+        out[OUT_FROM_POOL][h] = from_pool
+        out[OUT_GRID_IMPORT][h] = grid_import
+        out[OUT_CREDITS][h] = credits_balance
+    
+    return soc, credits_balance
+
+
+if numba is not None:
+    _dispatch_series_jit = numba.njit(cache=True)(_dispatch_series)
+    
+    @numba.njit(cache=True)
+    def _dispatch_fleet_jit(pv, load, pool_cap, capacity, max_step, soc, credits_balance, out):
+        final_soc = np.empty(pv.shape[0])
+        final_credits = np.empty(pv.shape[0])
+        for i in range(pv.shape[0]):
+            final_soc[i], final_credits[i] = _dispatch_series_jit(
+                pv[i], load[i], pool_cap[i], capacity[i], max_step[i], soc[i], credits_balance[i], out[i]
+            )
+        return final_soc, final_credits
+
+
+def numba_available() -> bool:
+    """Return True if the Numba backend can be used."""
+    return numba is not None
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Resolve the dispatch kernel backend to use.
+    
+    Args:
+        backend: "auto", "numba" or "python" (None = config.DISPATCH_BACKEND,
+            which reads the NEIGHBORGRID_DISPATCH_BACKEND environment variable)
+    
+    Returns:
+        "numba" or "python"
+    """
+    backend = (backend or DISPATCH_BACKEND).lower()
+    if backend == BACKEND_AUTO:
+        return BACKEND_NUMBA if numba_available() else BACKEND_PYTHON
+    if backend == BACKEND_NUMBA and not numba_available():
+        raise ImportError("Dispatch backend 'numba' requested but numba is not installed")
+    if backend not in (BACKEND_NUMBA, BACKEND_PYTHON):
+        raise ValueError(f"Unknown dispatch backend: {backend!r}")
+    return backend
+
+
+def _kernel_outputs(out: np.ndarray) -> Dict[str, np.ndarray]:
+    return {
+        'battery_soc_pct': out[..., OUT_SOC, :] * 100,
+        'battery_flow_kwh': out[..., OUT_BATTERY_FLOW, :],
+        'to_pool_kwh': out[..., OUT_TO_POOL, :],
+        'from_pool_kwh': out[..., OUT_FROM_POOL, :],
+        'grid_import_kwh': out[..., OUT_GRID_IMPORT, :],
+        'credits_delta_kwh': out[..., OUT_TO_POOL, :] - out[..., OUT_FROM_POOL, :],
+        'credits_balance_kwh': out[..., OUT_CREDITS, :],
+    }
+
+
+def battery_step_limit(battery_power_kw=None, timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES):
+    """
+    Convert a battery power rating into an energy limit per step.
+    
+    Args:
+        battery_power_kw: Charge/discharge power rating in kW (scalar or per
+            home; None = no power limit)
+        timestep_minutes: Step length in minutes
+    
+    Returns:
+        Most kWh the battery can move in one step (inf when unlimited)
+    """
+    if battery_power_kw is None:
+        return np.inf
+    return np.asarray(battery_power_kw, dtype=float) * (timestep_minutes / 60.0)
+
+
+def dispatch_series(
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    pool_availability_kwh: np.ndarray,
+    battery_capacity_kwh: float,
+    initial_soc: float,
+    initial_credits_kwh: float = 0.0,
+    backend: Optional[str] = None,
+    max_step_kwh: float = np.inf,
+) -> Dict[str, np.ndarray]:
+    """
+    Run the SOC recurrence for a single home.
+    
+    Args:
+        pv_production_kwh: PV production per step
+        load_consumption_kwh: Load consumption per step
+        pool_availability_kwh: Available kWh from pool per step
+        battery_capacity_kwh: Battery capacity in kWh
+        initial_soc: Initial SOC as fraction 0-1, already within the SOC limits
+        initial_credits_kwh: Initial credit balance in kWh
+        backend: Kernel backend (see resolve_backend)
+        max_step_kwh: Battery charge/discharge limit per step (see battery_step_limit)
+    
+    Returns:
+        Dictionary of unrounded per-step arrays keyed by dispatch column name,
+        plus 'final_soc' and 'final_credits_kwh'
+    """
+    soc = float(initial_soc)
+    pv = np.asarray(pv_production_kwh, dtype=float)
+    load = np.asarray(load_consumption_kwh, dtype=float)
+    pool_cap = np.asarray(pool_availability_kwh, dtype=float)
+    
+    if resolve_backend(backend) == BACKEND_NUMBA:
+        out = np.empty((N_OUTPUTS, len(pv)))
+        final_soc, final_credits = _dispatch_series_jit(
+            pv, load, pool_cap, float(battery_capacity_kwh), float(max_step_kwh),
+            soc, float(initial_credits_kwh), out,
+        )
+    else:
+        rows = [[0.0] * len(pv) for _ in range(N_OUTPUTS)]
+        final_soc, final_credits = _dispatch_series(
+            pv.tolist(), load.tolist(), pool_cap.tolist(),
+            float(battery_capacity_kwh), float(max_step_kwh), soc, float(initial_credits_kwh), rows,
+        )
+        out = np.array(rows, dtype=float).reshape(N_OUTPUTS, len(pv))
+    
+    result = _kernel_outputs(out)
+    result['final_soc'] = final_soc
+    result['final_credits_kwh'] = final_credits
+    return result
+
+
+def dispatch_fleet_compiled(
+    pv: np.ndarray,
+    load: np.ndarray,
+    pool_cap: np.ndarray,
+    capacity: np.ndarray,
+    soc: np.ndarray,
+    credits_balance: np.ndarray,
+    max_step: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Run the compiled SOC recurrence for many homes.
+    
+    Args:
+        pv: Array of shape (homes, steps) with PV production
+        load: Array of shape (homes, steps) with load
+        pool_cap: Array of shape (homes, steps) with pool availability
+        capacity: Battery capacity per home, shape (homes,)
+        soc: Initial SOC per home, already clipped, shape (homes,)
+        credits_balance: Initial credits per home, shape (homes,)
+        max_step: Battery charge/discharge limit per step and home (None = unlimited)
+    
+    Returns:
+        Dictionary in the run_dispatch_batch format
+    """
+    resolve_backend(BACKEND_NUMBA)
+    if max_step is None:
+        max_step = np.full(pv.shape[0], np.inf)
+    out = np.empty((pv.shape[0], N_OUTPUTS, pv.shape[1]))
+    final_soc, final_credits = _dispatch_fleet_jit(
+        np.ascontiguousarray(pv, dtype=float),
+        np.ascontiguousarray(load, dtype=float),
+        np.ascontiguousarray(pool_cap, dtype=float),
+        np.ascontiguousarray(capacity, dtype=float),
+        np.ascontiguousarray(np.broadcast_to(max_step, capacity.shape), dtype=float),
+        np.ascontiguousarray(soc, dtype=float),
+        np.ascontiguousarray(credits_balance, dtype=float),
+        out,
+    )
+    result = _kernel_outputs(out)
+    result['final_soc'] = final_soc
+    result['final_credits_kwh'] = final_credits
+    return result
@@ -0,0 +1,321 @@
+"""
+Append-only ledger of producer -> consumer pool allocations
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, Optional, Sequence, Tuple
+from neighborgrid.src.config import ALLOCATION_GREEDY, ALLOCATION_PRO_RATA
+
+try:
+    import scipy.sparse as sp
+except ImportError:
+    sp = None
+
+LEDGER_INITIAL_CAPACITY = 4096
+POOL_SIDE = -1  # from_home/to_home of a pro-rata leg on the pool side
+
+
+def _require_scipy() -> None:
+    if sp is None:
+        raise ImportError("Settlement matrices require scipy (pip install scipy)")
+
+
+class PoolLedger:
+    """
+    Columnar record of pool allocations: rows of (step, from_home, to_home, kWh).
+    
+    Rows are stored in growable NumPy arrays (capacity doubles when full),
+    with steps counted from the first recorded timestamp and homes as
+    indices into home_ids, so a row costs 20 bytes. Steps must be appended
+    in non-decreasing order, which keeps period lookups to a binary search.
+    
+    Greedy allocation records each producer -> consumer pair; it makes
+    fewer pairs per step than there are homes. Pro-rata allocation pairs
+    every producer with every consumer, but each step's pairs are the
+    rank-1 product sent_i * received_j / matched, so it records only the
+    legs: one row per producer (to_home = POOL_SIDE) and per consumer
+    (from_home = POOL_SIDE). Either way a step costs at most one row per
+    home, so a year of hourly steps for a thousand homes needs at most
+    about 175 MB.
+    """
+    
+    def __init__(self, capacity: int = LEDGER_INITIAL_CAPACITY):
+        """
+        Args:
+            capacity: Rows to allocate up front
+        """
+        self.home_ids: Optional[List[str]] = None
+        self.start: Optional[pd.Timestamp] = None
+        self.timestep_minutes: Optional[int] = None
+        self.allocation: Optional[str] = None
+        self._size = 0
+        self._step = np.empty(capacity, dtype=np.int32)
+        self._from = np.empty(capacity, dtype=np.int32)
+        self._to = np.empty(capacity, dtype=np.int32)
+        self._kwh = np.empty(capacity, dtype=np.float64)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def step(self) -> np.ndarray:
+        return self._step[:self._size]
+    
+    @property
+    def from_home(self) -> np.ndarray:
+        return self._from[:self._size]
+    
+    @property
+    def to_home(self) -> np.ndarray:
+        return self._to[:self._size]
+    
+    @property
+    def kwh(self) -> np.ndarray:
+        return self._kwh[:self._size]
+    
+    @property
+    def n_homes(self) -> int:
+        return 0 if self.home_ids is None else len(self.home_ids)
+    
+    def step_offset(
+        self,
+        home_ids: Sequence[str],
+        first_timestamp,
+        timestep_minutes: int,
+        allocation: str = ALLOCATION_GREEDY,
+    ) -> int:
+        """
+        Bind the ledger on first use and locate a block of steps within it.
+        
+        Args:
+            home_ids: Home IDs the block's home indices refer to
+            first_timestamp: Timestamp of the block's first step
+            timestep_minutes: Step length in minutes
+            allocation: Pool allocation that produced the block
+        
+        Returns:
+            Ledger step number of the block's first step
+        """
+        first = pd.Timestamp(first_timestamp)
+        if self.home_ids is None:
+            self.home_ids = list(home_ids)
+            self.start = first
+            self.timestep_minutes = timestep_minutes
+            self.allocation = allocation
+        elif (
+            list(home_ids) != self.home_ids
+            or timestep_minutes != self.timestep_minutes
+            or allocation != self.allocation
+        ):
+            raise ValueError("Ledger was started for different homes, timestep or allocation")
+        
+        offset, remainder = divmod(first - self.start, pd.Timedelta(minutes=self.timestep_minutes))
+        if remainder or offset < 0:
+            raise ValueError(f"{first} is not a step at or after the ledger start {self.start}")
+        return int(offset)
+    
+    def append(
+        self,
+        step: np.ndarray,
+        from_home: np.ndarray,
+        to_home: np.ndarray,
+        kwh: np.ndarray,
+    ) -> None:
+        """
+        Append rows (arrays of equal length, steps non-decreasing).
+        
+        Args:
+            step: Ledger step numbers
+            from_home: Producer home indices
+            to_home: Consumer home indices
+            kwh: Energy allocated
+        """
+        step = np.asarray(step)
+        n = len(step)
+        if n == 0:
+            return
+        if self._size and step[0] < self._step[self._size - 1]:
+            raise ValueError("Ledger steps must be appended in order")
+        
+        needed = self._size + n
+        if needed > len(self._step):
+            capacity = max(needed, 2 * len(self._step))
+            for name in ('_step', '_from', '_to', '_kwh'):
+                grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+                grown[:self._size] = getattr(self, name)[:self._size]
+                setattr(self, name, grown)
+        
+        end = self._size + n
+        self._step[self._size:end] = step
+        self._from[self._size:end] = from_home
+        self._to[self._size:end] = to_home
+        self._kwh[self._size:end] = kwh
+        self._size = end
+    
+    def append_pro_rata(self, first_step: int, to_pool_kwh: np.ndarray, from_pool_kwh: np.ndarray) -> None:
+        """
+        Append the legs of pro-rata allocations for consecutive steps.
+        
+        Args:
+            first_step: Ledger step number of the first row
+            to_pool_kwh: Energy sent per home, shape (steps, homes)
+            from_pool_kwh: Energy received per home, shape (steps, homes)
+        """
+        sent_step, sender = np.nonzero(to_pool_kwh)
+        received_step, receiver = np.nonzero(from_pool_kwh)
+        # Interleave both sides in step order; a stable sort keeps homes sorted
+        step = np.concatenate([sent_step, received_step])
+        order = np.argsort(step, kind='stable')
+        self.append(
+            step[order] + first_step,
+            np.concatenate([sender, np.full(len(receiver), POOL_SIDE)])[order],
+            np.concatenate([np.full(len(sender), POOL_SIDE), receiver])[order],
+            np.concatenate([to_pool_kwh[sent_step, sender], from_pool_kwh[received_step, receiver]])[order],
+        )
+    
+    def timestamps(self) -> pd.DatetimeIndex:
+        """Timestamp of every row."""
+        if self.start is None:
+            return pd.DatetimeIndex([])
+        return self.start + pd.to_timedelta(self.step.astype(np.int64) * self.timestep_minutes, unit='m')
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Recorded rows with home IDs (None on the pool side of pro-rata legs).
+        
+        Returns:
+            DataFrame with columns [timestamp_hour, from_home, to_home, kwh]
+        """
+        home_ids = np.append(np.asarray(self.home_ids or [], dtype=object), None)  # POOL_SIDE -> None
+        return pd.DataFrame({
+            'timestamp_hour': self.timestamps(),
+            'from_home': home_ids[self.from_home],
+            'to_home': home_ids[self.to_home],
+            'kwh': self.kwh,
+        })
+    
+    def _pairs(self, rows: slice) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # (from, to, kWh) summed over a block of rows
+        step, sender, receiver, kwh = (
+            column[rows] for column in (self._step, self._from, self._to, self._kwh)
+        )
+        if self.allocation != ALLOCATION_PRO_RATA:
+            key = sender.astype(np.int64) * self.n_homes + receiver
+            keys, inverse = np.unique(key, return_inverse=True)
+            return keys // self.n_homes, keys % self.n_homes, np.bincount(inverse, weights=kwh)
+        
+        # Sum over steps of sent * received / matched = S @ diag(1 / matched) @ R.T,
+        # over only the homes and steps that appear in the block
+        steps, step_idx = np.unique(step, return_inverse=True)
+        is_sent = receiver == POOL_SIDE
+        matched = np.bincount(step_idx[is_sent], weights=kwh[is_sent], minlength=len(steps))
+        senders, sender_idx = np.unique(sender[is_sent], return_inverse=True)
+        receivers, receiver_idx = np.unique(receiver[~is_sent], return_inverse=True)
+        shares = np.zeros((len(senders), len(steps)))
+        shares[sender_idx, step_idx[is_sent]] = kwh[is_sent] / matched[step_idx[is_sent]]
+        received = np.zeros((len(receivers), len(steps)))
+        received[receiver_idx, step_idx[~is_sent]] = kwh[~is_sent]
+        flows = shares @ received.T
+        i, j = np.nonzero(flows)
+        return senders[i], receivers[j], flows[i, j]
+    
+    def _matrix(self, rows: slice) -> "sp.csr_matrix":
+        sender, receiver, kwh = self._pairs(rows)
+        return sp.coo_matrix((kwh, (sender, receiver)), shape=(self.n_homes, self.n_homes)).tocsr()
+    
+    def settlement_matrix(self, start=None, end=None) -> "sp.csr_matrix":
+        """
+        Total kWh sent between every pair of homes over a time range.
+        
+        Args:
+            start: First timestamp included (None = ledger start)
+            end: First timestamp excluded (None = everything recorded)
+        
+        Returns:
+            Sparse (homes x homes) matrix; entry [i, j] is kWh from home i to home j
+        """
+        _require_scipy()
+        step = pd.Timedelta(minutes=self.timestep_minutes or 60)
+        lo = 0 if start is None or self.start is None else -((self.start - pd.Timestamp(start)) // step)
+        hi = np.iinfo(np.int64).max if end is None or self.start is None else -((self.start - pd.Timestamp(end)) // step)
+        first, last = np.searchsorted(self.step, [lo, hi], side='left')
+        return self._matrix(slice(first, last))
+    
+    def _period_rows(self, freq: str) -> Iterator[Tuple[pd.Timestamp, slice]]:
+        if self._size == 0:
+            return
+        # Period of every step up to the last one, then each row looks up its step
+        n_steps = int(self.step[-1]) + 1
+        step_times = self.start + pd.to_timedelta(np.arange(n_steps) * self.timestep_minutes, unit='m')
+        period_starts = step_times.to_period(freq).start_time
+        row_periods = period_starts[self.step]
+        bounds = np.flatnonzero(np.r_[True, row_periods[1:] != row_periods[:-1], True])
+        for i in range(len(bounds) - 1):
+            yield row_periods[bounds[i]], slice(bounds[i], bounds[i + 1])
+    
+    def period_pairs(self, freq: str = 'D') -> Iterator[Tuple[pd.Timestamp, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Summed producer -> consumer flows for every period that has allocations.
+        
+        Args:
+            freq: Pandas period frequency ('D' = daily, 'W' = weekly, 'M' = monthly)
+        
+        Yields:
+            Tuples of (period start, from_home indices, to_home indices, kWh), in time order
+        """
+        for period, rows in self._period_rows(freq):
+            yield (period, *self._pairs(rows))
+    
+    def settlement_matrices(self, freq: str = 'D') -> List[Tuple[pd.Timestamp, "sp.csr_matrix"]]:
+        """
+        Settlement matrix for every period that has allocations.
+        
+        Args:
+            freq: Pandas period frequency ('D' = daily, 'W' = weekly, 'M' = monthly)
+        
+        Returns:
+            List of (period start, sparse homes x homes kWh matrix), in time order
+        """
+        _require_scipy()
+        return [(period, self._matrix(rows)) for period, rows in self._period_rows(freq)]
+    
+    def save(self, filepath: str) -> None:
+        """
+        Save the ledger to an .npz file.
+        
+        Args:
+            filepath: Output file path
+        """
+        np.savez(
+            filepath,
+            home_ids=np.asarray(self.home_ids if self.home_ids is not None else [], dtype=str),
+            start=np.asarray(self.start.isoformat() if self.start is not None else ''),
+            timestep_minutes=np.asarray(self.timestep_minutes or 0),
+            allocation=np.asarray(self.allocation or ''),
+            step=self.step,
+            from_home=self.from_home,
+            to_home=self.to_home,
+            kwh=self.kwh,
+        )
+    
+    @classmethod
+    def load(cls, filepath: str) -> "PoolLedger":
+        """
+        Load a ledger saved with save().
+        
+        Args:
+            filepath: Input .npz file
+        
+        Returns:
+            PoolLedger that can keep appending where it was saved
+        """
+        with np.load(filepath) as data:
+            ledger = cls(capacity=max(len(data['step']), LEDGER_INITIAL_CAPACITY))
+            if str(data['start']):
+                ledger.home_ids = data['home_ids'].tolist()
+                ledger.start = pd.Timestamp(str(data['start']))
+                ledger.timestep_minutes = int(data['timestep_minutes'])
+                ledger.allocation = str(data['allocation'])
+            ledger.append(data['step'], data['from_home'], data['to_home'], data['kwh'])
+        return ledger
@@ -0,0 +1,330 @@
+"""
+Asyncio live simulation server streaming community ticks over SSE
+"""
+
+import asyncio
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Deque, Dict, Optional, Set, Tuple
+from neighborgrid.src.aggregate import grid_export_kwh
+from neighborgrid.src.community import CommunityState
+from neighborgrid.src.run_multi import COMMUNITY_HOMES, home_timeseries
+
+LIVE_TIMESTEP_MINUTES = 1
+LIVE_TICK_SECONDS = 0.5  # Accelerated mode: one virtual minute per half second
+LIVE_HISTORY_TICKS = 24 * 60  # One virtual day at one-minute ticks
+LIVE_CLIENT_QUEUE = 64
+
+
+def tick_delta(result: pd.DataFrame, timestep_minutes: int) -> dict:
+    """
+    Build an SSE delta for one tick, shaped like the TypeScript SSEDelta.
+    
+    Energy per step becomes kW and values are rounded like server.ts.
+    
+    Args:
+        result: CommunityState.advance output for a single step
+        timestep_minutes: Step length in minutes
+    
+    Returns:
+        Dictionary with ts, homes, grid and community entries
+    """
+    to_kw = 60.0 / timestep_minutes
+    
+    def kw(column: str) -> np.ndarray:
+        return result[column].to_numpy(dtype=float) * to_kw
+    
+    pv, load = kw('pv_production_kwh'), kw('load_consumption_kwh')
+    share, recv, imp = kw('to_pool_kwh'), kw('from_pool_kwh'), kw('grid_import_kwh')
+    exp = grid_export_kwh(result) * to_kw
+    credits_delta = result['to_pool_kwh'].to_numpy(dtype=float) - result['from_pool_kwh'].to_numpy(dtype=float)
+    soc = result['battery_soc_pct'].to_numpy(dtype=float)
+    
+    homes = [
+        {
+            'id': home_id,
+            'pv': round(pv[i]),
+            'load': round(load[i]),
+            'soc': round(soc[i]),
+            'share': round(share[i], 2),
+            'recv': round(recv[i], 2),
+            'imp': round(imp[i], 2),
+            'exp': round(exp[i], 2),
+            'creditsDelta': round(credits_delta[i], 3),
+        }
+        for i, home_id in enumerate(result['home_id'].tolist())
+    ]
+    return {
+        'ts': pd.Timestamp(result['timestamp_hour'].iloc[0]).isoformat(),
+        'homes': homes,
+        'grid': {'imp': round(imp.sum()), 'exp': round(exp.sum())},
+        'community': {'prod': round(pv.sum()), 'mg_used': round(recv.sum(), 2), 'unserved': 0.0},
+    }
+
+
+class Subscriber:
+    """
+    Bounded event queue for one client.
+    
+    When the client falls behind and the queue is full, the oldest queued
+    event is dropped; every delta is a full snapshot, so the client
+    catches up on the newest state without stalling other clients.
+    """
+    
+    def __init__(self, maxsize: int = LIVE_CLIENT_QUEUE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def offer(self, event: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+def sse_frame(tick_id: int, payload: str) -> bytes:
+    return f"id: {tick_id}\ndata: {payload}\n\n".encode()
+
+
+class LiveEngine:
+    """
+    Runs CommunityState one step per tick on a virtual clock.
+    
+    Each step (input generation, dispatch, pool matching and JSON encoding)
+    runs on a single worker thread, so pandas never blocks the event loop
+    and steps stay in order. Encoded ticks go to every subscriber and into
+    a fixed-size history used to replay missed events.
+    """
+    
+    def __init__(
+        self,
+        homes: list = COMMUNITY_HOMES,
+        start_date: str = "2025-10-04",
+        seed: int = 42,
+        timestep_minutes: int = LIVE_TIMESTEP_MINUTES,
+        tick_seconds: float = LIVE_TICK_SECONDS,
+        history_ticks: int = LIVE_HISTORY_TICKS,
+        client_queue: int = LIVE_CLIENT_QUEUE,
+    ):
+        """
+        Args:
+            homes: List of tuples in COMMUNITY_HOMES format
+            start_date: Virtual start time
+            seed: Seed for the synthetic load profiles
+            timestep_minutes: Virtual minutes per tick
+            tick_seconds: Wall-clock seconds per tick (0 = as fast as possible)
+            history_ticks: Ticks kept for replay and /history
+            client_queue: Events buffered per client before dropping old ones
+        """
+        self.homes = homes
+        self.seed = seed
+        self.tick_seconds = tick_seconds
+        self.client_queue = client_queue
+        self.state = CommunityState.from_homes(homes, start_date, timestep_minutes=timestep_minutes)
+        self.history: Deque[Tuple[int, str]] = deque(maxlen=history_ticks)
+        self.subscribers: Set[Subscriber] = set()
+        self.tick_id = 0
+        self._running = asyncio.Event()
+        self._running.set()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._day: Optional[pd.Timestamp] = None
+        self._inputs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    
+    def _day_inputs(self, day: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray]:
+        # One day of PV/load per home, seeded by the engine seed and the day
+        day_seed = np.random.SeedSequence([self.seed, day.toordinal()])
+        home_seeds = [int(child.generate_state(1)[0]) for child in day_seed.spawn(len(self.homes))]
+        series = [
+            home_timeseries(home, str(day.date()), 24, seed, self.state.timestep_minutes)
+            for home, seed in zip(self.homes, home_seeds)
+        ]
+        pv = np.vstack([s['pv_production_kwh'].to_numpy(dtype=float) for s in series])
+        load = np.vstack([s['load_consumption_kwh'].to_numpy(dtype=float) for s in series])
+        return pv, load
+    
+    def step(self) -> str:
+        """
+        Advance the community by one tick (blocking; runs on the worker thread).
+        
+        Returns:
+            JSON-encoded tick delta
+        """
+        now = self.state.next_timestamp
+        day = now.normalize()
+        if day != self._day:
+            self._inputs = self._day_inputs(day)
+            self._day = day
+        pv, load = self._inputs
+        index = int((now - day) / pd.Timedelta(minutes=self.state.timestep_minutes))
+        result = self.state.advance(pv[:, index:index + 1], load[:, index:index + 1])
+        return json.dumps(tick_delta(result, self.state.timestep_minutes), separators=(',', ':'))
+    
+    def publish(self, payload: str) -> None:
+        """Record an encoded tick and queue it for every subscriber."""
+        self.tick_id += 1
+        self.history.append((self.tick_id, payload))
+        frame = sse_frame(self.tick_id, payload)
+        for subscriber in self.subscribers:
+            subscriber.offer(frame)
+    
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscriber:
+        """
+        Register a client, queueing the ticks it should see first.
+        
+        Args:
+            last_event_id: Last tick the client received (SSE Last-Event-ID);
+                newer ticks still in the history are replayed. None sends
+                only the latest tick.
+        
+        Returns:
+            Subscriber whose queue receives every following tick
+        """
+        subscriber = Subscriber(self.client_queue)
+        if last_event_id is None:
+            backlog = list(self.history)[-1:]
+        else:
+            backlog = [(tick_id, payload) for tick_id, payload in self.history if tick_id > last_event_id]
+        for tick_id, payload in backlog:
+            subscriber.offer(sse_frame(tick_id, payload))
+        self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+    
+    def pause(self) -> None:
+        self._running.clear()
+    
+    def resume(self) -> None:
+        self._running.set()
+    
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+    
+    async def run(self, max_ticks: Optional[int] = None) -> None:
+        """
+        Tick until cancelled (or max_ticks), pacing ticks on the wall clock.
+        
+        Args:
+            max_ticks: Stop after this many ticks (None = run forever)
+        """
+        loop = asyncio.get_running_loop()
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            await self._running.wait()
+            started = loop.time()
+            payload = await loop.run_in_executor(self._executor, self.step)
+            self.publish(payload)
+            ticks += 1
+            await asyncio.sleep(max(0.0, self.tick_seconds - (loop.time() - started)))
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+def _response(status: str, body: str) -> bytes:
+    payload = body.encode()
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        "Content-Type: application/json\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode() + payload
+
+
+async def _stream(engine: LiveEngine, headers: Dict[str, str], writer: asyncio.StreamWriter) -> None:
+    last_event_id = headers.get("last-event-id")
+    subscriber = engine.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: text/event-stream\r\n"
+        b"Cache-Control: no-cache\r\n"
+        b"Connection: keep-alive\r\n"
+        b"Access-Control-Allow-Origin: *\r\n\r\n"
+    )
+    try:
+        while True:
+            writer.write(await subscriber.queue.get())
+            await writer.drain()  # Waits only on this client's socket
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        engine.unsubscribe(subscriber)
+
+
+async def handle_client(engine: LiveEngine, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serve one HTTP connection.
+    
+    Routes:
+        GET  /stream      SSE ticks (honours Last-Event-ID)
+        GET  /state       latest tick delta
+        GET  /history     ticks in the history buffer, oldest first
+        POST /sim/pause   pause the virtual clock
+        POST /sim/resume  resume the virtual clock
+    """
+    try:
+        method, target, headers = await _read_request(reader)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        writer.close()
+        return
+    
+    path = target.split("?", 1)[0]
+    if method == "GET" and path == "/stream":
+        await _stream(engine, headers, writer)
+    elif method == "GET" and path == "/state":
+        if engine.history:
+            writer.write(_response("200 OK", engine.history[-1][1]))
+        else:
+            writer.write(_response("503 Service Unavailable", '{"error":"Simulation not ready"}'))
+    elif method == "GET" and path == "/history":
+        writer.write(_response("200 OK", "[" + ",".join(payload for _, payload in engine.history) + "]"))
+    elif method == "POST" and path in ("/sim/pause", "/sim/resume"):
+        if path == "/sim/pause":
+            engine.pause()
+        else:
+            engine.resume()
+        writer.write(_response("200 OK", json.dumps({'paused': engine.paused})))
+    else:
+        writer.write(_response("404 Not Found", '{"error":"Not found"}'))
+    
+    try:
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def serve(engine: LiveEngine, host: str = "127.0.0.1", port: int = 3001) -> asyncio.AbstractServer:
+    """
+    Start the HTTP/SSE server for an engine (the engine's run() is not started).
+    
+    Args:
+        engine: LiveEngine to serve
+        host: Interface to bind
+        port: Port to bind (0 = any free port)
+    
+    Returns:
+        Running asyncio server
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: handle_client(engine, reader, writer), host, port
+    )
@@ -0,0 +1,345 @@
+"""
+Optimization-based (LP) community dispatch
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from neighborgrid.src.config import (
+    BATTERY_MIN_SOC,
+    BATTERY_MAX_SOC,
+    BATTERY_EFFICIENCY,
+    POLICY_OPTIMAL,
+    OPTIMIZE_HORIZON_HOURS,
+    OPTIMIZE_STEP_HOURS,
+    DEFAULT_TIMESTEP_MINUTES,
+)
+from neighborgrid.src.kernels import battery_step_limit
+from neighborgrid.src.results import DispatchResult
+
+try:
+    import scipy.sparse as sp
+    from scipy.optimize import linprog
+except ImportError:  # LP dispatch is optional
+    sp = None
+
+# Decision variables per home and hour, in the order they are laid out
+VAR_CHARGE = 0  # kWh drawn into the battery
+VAR_DISCHARGE = 1  # kWh delivered by the battery
+VAR_SOC = 2  # Stored kWh at the end of the hour
+VAR_GRID = 3  # Grid import
+VAR_TO_POOL = 4  # Sent to the community pool
+VAR_FROM_POOL = 5  # Received from the community pool
+VAR_EXPORT = 6  # Exported to the grid (earns no credits)
+N_VARS = 7
+
+# Tiny costs that break ties against pointless battery cycling and pool round trips
+CYCLE_PENALTY = 1e-6
+POOL_PENALTY = 1e-6
+
+
+def _require_scipy() -> None:
+    if sp is None:
+        raise ImportError("LP dispatch requires scipy (pip install scipy)")
+
+
+class _WindowModel:
+    """
+    Sparse LP structure for one window of n_homes x hours.
+    
+    The constraint matrices only depend on the window shape, so they are
+    built once and reused for every window of that shape; each solve only
+    fills in the right-hand sides, bounds and grid prices.
+    
+    Per home i and hour t:
+        charge - discharge + to_pool - from_pool - grid + export = pv - load
+        soc[t] - soc[t-1] - eff * charge + discharge / eff = 0
+    Per hour t:
+        sum(from_pool) - sum(to_pool) = 0
+    
+    Surplus nobody receives is exported rather than sent to the pool, so
+    pool credits match the energy actually shared.
+    """
+    
+    def __init__(self, n_homes: int, hours: int):
+        self.n_homes = n_homes
+        self.hours = hours
+        cells = n_homes * hours
+        self.n_cells = cells
+        
+        def var(kind):
+            return kind * cells + np.arange(cells)
+        
+        cell = np.arange(cells)
+        hour = cell % hours
+        
+        # Energy balance rows (one per cell)
+        balance = [
+            (cell, var(VAR_CHARGE), 1.0),
+            (cell, var(VAR_DISCHARGE), -1.0),
+            (cell, var(VAR_TO_POOL), 1.0),
+            (cell, var(VAR_FROM_POOL), -1.0),
+            (cell, var(VAR_GRID), -1.0),
+            (cell, var(VAR_EXPORT), 1.0),
+        ]
+        
+        # SOC transition rows (one per cell, after the balance rows)
+        soc_row = cells + cell
+        carried = hour > 0
+        transition = [
+            (soc_row, var(VAR_SOC), 1.0),
+            (soc_row[carried], var(VAR_SOC)[carried] - 1, -1.0),
+            (soc_row, var(VAR_CHARGE), -BATTERY_EFFICIENCY),
+            (soc_row, var(VAR_DISCHARGE), 1.0 / BATTERY_EFFICIENCY),
+        ]
+        
+        # Pool balance rows (one per hour, after the SOC rows)
+        pool_row = 2 * cells + hour
+        pool = [(pool_row, var(VAR_FROM_POOL), 1.0), (pool_row, var(VAR_TO_POOL), -1.0)]
+        self.A_eq = _assemble(balance + transition + pool, 2 * cells + hours, N_VARS * cells)
+        self.first_hour = cell[hour == 0]
+    
+    def solve(
+        self,
+        net: np.ndarray,
+        capacity: np.ndarray,
+        soc_kwh: np.ndarray,
+        pool_cap: np.ndarray,
+        grid_price: np.ndarray,
+        max_step: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Solve one window.
+        
+        Args:
+            net: PV minus load, shape (homes, hours)
+            capacity: Battery capacity per home
+            soc_kwh: Stored energy per home at the start of the window
+            pool_cap: Pool availability, shape (homes, hours)
+            grid_price: Weight of grid import per hour
+            max_step: Battery charge/discharge limit per step and home (kWh)
+        
+        Returns:
+            Solution of shape (N_VARS, homes, hours)
+        """
+        cells = self.n_cells
+        b_eq = np.zeros(2 * cells + self.hours)
+        b_eq[:cells] = net.ravel()
+        b_eq[cells + self.first_hour] = soc_kwh
+        
+        per_cell_capacity = np.repeat(capacity, self.hours)
+        no_battery = per_cell_capacity <= 0
+        upper = np.full((N_VARS, cells), np.inf)
+        lower = np.zeros((N_VARS, cells))
+        upper[VAR_CHARGE] = np.repeat(max_step, self.hours)
+        upper[VAR_DISCHARGE] = upper[VAR_CHARGE]
+        upper[VAR_CHARGE, no_battery] = 0.0
+        upper[VAR_DISCHARGE, no_battery] = 0.0
+        lower[VAR_SOC] = np.minimum(BATTERY_MIN_SOC * per_cell_capacity, np.repeat(soc_kwh, self.hours))
+        upper[VAR_SOC] = np.maximum(BATTERY_MAX_SOC * per_cell_capacity, np.repeat(soc_kwh, self.hours))
+        upper[VAR_FROM_POOL] = pool_cap.ravel()
+        
+        cost = np.zeros((N_VARS, cells))
+        cost[VAR_GRID] = np.tile(grid_price, self.n_homes)
+        cost[VAR_CHARGE] = CYCLE_PENALTY
+        cost[VAR_DISCHARGE] = CYCLE_PENALTY
+        cost[VAR_FROM_POOL] = POOL_PENALTY
+        
+        solution = linprog(
+            cost.ravel(),
+            A_eq=self.A_eq,
+            b_eq=b_eq,
+            bounds=np.column_stack([lower.ravel(), upper.ravel()]),
+            method="highs",
+        )
+        if solution.status != 0:
+            raise RuntimeError(f"LP dispatch failed: {solution.message}")
+        return np.maximum(solution.x, 0.0).reshape(N_VARS, self.n_homes, self.hours)
+
+
+def _assemble(entries, n_rows: int, n_cols: int):
+    rows = np.concatenate([np.broadcast_to(r, np.shape(c)) for r, c, _ in entries])
+    cols = np.concatenate([c for _, c, _ in entries])
+    data = np.concatenate([np.full(len(c), v) for _, c, v in entries])
+    return sp.csr_matrix((data, (rows, cols)), shape=(n_rows, n_cols))
+
+
+def optimize_dispatch_batch(
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    battery_capacity_kwh,
+    initial_soc=0.5,
+    pool_availability_kwh: Optional[np.ndarray] = None,
+    initial_credits_kwh=0.0,
+    grid_price_per_kwh: Optional[np.ndarray] = None,
+    horizon_hours: int = OPTIMIZE_HORIZON_HOURS,
+    step_hours: int = OPTIMIZE_STEP_HOURS,
+    battery_power_kw=None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> Dict[str, np.ndarray]:
+    """
+    Dispatch a community by linear programming over a rolling horizon.
+    
+    Each window of horizon_hours is solved jointly for all homes, minimizing
+    community grid import (or its cost when grid prices are given); the
+    first step_hours are committed and the battery state carried into the
+    next window. Energy sent to the pool in an hour is received by other
+    homes in the same hour, up to their pool availability; surplus nobody
+    receives is exported to the grid without earning credits.
+    
+    Args:
+        pv_production_kwh: Array of shape (homes, hours) with PV production
+        load_consumption_kwh: Array of shape (homes, hours) with load
+        battery_capacity_kwh: Battery capacity per home (scalar or shape (homes,))
+        initial_soc: Initial SOC per home as fraction 0-1 (scalar or shape (homes,))
+        pool_availability_kwh: Available kWh from pool, broadcastable to
+            (homes, hours) (None = unlimited)
+        initial_credits_kwh: Starting credit balance per home (scalar or shape (homes,))
+        grid_price_per_kwh: Grid price per hour, length = hours (None = minimize kWh)
+        horizon_hours: Steps of lookahead in each LP window (hours at the
+            default 60-minute step)
+        step_hours: Steps committed per window (<= horizon_hours)
+        battery_power_kw: Battery power limit in kW (scalar or shape (homes,);
+            None = unlimited)
+        timestep_minutes: Step length of the arrays
+    
+    Returns:
+        Dictionary in the run_dispatch_batch format
+    """
+    _require_scipy()
+    pv = np.asarray(pv_production_kwh, dtype=float)
+    load = np.asarray(load_consumption_kwh, dtype=float)
+    if pv.ndim != 2 or pv.shape != load.shape:
+        raise ValueError(
+            f"PV and load must be 2-D arrays of the same shape, got {pv.shape} and {load.shape}"
+        )
+    if not 0 < step_hours <= horizon_hours:
+        raise ValueError("step_hours must be between 1 and horizon_hours")
+    n_homes, hours = pv.shape
+    
+    capacity = np.array(np.broadcast_to(np.asarray(battery_capacity_kwh, dtype=float), (n_homes,)))
+    soc = np.clip(
+        np.broadcast_to(np.asarray(initial_soc, dtype=float), (n_homes,)),
+        BATTERY_MIN_SOC, BATTERY_MAX_SOC,
+    )
+    soc_kwh = soc * capacity
+    max_step = np.broadcast_to(battery_step_limit(battery_power_kw, timestep_minutes), (n_homes,))
+    if pool_availability_kwh is None:
+        pool_cap = np.full((n_homes, hours), 999999.0)  # Effectively unlimited
+    else:
+        pool_cap = np.broadcast_to(np.asarray(pool_availability_kwh, dtype=float), (n_homes, hours))
+    if grid_price_per_kwh is None:
+        grid_price = np.ones(hours)
+    else:
+        grid_price = np.asarray(grid_price_per_kwh, dtype=float)
+    
+    solution = np.empty((N_VARS, n_homes, hours))
+    models: Dict[Tuple[int, int], _WindowModel] = {}
+    net = pv - load
+    
+    for start in range(0, hours, step_hours):
+        stop = min(start + horizon_hours, hours)
+        window = stop - start
+        model = models.get((n_homes, window))
+        if model is None:
+            model = models[(n_homes, window)] = _WindowModel(n_homes, window)
+        
+        x = model.solve(
+            net[:, start:stop],
+            capacity,
+            soc_kwh,
+            pool_cap[:, start:stop],
+            grid_price[start:stop],
+            max_step,
+        )
+        commit = min(step_hours, window)
+        solution[:, :, start:start + commit] = x[:, :, :commit]
+        soc_kwh = x[VAR_SOC, :, commit - 1]
+    
+    has_battery = capacity > 0
+    soc_frac = np.where(
+        has_battery[:, np.newaxis],
+        solution[VAR_SOC] / np.where(has_battery, capacity, 1.0)[:, np.newaxis],
+        soc[:, np.newaxis],
+    )
+    to_pool = solution[VAR_TO_POOL]
+    from_pool = solution[VAR_FROM_POOL]
+    credits_delta = to_pool - from_pool
+    credits_start = np.broadcast_to(np.asarray(initial_credits_kwh, dtype=float), (n_homes,))
+    credits_balance = credits_start[:, np.newaxis] + np.cumsum(credits_delta, axis=1)
+    
+    return {
+        'battery_soc_pct': soc_frac * 100,
+        'battery_flow_kwh': solution[VAR_CHARGE] - solution[VAR_DISCHARGE],
+        'to_pool_kwh': to_pool,
+        'from_pool_kwh': from_pool,
+        'grid_import_kwh': solution[VAR_GRID],
+        'credits_delta_kwh': credits_delta,
+        'credits_balance_kwh': credits_balance,
+        'final_soc': soc_frac[:, -1],
+        'final_credits_kwh': credits_balance[:, -1],
+    }
+
+
+def run_dispatch_optimal(
+    timeseries: pd.DataFrame,
+    battery_capacity_kwh: float,
+    solar_capacity_kw: float,
+    initial_soc: float = 0.5,
+    pool_availability_kwh: list = None,
+    grid_price_per_kwh: Optional[np.ndarray] = None,
+    horizon_hours: int = OPTIMIZE_HORIZON_HOURS,
+    step_hours: int = OPTIMIZE_STEP_HOURS,
+    battery_power_kw: Optional[float] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> pd.DataFrame:
+    """
+    LP dispatch for a single home, as a drop-in for run_dispatch_single.
+    
+    Pool energy has to be sent by some home in the same hour, so a lone
+    home cannot draw from the pool and the LP only decides battery timing;
+    use optimize_dispatch_batch to optimize a community.
+    
+    Args:
+        timeseries: DataFrame with columns [timestamp_hour, pv_production_kwh, load_consumption_kwh]
+        battery_capacity_kwh: Battery capacity in kWh
+        solar_capacity_kw: Solar capacity in kW (for metadata)
+        initial_soc: Initial battery state of charge (0.0-1.0)
+        pool_availability_kwh: List of available kWh from pool per hour (None = unlimited)
+        grid_price_per_kwh: Grid price per hour (None = minimize kWh)
+        horizon_hours: Steps of lookahead in each LP window
+        step_hours: Steps committed per window
+        battery_power_kw: Battery power limit in kW (None = unlimited)
+        timestep_minutes: Step length of the timeseries
+    
+    Returns:
+        DataFrame with dispatch results for each hour (policy_mode 'optimal')
+    """
+    hours = len(timeseries)
+    pv = timeseries['pv_production_kwh'].to_numpy(dtype=float)[np.newaxis, :]
+    load = timeseries['load_consumption_kwh'].to_numpy(dtype=float)[np.newaxis, :]
+    pool_cap = None
+    if pool_availability_kwh is not None:
+        pool_cap = np.asarray(pool_availability_kwh, dtype=float)[np.newaxis, :hours]
+    
+    batch = optimize_dispatch_batch(
+        pv, load, battery_capacity_kwh,
+        initial_soc=initial_soc,
+        pool_availability_kwh=pool_cap,
+        grid_price_per_kwh=grid_price_per_kwh,
+        horizon_hours=horizon_hours,
+        step_hours=step_hours,
+        battery_power_kw=battery_power_kw,
+        timestep_minutes=timestep_minutes,
+    )
+    return DispatchResult.from_batch(
+        batch,
+        timestamps=timeseries['timestamp_hour'].to_numpy(),
+        home_ids=['H001'],
+        pv_production_kwh=pv,
+        load_consumption_kwh=load,
+        battery_capacity_kwh=battery_capacity_kwh,
+        solar_capacity_kw=solar_capacity_kw,
+        pool_availability_kwh=pool_cap,
+        policy_mode=POLICY_OPTIMAL,
+    ).to_dataframe()
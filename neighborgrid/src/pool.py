@@ -0,0 +1,285 @@
+"""
+Community pool matching on contiguous (hours x homes) arrays
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+from neighborgrid.src.ledger import PoolLedger
+from neighborgrid.src.config import (
+    POOL_MATCH_THRESHOLD_KWH,
+    POOL_EXHAUSTED_KWH,
+    ALLOCATION_GREEDY,
+    ALLOCATION_PRO_RATA,
+)
+
+
+def compute_net_available(
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    battery_flow_kwh: np.ndarray,
+) -> np.ndarray:
+    """
+    Compute each home's position after covering its own load and battery.
+    
+    A home with PV above load offers whatever excess its battery did not
+    absorb; a home with PV below load needs whatever its battery did not
+    supply.
+    
+    Args:
+        pv_production_kwh: PV production array
+        load_consumption_kwh: Load consumption array (same shape)
+        battery_flow_kwh: Battery flow array, positive = charging (same shape)
+    
+    Returns:
+        Array of net positions (positive = surplus, negative = deficit)
+    """
+    pv = np.asarray(pv_production_kwh, dtype=float)
+    load = np.asarray(load_consumption_kwh, dtype=float)
+    battery_flow = np.asarray(battery_flow_kwh, dtype=float)
+    
+    surplus = (pv - load) - np.maximum(0, battery_flow)
+    deficit = (load - pv) - np.maximum(0, -battery_flow)
+    return np.where(pv > load, surplus, -deficit)
+
+
+def match_pool_greedy(
+    net_available: np.ndarray,
+    step_hours: float = 1.0,
+    return_pairs: bool = False,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Greedily match producers to consumers within each hour.
+    
+    Producers are served largest surplus first and consumers largest
+    deficit first; each allocation moves min(remaining surplus, remaining
+    need) until one side of the hour runs out.
+    
+    Args:
+        net_available: Array of shape (hours, homes) from compute_net_available
+        step_hours: Length of each row in hours; the kWh thresholds are
+            scaled by it for sub-hourly steps
+        return_pairs: Also return every individual allocation
+    
+    Returns:
+        Tuple of (to_pool_kwh, from_pool_kwh) arrays of shape (hours, homes),
+        plus with return_pairs a tuple of equal-length (hour, producer,
+        consumer, kwh) arrays in hour order
+    """
+    net = np.asarray(net_available, dtype=float)
+    match_threshold = POOL_MATCH_THRESHOLD_KWH * step_hours
+    exhausted = POOL_EXHAUSTED_KWH * step_hours
+    to_pool = np.zeros(net.shape)
+    from_pool = np.zeros(net.shape)
+    if return_pairs:
+        # Each allocation exhausts a producer or a consumer, so an hour makes
+        # fewer pairs than there are homes; untouched capacity is never paged in
+        capacity = net.shape[0] * max(net.shape[1] - 1, 0)
+        pair_hour = np.empty(capacity, dtype=np.int32)
+        pair_from = np.empty(capacity, dtype=np.int32)
+        pair_to = np.empty(capacity, dtype=np.int32)
+        pair_kwh = np.empty(capacity, dtype=np.float64)
+        n_pairs = 0
+    
+    for h in range(net.shape[0]):
+        row = net[h]
+        producers = np.flatnonzero(row > match_threshold)
+        consumers = np.flatnonzero(row < -match_threshold)
+        if len(producers) == 0 or len(consumers) == 0:
+            continue
+        
+        producers = producers[np.argsort(-row[producers], kind='stable')].tolist()
+        consumers = consumers[np.argsort(row[consumers], kind='stable')].tolist()
+        offers = row[producers].tolist()
+        needs = (-row[consumers]).tolist()
+        to_row = to_pool[h]
+        from_row = from_pool[h]
+        
+        hour_from, hour_to, hour_kwh = [], [], []
+        producer_idx = 0
+        consumer_idx = 0
+        producer_remaining = offers[0]
+        consumer_needed = needs[0]
+        
+        while producer_idx < len(producers) and consumer_idx < len(consumers):
+            allocated = min(producer_remaining, consumer_needed)
+            to_row[producers[producer_idx]] += allocated
+            from_row[consumers[consumer_idx]] += allocated
+            if return_pairs:
+                hour_from.append(producers[producer_idx])
+                hour_to.append(consumers[consumer_idx])
+                hour_kwh.append(allocated)
+            
+            producer_remaining -= allocated
+            consumer_needed -= allocated
+            
+            if producer_remaining < exhausted:
+                producer_idx += 1
+                if producer_idx < len(producers):
+                    producer_remaining = offers[producer_idx]
+            
+            if consumer_needed < exhausted:
+                consumer_idx += 1
+                if consumer_idx < len(consumers):
+                    consumer_needed = needs[consumer_idx]
+        
+        if return_pairs:
+            end = n_pairs + len(hour_kwh)
+            pair_hour[n_pairs:end] = h
+            pair_from[n_pairs:end] = hour_from
+            pair_to[n_pairs:end] = hour_to
+            pair_kwh[n_pairs:end] = hour_kwh
+            n_pairs = end
+    
+    if return_pairs:
+        # Copy out the used rows so the preallocated buffers are released
+        return to_pool, from_pool, (
+            pair_hour[:n_pairs].copy(),
+            pair_from[:n_pairs].copy(),
+            pair_to[:n_pairs].copy(),
+            pair_kwh[:n_pairs].copy(),
+        )
+    return to_pool, from_pool
+
+
+def match_pool_pro_rata(
+    net_available: np.ndarray,
+    step_hours: float = 1.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split each hour's matched energy in proportion to surplus and deficit.
+    
+    The matched amount is min(total surplus, total deficit). Every consumer
+    receives a share of it proportional to its deficit, and every producer
+    supplies a share proportional to its surplus, so no sorting or per-hour
+    loop is needed. Each producer supplies each consumer in proportion to
+    both shares, so the two returned arrays determine every pair.
+    
+    Args:
+        net_available: Array of shape (hours, homes) from compute_net_available
+        step_hours: Length of each row in hours (scales the threshold)
+    
+    Returns:
+        Tuple of (to_pool_kwh, from_pool_kwh) arrays of shape (hours, homes)
+    """
+    net = np.asarray(net_available, dtype=float)
+    match_threshold = POOL_MATCH_THRESHOLD_KWH * step_hours
+    surplus = np.where(net > match_threshold, net, 0.0)
+    deficit = np.where(net < -match_threshold, -net, 0.0)
+    
+    total_surplus = surplus.sum(axis=1, keepdims=True)
+    total_deficit = deficit.sum(axis=1, keepdims=True)
+    matched = np.minimum(total_surplus, total_deficit)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        to_pool = np.where(matched > 0, surplus * (matched / total_surplus), 0.0)
+        from_pool = np.where(matched > 0, deficit * (matched / total_deficit), 0.0)
+    return to_pool, from_pool
+
+
+# Allocation mode -> matcher with the match_pool_greedy signature
+# (only greedy takes return_pairs; pro-rata pairs follow from its shares)
+POOL_MATCHERS = {
+    ALLOCATION_GREEDY: match_pool_greedy,
+    ALLOCATION_PRO_RATA: match_pool_pro_rata,
+}
+
+
+def grid_import_after_pool(
+    net_available: np.ndarray,
+    from_pool_kwh: np.ndarray,
+    grid_import_kwh: np.ndarray,
+    step_hours: float = 1.0,
+) -> np.ndarray:
+    """
+    Compute grid import once pool allocations are known.
+    
+    Consumers import whatever the pool did not cover (ignoring amounts at
+    or below the matching threshold). Producers keep their existing grid
+    import, and balanced homes import nothing.
+    
+    Args:
+        net_available: Net positions from compute_net_available
+        from_pool_kwh: Pool energy received (same shape)
+        grid_import_kwh: Grid import before pool matching (same shape)
+        step_hours: Length of each row in hours (scales the threshold)
+    
+    Returns:
+        Array of grid import after pool matching
+    """
+    net = np.asarray(net_available, dtype=float)
+    unmet = -net - from_pool_kwh
+    consumer_import = np.where(unmet > POOL_MATCH_THRESHOLD_KWH * step_hours, unmet, 0.0)
+    return np.where(
+        net < 0,
+        consumer_import,
+        np.where(net > 0, np.asarray(grid_import_kwh, dtype=float), 0.0),
+    )
+
+
+def apply_community_pool(
+    pv_production_kwh: np.ndarray,
+    load_consumption_kwh: np.ndarray,
+    battery_flow_kwh: np.ndarray,
+    grid_import_kwh: np.ndarray,
+    initial_credits_kwh: Optional[np.ndarray] = None,
+    step_hours: float = 1.0,
+    allocation: str = ALLOCATION_GREEDY,
+    ledger: Optional[PoolLedger] = None,
+    ledger_step: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Match the pool and settle credits for a block of dispatched steps.
+    
+    Args:
+        pv_production_kwh: Array of shape (hours, homes)
+        load_consumption_kwh: Array of shape (hours, homes)
+        battery_flow_kwh: Battery flow from individual dispatch (same shape)
+        grid_import_kwh: Grid import from individual dispatch (same shape)
+        initial_credits_kwh: Credit balance per home carried in from earlier
+            hours (None = start from zero)
+        step_hours: Length of each row in hours
+        allocation: 'greedy' or 'pro_rata'
+        ledger: Append every allocation to this ledger (bound by the caller)
+        ledger_step: Ledger step number of the first row
+    
+    Returns:
+        Dictionary of (hours, homes) arrays: to_pool_kwh, from_pool_kwh,
+        grid_import_kwh, credits_delta_kwh and credits_balance_kwh
+    """
+    match_pool = POOL_MATCHERS.get(allocation)
+    if match_pool is None:
+        raise ValueError(f"Unknown allocation: {allocation}")
+    
+    # Net position after own load and battery (positive = surplus, negative = deficit)
+    net_available = compute_net_available(pv_production_kwh, load_consumption_kwh, battery_flow_kwh)
+    
+    if ledger is None or allocation == ALLOCATION_PRO_RATA:
+        to_pool, from_pool = match_pool(net_available, step_hours)
+    else:
+        to_pool, from_pool, (hour, producer, consumer, kwh) = match_pool(
+            net_available, step_hours, return_pairs=True
+        )
+    if ledger is not None:
+        if allocation == ALLOCATION_PRO_RATA:
+            # Pro-rata pairs are sent * received / matched, so the shares are enough
+            ledger.append_pro_rata(ledger_step, to_pool, from_pool)
+        else:
+            ledger.append(hour + ledger_step, producer, consumer, kwh)
+    
+    # Unmatched deficit becomes grid import (unmatched surplus is ignored for now)
+    grid_import = grid_import_after_pool(net_available, from_pool, grid_import_kwh, step_hours)
+    
+    credits_delta = to_pool - from_pool
+    if initial_credits_kwh is None:
+        credits_balance = np.cumsum(credits_delta, axis=0)
+    else:
+        # Accumulate on top of the carried balance in the same order as a full run
+        carried = np.asarray(initial_credits_kwh, dtype=float).reshape(1, -1)
+        credits_balance = np.cumsum(np.vstack([carried, credits_delta]), axis=0)[1:]
+    
+    return {
+        'to_pool_kwh': to_pool,
+        'from_pool_kwh': from_pool,
+        'grid_import_kwh': grid_import,
+        'credits_delta_kwh': credits_delta,
+        'credits_balance_kwh': credits_balance,
+    }
@@ -0,0 +1,119 @@
+"""
+Phase timing and memory instrumentation for the simulation CLIs
+"""
+
+import cProfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class PhaseProfiler:
+    """
+    Record wall time and peak traced memory for named phases of a run.
+    
+    Entering the same phase name several times accumulates its wall time
+    and keeps the largest peak. Phases may nest: a nested phase's peak also
+    counts towards the enclosing phase, and only top-level phases add to
+    the reported total. Memory is traced in this process only, so
+    work done in worker processes shows wall time but not its memory. When
+    disabled, phases cost nothing. When a pstats path is given, the whole
+    run is also profiled with cProfile.
+    """
+    
+    def __init__(self, enabled: bool = False, pstats_path: Optional[str] = None):
+        self.enabled = enabled or pstats_path is not None
+        self.pstats_path = pstats_path
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self._open_peaks: List[int] = []  # Highest traced memory seen by each open phase
+        self._total_s = 0.0
+    
+    def start(self) -> None:
+        """Start memory tracing and, with a pstats path, cProfile."""
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.pstats_path is not None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+    
+    def stop(self) -> None:
+        """Stop tracing and write the pstats file if one was requested."""
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.pstats_path)
+            self._profile = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+    
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a named phase and record its peak traced memory.
+        
+        Args:
+            name: Phase label shown in the report
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        # reset_peak() clears the enclosing phase's peak too, so save it first
+        current, peak = tracemalloc.get_traced_memory()
+        if self._open_peaks:
+            self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+        tracemalloc.reset_peak()
+        # Registered on entry so the report lists enclosing phases first
+        stats = self.phases.setdefault(
+            name, {'wall_s': 0.0, 'peak_mb': 0.0, 'calls': 0, 'depth': len(self._open_peaks)}
+        )
+        self._open_peaks.append(current)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = max(self._open_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._open_peaks:
+                self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+            else:
+                self._total_s += elapsed
+            stats['wall_s'] += elapsed
+            stats['peak_mb'] = max(stats['peak_mb'], (peak - current) / 1e6)
+            stats['calls'] += 1
+    
+    def report_lines(self) -> List[str]:
+        """
+        Format the recorded phases as a table, nested phases indented.
+        
+        Returns:
+            Report lines: header, one line per phase, then the total wall time
+        """
+        lines = [f"  {'Phase':<34} {'Wall (s)':>10} {'Peak (MB)':>10}"]
+        for name, stats in self.phases.items():
+            label = '  ' * stats['depth'] + name
+            lines.append(f"  {label:<34} {stats['wall_s']:>10.3f} {stats['peak_mb']:>10.1f}")
+        lines.append(f"  {'total':<34} {self._total_s:>10.3f}")
+        return lines
+    
+    def print_report(self) -> None:
+        if not self.enabled:
+            return
+        print(f"\n{'Profile:'}")
+        for line in self.report_lines():
+            print(line)
+        if self.pstats_path is not None:
+            print(f"  pstats written to: {self.pstats_path}")
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,217 @@
+"""
+Compact columnar container for dispatch results
+"""
+
+from dataclasses import dataclass, fields, replace
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from neighborgrid.src.config import POLICY_SELF_FIRST
+
+# Decimal places applied when exporting each hourly column
+EXPORT_DECIMALS = {
+    'pv_production_kwh': 2,
+    'load_consumption_kwh': 2,
+    'from_pool_cap_kwh': 2,
+    'battery_soc_pct': 1,
+    'battery_flow_kwh': 3,
+    'to_pool_kwh': 3,
+    'from_pool_kwh': 3,
+    'grid_import_kwh': 3,
+    'credits_delta_kwh': 3,
+    'credits_balance_kwh': 3,
+}
+
+HOURLY_COLUMNS = [
+    'pv_production_kwh',
+    'load_consumption_kwh',
+    'from_pool_cap_kwh',
+    'battery_soc_pct',
+    'battery_flow_kwh',
+    'to_pool_kwh',
+    'from_pool_kwh',
+    'grid_import_kwh',
+    'credits_balance_kwh',
+]
+
+
+@dataclass
+class DispatchResult:
+    """
+    Dispatch results for one or more homes as typed (homes, hours) arrays.
+    
+    Per-home constants (home_id, solar and battery size) and the policy
+    mode are stored once rather than on every row, values are kept
+    unrounded, and credits_delta_kwh is derived on demand. to_dataframe()
+    builds the run_dispatch_single schema, rounding at export time.
+    """
+    
+    timestamps: np.ndarray
+    home_ids: np.ndarray
+    solar_capacity_kw: np.ndarray
+    battery_capacity_kwh: np.ndarray
+    pv_production_kwh: np.ndarray
+    load_consumption_kwh: np.ndarray
+    from_pool_cap_kwh: np.ndarray
+    battery_soc_pct: np.ndarray
+    battery_flow_kwh: np.ndarray
+    to_pool_kwh: np.ndarray
+    from_pool_kwh: np.ndarray
+    grid_import_kwh: np.ndarray
+    credits_balance_kwh: np.ndarray
+    policy_mode: str = POLICY_SELF_FIRST
+    timestep_minutes: Optional[float] = None  # None = inferred from timestamps
+    
+    @classmethod
+    def from_batch(
+        cls,
+        batch: Dict[str, np.ndarray],
+        timestamps,
+        home_ids: List[str],
+        pv_production_kwh: np.ndarray,
+        load_consumption_kwh: np.ndarray,
+        battery_capacity_kwh,
+        solar_capacity_kw,
+        pool_availability_kwh: Optional[np.ndarray] = None,
+        policy_mode: str = POLICY_SELF_FIRST,
+        timestep_minutes: Optional[float] = None,
+    ) -> "DispatchResult":
+        """
+        Wrap run_dispatch_batch output without copying its arrays.
+        
+        Args:
+            batch: Dictionary from run_dispatch_batch
+            timestamps: Sequence of hourly timestamps, length = hours
+            home_ids: Home ID for each row of the batch arrays
+            pv_production_kwh: Array of shape (homes, hours) passed to the batch
+            load_consumption_kwh: Array of shape (homes, hours) passed to the batch
+            battery_capacity_kwh: Battery capacity per home (scalar or shape (homes,))
+            solar_capacity_kw: Solar capacity per home (scalar or shape (homes,))
+            pool_availability_kwh: Pool availability passed to the batch (None = unlimited)
+            policy_mode: Dispatch policy recorded in the output
+            timestep_minutes: Step length (None = inferred from timestamps,
+                which needs at least two of them)
+        
+        Returns:
+            DispatchResult sharing memory with the batch arrays
+        """
+        n_homes, hours = batch['battery_soc_pct'].shape
+        if pool_availability_kwh is None:
+            pool_availability_kwh = 999999.0
+        
+        return cls(
+            timestamps=np.asarray(timestamps),
+            home_ids=np.asarray(home_ids, dtype=object),
+            solar_capacity_kw=_per_home(solar_capacity_kw, n_homes),
+            battery_capacity_kwh=_per_home(battery_capacity_kwh, n_homes),
+            pv_production_kwh=np.asarray(pv_production_kwh, dtype=float),
+            load_consumption_kwh=np.asarray(load_consumption_kwh, dtype=float),
+            from_pool_cap_kwh=np.broadcast_to(
+                np.asarray(pool_availability_kwh, dtype=float), (n_homes, hours)),
+            battery_soc_pct=batch['battery_soc_pct'],
+            battery_flow_kwh=batch['battery_flow_kwh'],
+            to_pool_kwh=batch['to_pool_kwh'],
+            from_pool_kwh=batch['from_pool_kwh'],
+            grid_import_kwh=batch['grid_import_kwh'],
+            credits_balance_kwh=batch['credits_balance_kwh'],
+            policy_mode=policy_mode,
+            timestep_minutes=timestep_minutes,
+        )
+    
+    @property
+    def n_homes(self) -> int:
+        return len(self.home_ids)
+    
+    @property
+    def hours(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def credits_delta_kwh(self) -> np.ndarray:
+        return self.to_pool_kwh - self.from_pool_kwh
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (broadcast views count as their base)."""
+        total = 0
+        for field in fields(self):
+            values = getattr(self, field.name)
+            if not isinstance(values, np.ndarray):
+                continue
+            # A broadcast view only holds one value along its zero-stride axes
+            distinct = [n for n, stride in zip(values.shape, values.strides) if stride != 0]
+            total += int(np.prod(distinct)) * values.itemsize
+        return total
+    
+    def astype(self, dtype) -> "DispatchResult":
+        """
+        Copy with the hourly columns cast to dtype (e.g. np.float32).
+        
+        Args:
+            dtype: Float dtype for the hourly columns
+        
+        Returns:
+            New DispatchResult
+        """
+        return replace(self, **{
+            column: np.asarray(getattr(self, column)).astype(dtype)
+            for column in HOURLY_COLUMNS
+        })
+    
+    def to_dataframe(self, rounded: bool = True) -> pd.DataFrame:
+        """
+        Build a DataFrame in the run_dispatch_single schema.
+        
+        Rows are ordered home by home (all hours of the first home, then the
+        next). Sub-hourly results keep extra decimals in proportion to the
+        step length, so per-step kWh values stay meaningful.
+        
+        Args:
+            rounded: Round hourly values like run_dispatch_single output
+        
+        Returns:
+            DataFrame with dispatch results for every home and hour
+        """
+        extra_decimals = self._extra_decimals()
+        
+        def hourly(column):
+            values = np.asarray(getattr(self, column), dtype=np.float64)
+            if rounded:
+                values = np.round(values, EXPORT_DECIMALS[column] + extra_decimals)
+            return values.ravel()
+        
+        def per_home(values):
+            return np.repeat(values, self.hours)
+        
+        return pd.DataFrame({
+            'timestamp_hour': np.tile(self.timestamps, self.n_homes),
+            'home_id': per_home(self.home_ids),
+            'solar_capacity_kw': per_home(self.solar_capacity_kw),
+            'battery_capacity_kwh': per_home(self.battery_capacity_kwh),
+            'pv_production_kwh': hourly('pv_production_kwh'),
+            'load_consumption_kwh': hourly('load_consumption_kwh'),
+            'from_pool_cap_kwh': hourly('from_pool_cap_kwh'),
+            'battery_soc_pct': hourly('battery_soc_pct'),
+            'battery_flow_kwh': hourly('battery_flow_kwh'),
+            'to_pool_kwh': hourly('to_pool_kwh'),
+            'from_pool_kwh': hourly('from_pool_kwh'),
+            'grid_import_kwh': hourly('grid_import_kwh'),
+            'credits_delta_kwh': hourly('credits_delta_kwh'),
+            'credits_balance_kwh': hourly('credits_balance_kwh'),
+            'policy_mode': self.policy_mode,
+        })
+    
+    def _extra_decimals(self) -> int:
+        if self.timestep_minutes is not None:
+            step_minutes = self.timestep_minutes
+        elif self.hours < 2 or not np.issubdtype(np.asarray(self.timestamps).dtype, np.datetime64):
+            return 0  # Only datetime64 timestamps give the step length; assume hourly
+        else:
+            step_minutes = (self.timestamps[1] - self.timestamps[0]) / np.timedelta64(1, 'm')
+        if step_minutes >= 60:
+            return 0
+        return int(np.ceil(np.log10(60.0 / step_minutes)))
+
+
+def _per_home(values, n_homes: int) -> np.ndarray:
+    return np.array(np.broadcast_to(np.asarray(values), (n_homes,)))
@@ -0,0 +1,77 @@
+"""
+Command-line runner for Monte Carlo community ensembles
+"""
+
+import argparse
+from neighborgrid.src.ensemble import run_ensemble
+from neighborgrid.src.run_multi import COMMUNITY_HOMES
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="NeighborGrid Monte Carlo community ensemble"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=5,
+        help="Number of days to simulate (default: 5)",
+    )
+    parser.add_argument(
+        "--start",
+        type=str,
+        default="2025-10-01",
+        help="Start date in YYYY-MM-DD format (default: 2025-10-01)",
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=100,
+        help="Number of seeded replicas (default: 100)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes running replicas (default: 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Ensemble seed (default: random)",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default="ensemble_percentiles.csv",
+        help="Output CSV filepath (default: ensemble_percentiles.csv)",
+    )
+    
+    args = parser.parse_args()
+    hours = args.days * 24
+    
+    print(f"\n🏘️  NeighborGrid — Community Ensemble")
+    print(f"Homes: {len(COMMUNITY_HOMES)}  |  Days: {args.days}  |  Replicas: {args.replicas}")
+    
+    table = run_ensemble(
+        COMMUNITY_HOMES,
+        start_date=args.start,
+        hours=hours,
+        replicas=args.replicas,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    
+    grid = table[table['metric'] == 'grid_import_kwh']
+    print(
+        f"Community grid import (sum of per-home bands) — "
+        f"P10: {grid['p10'].sum():.1f}  |  P50: {grid['p50'].sum():.1f}  |  P90: {grid['p90'].sum():.1f} kWh"
+    )
+    
+    table.to_csv(args.out, index=False)
+    print(f"CSV written to: {args.out}\n")
+
+
+if __name__ == "__main__":
+    main()
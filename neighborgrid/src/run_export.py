@@ -0,0 +1,107 @@
+"""
+Command-line loader from result files into the Supabase tables
+"""
+
+import argparse
+import os
+import time
+from neighborgrid.src.io_utils import read_dispatch_csv, read_dispatch_parquet
+from neighborgrid.src.db_export import export_results, PostgresLoader, SQLiteLoader, EXPORT_BATCH_ROWS
+from neighborgrid.src.ledger import PoolLedger
+from neighborgrid.src.config import DEFAULT_TIMESTEP_MINUTES
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load NeighborGrid dispatch results into tick_state, rollup and pool_ledger tables"
+    )
+    parser.add_argument(
+        "results",
+        type=str,
+        help="run_multi / run_single output (CSV file, Parquet file or dataset)",
+    )
+    parser.add_argument(
+        "--microgrid-id",
+        type=str,
+        required=True,
+        help="UUID of the microgrid the homes belong to",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--dsn",
+        type=str,
+        help="Postgres connection string, e.g. postgresql://user@host:5432/db",
+    )
+    target.add_argument(
+        "--sqlite",
+        type=str,
+        help="Write to this SQLite file instead (tables are created if missing)",
+    )
+    parser.add_argument(
+        "--timestep-minutes",
+        type=int,
+        default=DEFAULT_TIMESTEP_MINUTES,
+        help="Step length of the results in minutes (default: 60)",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=EXPORT_BATCH_ROWS,
+        help=f"Rows per COPY batch (default: {EXPORT_BATCH_ROWS})",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=4,
+        help="Pooled Postgres connections loading batches concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--timezone",
+        type=str,
+        default="UTC",
+        help="Time zone of the result timestamps (default: UTC)",
+    )
+    parser.add_argument(
+        "--ledger",
+        type=str,
+        default=None,
+        help="Pool ledger .npz from run_multi --out-ledger (default: attribute pool flows pro rata)",
+    )
+    
+    args = parser.parse_args()
+    
+    if args.results.endswith(".csv"):
+        results = read_dispatch_csv(args.results)
+    else:
+        results = read_dispatch_parquet(args.results)
+    ledger = PoolLedger.load(args.ledger) if args.ledger else None
+    
+    if args.dsn:
+        loader = PostgresLoader(args.dsn, max_connections=args.max_connections)
+        target_name = "Postgres"
+    else:
+        loader = SQLiteLoader(args.sqlite)
+        target_name = os.path.basename(args.sqlite)
+    
+    print(f"\n🏘️  NeighborGrid — Export {len(results):,} rows to {target_name}")
+    started = time.perf_counter()
+    try:
+        counts = export_results(
+            results,
+            loader,
+            microgrid_id=args.microgrid_id,
+            timestep_minutes=args.timestep_minutes,
+            batch_rows=args.batch_rows,
+            timezone=args.timezone,
+            ledger=ledger,
+        )
+    finally:
+        loader.close()
+    
+    for table, rows in counts.items():
+        print(f"  ✅ {table:<24} {rows:>10,} rows")
+    print(f"Done in {time.perf_counter() - started:.1f}s\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Command-line runner for the live SSE simulation server
+"""
+
+import argparse
+import asyncio
+from neighborgrid.src.live import (
+    LiveEngine,
+    serve,
+    LIVE_TIMESTEP_MINUTES,
+    LIVE_TICK_SECONDS,
+    LIVE_HISTORY_TICKS,
+    LIVE_CLIENT_QUEUE,
+)
+from neighborgrid.src.run_multi import COMMUNITY_HOMES
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="NeighborGrid live community simulation over SSE"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to bind (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=3001,
+        help="Port to listen on (default: 3001)",
+    )
+    parser.add_argument(
+        "--start",
+        type=str,
+        default="2025-10-04",
+        help="Virtual start date in YYYY-MM-DD format (default: 2025-10-04)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for load profiles (default: 42)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["accelerated", "realtime"],
+        default="accelerated",
+        help=f"accelerated = one tick every {LIVE_TICK_SECONDS}s, realtime = one tick per virtual step (default: accelerated)",
+    )
+    parser.add_argument(
+        "--timestep-minutes",
+        type=int,
+        default=LIVE_TIMESTEP_MINUTES,
+        help=f"Virtual minutes per tick (default: {LIVE_TIMESTEP_MINUTES})",
+    )
+    parser.add_argument(
+        "--history-ticks",
+        type=int,
+        default=LIVE_HISTORY_TICKS,
+        help=f"Ticks kept for replay and /history (default: {LIVE_HISTORY_TICKS})",
+    )
+    parser.add_argument(
+        "--client-queue",
+        type=int,
+        default=LIVE_CLIENT_QUEUE,
+        help=f"Ticks buffered per slow client before old ones are dropped (default: {LIVE_CLIENT_QUEUE})",
+    )
+    
+    args = parser.parse_args()
+    tick_seconds = args.timestep_minutes * 60.0 if args.mode == "realtime" else LIVE_TICK_SECONDS
+    try:
+        asyncio.run(_serve_forever(args, tick_seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve_forever(args: argparse.Namespace, tick_seconds: float) -> None:
+    engine = LiveEngine(
+        homes=COMMUNITY_HOMES,
+        start_date=args.start,
+        seed=args.seed,
+        timestep_minutes=args.timestep_minutes,
+        tick_seconds=tick_seconds,
+        history_ticks=args.history_ticks,
+        client_queue=args.client_queue,
+    )
+    server = await serve(engine, args.host, args.port)
+    
+    print(f"\n🏘️  NeighborGrid — Live Simulator")
+    print(f"Homes: {len(COMMUNITY_HOMES)}  |  Mode: {args.mode}  |  Step: {args.timestep_minutes} min")
+    print(f"📡 SSE stream: http://{args.host}:{args.port}/stream")
+    print(f"📊 State: GET /state, /history  |  🎮 Control: POST /sim/pause, /sim/resume\n")
+    
+    try:
+        async with server:
+            await engine.run()
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,35 @@ Command-line runner for multi-home community dispatch simulation
 """
 
 import argparse
+import json
+import os
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from datetime import datetime, timedelta
-from neighborgrid.src.simulator import make_single_home_timeseries
-from neighborgrid.src.dispatch import run_dispatch_single
-from neighborgrid.src.config import DEFAULT_HOURS, FAIR_RATE_PER_KWH
+from typing import Dict, Optional
+from neighborgrid.src.simulator import make_single_home_timeseries, n_steps, timestep_hours
+from neighborgrid.src.dispatch import run_dispatch_single, run_dispatch_batch, batch_to_dataframe
+from neighborgrid.src.io_utils import write_dispatch_parquet, PARTITION_DAY, PARTITION_HOME
+from neighborgrid.src.profiling import PhaseProfiler
+from neighborgrid.src.aggregate import compute_rollups, daily_rollups, LEVEL_COMMUNITY
+from neighborgrid.src.charts import write_chart_data, CHART_MAX_POINTS
+from neighborgrid.src.cache import ResultCache, cache_key
+from neighborgrid.src.optimize import optimize_dispatch_batch
+from neighborgrid.src.pool import apply_community_pool, POOL_MATCHERS
+from neighborgrid.src.ledger import PoolLedger
+from neighborgrid.src.config import (
+    DEFAULT_HOURS,
+    POLICY_SELF_FIRST,
+    POLICY_COMMUNITY_FIRST,
+    POLICY_OPTIMAL,
+    OPTIMIZE_HORIZON_HOURS,
+    OPTIMIZE_STEP_HOURS,
+    DEFAULT_TIMESTEP_MINUTES,
+    ALLOCATION_GREEDY,
+    ALLOCATION_PRO_RATA,
+)
 
 
 # Community configuration: 10 homes with varied setups
@@ -25,8 +49,18 @@ COMMUNITY_HOMES = [
     ("H010", 6.5, 10.5, 0.6, 1.3, 2, 0, False),    # Medium producer, west-facing
 ]
 
+ORIENTATIONS = ["east", "east-south", "south", "south-west", "west"]
 
-def simulate_community_pool(all_home_results: list, start_date: str, hours: int) -> pd.DataFrame:
+
+def simulate_community_pool(
+    all_home_results: list,
+    start_date: str,
+    hours: int,
+    initial_credits_kwh: Optional[np.ndarray] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    ledger: Optional[PoolLedger] = None,
+    allocation: str = ALLOCATION_GREEDY,
+) -> pd.DataFrame:
     """
     Simulate community pool sharing across multiple homes.
     Recomputes from_pool_kwh and to_pool_kwh based on community-wide matching.
@@ -34,127 +68,291 @@ def simulate_community_pool(all_home_results: list, start_date: str, hours: int)
     Args:
         all_home_results: List of DataFrames from individual home dispatch
         start_date: Start date string
-        hours: Number of hours
-        
+        hours: Number of timesteps per home (hours at the default step)
+        initial_credits_kwh: Credit balance per home (sorted by home_id) carried
+            in from earlier hours (None = start from zero)
+        timestep_minutes: Step length of the results in minutes
+        ledger: Append every producer -> consumer allocation to this ledger
+            (per-home shares for pro_rata, from which the pairs follow)
+        allocation: 'greedy' (largest producer to largest consumer) or
+            'pro_rata' (shares proportional to deficit, one vectorized pass)
+    
     Returns:
         Combined DataFrame with community pool adjustments
     """
-    # Combine all homes
+    if allocation not in POOL_MATCHERS:
+        raise ValueError(f"Unknown allocation: {allocation}")
+    
+    # Combine all homes into one hour-major frame: row = hour * n_homes + home
     combined = pd.concat(all_home_results, ignore_index=True)
     combined = combined.sort_values(['timestamp_hour', 'home_id']).reset_index(drop=True)
     
-    # Process hour by hour
-    updated_rows = []
-    
-    for hour_idx in range(hours):
-        hour_rows = combined[combined.index // 10 == hour_idx].copy()
-        
-        # Calculate net position for each home (positive = surplus, negative = deficit)
-        # Net = PV production - Load consumption
-        # Battery flow is already factored into the original to_pool/from_pool
-        # We need to recalculate based on actual PV vs Load
-        for idx, row in hour_rows.iterrows():
-            pv = row['pv_production_kwh']
-            load = row['load_consumption_kwh']
-            battery_flow = row['battery_flow_kwh']
-            
-            # After satisfying own load and charging/discharging battery
-            # Positive battery_flow = charging (using excess PV)
-            # Negative battery_flow = discharging (supplementing load)
-            if pv > load:
-                # Surplus: excess after load goes to battery, then pool
-                excess = pv - load
-                battery_charge = max(0, battery_flow)  # Only count charging
-                surplus_to_pool = excess - battery_charge
-                hour_rows.at[idx, 'net_available'] = surplus_to_pool
-            else:
-                # Deficit: need more than PV provides
-                deficit = load - pv
-                battery_discharge = max(0, -battery_flow)  # Only count discharging
-                remaining_deficit = deficit - battery_discharge
-                hour_rows.at[idx, 'net_available'] = -remaining_deficit
-        
-        # Separate into producers (surplus) and consumers (deficit)
-        producers = hour_rows[hour_rows['net_available'] > 0.01].copy()
-        consumers = hour_rows[hour_rows['net_available'] < -0.01].copy()
-        
-        # Reset pool flows
-        hour_rows['to_pool_kwh'] = 0.0
-        hour_rows['from_pool_kwh'] = 0.0
-        
-        # Match producers to consumers (greedy allocation)
-        if len(producers) > 0 and len(consumers) > 0:
-            producers = producers.sort_values('net_available', ascending=False)
-            consumers = consumers.sort_values('net_available', ascending=True)
-            
-            producer_idx = 0
-            consumer_idx = 0
-            producer_remaining = producers.iloc[producer_idx]['net_available']
-            consumer_needed = -consumers.iloc[consumer_idx]['net_available']
-            
-            while producer_idx < len(producers) and consumer_idx < len(consumers):
-                # Allocate energy
-                allocated = min(producer_remaining, consumer_needed)
-                
-                # Update to_pool for producer
-                p_home = producers.iloc[producer_idx]['home_id']
-                hour_rows.loc[hour_rows['home_id'] == p_home, 'to_pool_kwh'] += allocated
-                
-                # Update from_pool for consumer
-                c_home = consumers.iloc[consumer_idx]['home_id']
-                hour_rows.loc[hour_rows['home_id'] == c_home, 'from_pool_kwh'] += allocated
-                
-                # Update remaining amounts
-                producer_remaining -= allocated
-                consumer_needed -= allocated
-                
-                # Move to next producer or consumer
-                if producer_remaining < 0.001:
-                    producer_idx += 1
-                    if producer_idx < len(producers):
-                        producer_remaining = producers.iloc[producer_idx]['net_available']
-                
-                if consumer_needed < 0.001:
-                    consumer_idx += 1
-                    if consumer_idx < len(consumers):
-                        consumer_needed = -consumers.iloc[consumer_idx]['net_available']
-        
-        # Unmatched surplus goes to grid export (or storage)
-        # Unmatched deficit becomes grid import
-        for idx, row in hour_rows.iterrows():
-            net = row['net_available']
-            to_pool = row['to_pool_kwh']
-            from_pool = row['from_pool_kwh']
-            
-            if net > 0:
-                # Producer: leftover after pool goes to grid export (we'll ignore for now)
-                pass
-            elif net < 0:
-                # Consumer: unmet need comes from grid
-                unmet = -net - from_pool
-                if unmet > 0.01:
-                    hour_rows.at[idx, 'grid_import_kwh'] = unmet
-                else:
-                    hour_rows.at[idx, 'grid_import_kwh'] = 0.0
-            else:
-                hour_rows.at[idx, 'grid_import_kwh'] = 0.0
-        
-        # Update credits
-        for idx, row in hour_rows.iterrows():
-            hour_rows.at[idx, 'credits_delta_kwh'] = row['to_pool_kwh'] - row['from_pool_kwh']
-        
-        updated_rows.append(hour_rows.drop(columns=['net_available']))
+    n_homes = combined['home_id'].nunique()
+    if len(combined) < hours * n_homes:
+        raise ValueError(
+            f"Expected {hours} hours for each of {n_homes} homes, got {len(combined)} rows"
+        )
+    result = combined.iloc[:hours * n_homes].copy()
+    shape = (hours, n_homes)
     
-    result = pd.concat(updated_rows, ignore_index=True)
+    def as_matrix(column):
+        return result[column].to_numpy(dtype=float).reshape(shape)
     
-    # Recalculate cumulative credits per home
-    for home_id in result['home_id'].unique():
-        home_mask = result['home_id'] == home_id
-        result.loc[home_mask, 'credits_balance_kwh'] = result.loc[home_mask, 'credits_delta_kwh'].cumsum()
+    ledger_step = 0
+    if ledger is not None:
+        ledger_step = ledger.step_offset(
+            result['home_id'].iloc[:n_homes].tolist(), result['timestamp_hour'].iloc[0],
+            timestep_minutes, allocation,
+        )
+    pooled = apply_community_pool(
+        as_matrix('pv_production_kwh'),
+        as_matrix('load_consumption_kwh'),
+        as_matrix('battery_flow_kwh'),
+        as_matrix('grid_import_kwh'),
+        initial_credits_kwh,
+        timestep_hours(timestep_minutes),
+        allocation,
+        ledger,
+        ledger_step,
+    )
+    for column, values in pooled.items():
+        result[column] = values.ravel()
     
     return result
 
 
+def home_metadata(home: tuple) -> dict:
+    """
+    Build the metadata row for one COMMUNITY_HOMES entry.
+    
+    Args:
+        home: Tuple in COMMUNITY_HOMES format
+    
+    Returns:
+        Dictionary with home metadata
+    """
+    home_id, solar_kw, battery_kwh, load_base, load_peak, solar_offset, load_shift, is_net_consumer = home
+    return {
+        'home_id': home_id,
+        'solar_capacity_kw': solar_kw,
+        'battery_capacity_kwh': battery_kwh,
+        'load_base_kwh': load_base,
+        'load_peak_kwh': load_peak,
+        'solar_orientation': ORIENTATIONS[solar_offset + 2],
+        'load_pattern_shift_hours': load_shift,
+        'is_net_consumer': is_net_consumer,
+    }
+
+
+def home_timeseries(
+    home: tuple,
+    start_date: str,
+    hours: int,
+    seed: Optional[int] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> pd.DataFrame:
+    """
+    Generate the synthetic timeseries for one COMMUNITY_HOMES entry.
+    
+    Args:
+        home: Tuple in COMMUNITY_HOMES format
+        start_date: Start date string
+        hours: Number of hours
+        seed: Seed for this home's load profile
+        timestep_minutes: Step length in minutes
+    
+    Returns:
+        DataFrame with columns [timestamp_hour, pv_production_kwh, load_consumption_kwh]
+    """
+    _, solar_kw, _, load_base, load_peak, solar_offset, load_shift, _ = home
+    return make_single_home_timeseries(
+        start_date=start_date,
+        hours=hours,
+        solar_kw=solar_kw,
+        load_base_kwh=load_base,
+        load_peak_kwh=load_peak,
+        solar_orientation_offset=solar_offset,
+        load_pattern_shift=load_shift,
+        seed=seed,
+        timestep_minutes=timestep_minutes,
+    )
+
+
+def simulate_home(
+    home: tuple,
+    start_date: str,
+    hours: int,
+    seed: Optional[int] = None,
+    profiler: Optional[PhaseProfiler] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    battery_power_kw: Optional[float] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Generate one home's timeseries and run its individual dispatch.
+    
+    Runs in worker processes, so the result is returned as one NumPy array
+    per column, which pickles far more cheaply than a DataFrame.
+    
+    Args:
+        home: Tuple in COMMUNITY_HOMES format
+        start_date: Start date string
+        hours: Number of hours
+        seed: Seed for this home's load profile
+        profiler: Phase profiler (in-process runs only)
+        timestep_minutes: Step length in minutes
+        battery_power_kw: Battery power limit in kW (None = unlimited)
+    
+    Returns:
+        Dictionary mapping dispatch column name to values
+    """
+    home_id, solar_kw, battery_kwh = home[:3]
+    profiler = profiler or PhaseProfiler()
+    
+    # Generate timeseries
+    with profiler.phase("timeseries generation"):
+        timeseries = home_timeseries(home, start_date, hours, seed, timestep_minutes)
+    
+    # Run individual dispatch (no community pool yet)
+    with profiler.phase("per-home dispatch"):
+        result = run_dispatch_single(
+            timeseries=timeseries,
+            battery_capacity_kwh=battery_kwh,
+            solar_capacity_kw=solar_kw,
+            initial_soc=0.5,
+            pool_availability_kwh=[0] * len(timeseries),  # No pool initially
+            battery_power_kw=battery_power_kw,
+            timestep_minutes=timestep_minutes,
+        )
+        result['home_id'] = home_id
+    
+    return {column: result[column].to_numpy() for column in result.columns}
+
+
+def simulate_community(
+    homes: list,
+    start_date: str,
+    hours: int,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    profiler: Optional[PhaseProfiler] = None,
+    policy_mode: str = POLICY_SELF_FIRST,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+    battery_power_kw: Optional[float] = None,
+    ledger: Optional[PoolLedger] = None,
+    allocation: str = ALLOCATION_GREEDY,
+) -> pd.DataFrame:
+    """
+    Simulate every home individually, then apply community pool sharing.
+    
+    Each home gets its own deterministic seed derived from `seed`, so the
+    result does not depend on the number of workers. With community_first
+    the homes are dispatched together in one batch that shares surplus
+    hour by hour, and with optimal they are dispatched by rolling-horizon
+    LP; both already share through the pool, so the pool re-matching is
+    skipped.
+    
+    Args:
+        homes: List of tuples in COMMUNITY_HOMES format
+        start_date: Start date string
+        hours: Number of hours
+        seed: Community seed (None = fresh entropy)
+        workers: Number of worker processes (1 = run in this process)
+        profiler: Phase profiler; with workers > 1 generation and dispatch
+            are timed together as one phase
+        policy_mode: 'self_first', 'community_first' or 'optimal' (the last
+            two run in this process whatever the number of workers)
+        timestep_minutes: Step length in minutes (60 = hourly, 15, 1, ...)
+        battery_power_kw: Battery power limit in kW (None = unlimited)
+        ledger: Record pool allocations here (self_first only, since the
+            other policies share inside dispatch without pairing homes)
+        allocation: Pool allocation for self_first, 'greedy' or 'pro_rata'
+    
+    Returns:
+        Combined DataFrame with community pool adjustments
+    """
+    home_seeds = [
+        int(child.generate_state(1, dtype=np.uint64)[0])
+        for child in np.random.SeedSequence(seed).spawn(len(homes))
+    ]
+    tasks = (homes, [start_date] * len(homes), [hours] * len(homes), home_seeds)
+    profiler = profiler or PhaseProfiler()
+    
+    if policy_mode in (POLICY_COMMUNITY_FIRST, POLICY_OPTIMAL):
+        if ledger is not None:
+            raise ValueError(f"A pool ledger needs policy_mode={POLICY_SELF_FIRST!r}, got {policy_mode!r}")
+        return _simulate_community_batch(
+            homes, start_date, hours, home_seeds, profiler, policy_mode,
+            timestep_minutes, battery_power_kw,
+        )
+    if policy_mode != POLICY_SELF_FIRST:
+        raise ValueError(f"Unknown policy_mode: {policy_mode}")
+    
+    simulate = partial(simulate_home, timestep_minutes=timestep_minutes, battery_power_kw=battery_power_kw)
+    if workers > 1:
+        chunksize = max(1, len(homes) // (workers * 4))
+        with profiler.phase(f"per-home simulation ({workers} workers)"):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                columns = list(executor.map(simulate, *tasks, chunksize=chunksize))
+    else:
+        columns = [simulate(*task, profiler=profiler) for task in zip(*tasks)]
+    
+    with profiler.phase("community pool matching"):
+        all_results = [pd.DataFrame(home_columns) for home_columns in columns]
+        return simulate_community_pool(
+            all_results, start_date, n_steps(hours, timestep_minutes),
+            timestep_minutes=timestep_minutes,
+            ledger=ledger,
+            allocation=allocation,
+        )
+
+
+def _simulate_community_batch(
+    homes: list,
+    start_date: str,
+    hours: int,
+    home_seeds: list,
+    profiler: PhaseProfiler,
+    policy_mode: str,
+    timestep_minutes: int,
+    battery_power_kw: Optional[float],
+) -> pd.DataFrame:
+    with profiler.phase("timeseries generation"):
+        series = [
+            home_timeseries(home, start_date, hours, seed, timestep_minutes)
+            for home, seed in zip(homes, home_seeds)
+        ]
+        pv = np.vstack([timeseries['pv_production_kwh'].to_numpy(dtype=float) for timeseries in series])
+        load = np.vstack([timeseries['load_consumption_kwh'].to_numpy(dtype=float) for timeseries in series])
+    
+    with profiler.phase("community dispatch"):
+        battery_kwh = np.array([home[2] for home in homes])
+        power = dict(battery_power_kw=battery_power_kw, timestep_minutes=timestep_minutes)
+        if policy_mode == POLICY_OPTIMAL:
+            steps_per_hour = n_steps(1, timestep_minutes) if timestep_minutes < 60 else 1
+            batch = optimize_dispatch_batch(
+                pv, load, battery_kwh, initial_soc=0.5,
+                horizon_hours=OPTIMIZE_HORIZON_HOURS * steps_per_hour,
+                step_hours=OPTIMIZE_STEP_HOURS * steps_per_hour,
+                **power,
+            )
+        else:
+            batch = run_dispatch_batch(
+                pv, load, battery_kwh, initial_soc=0.5, policy_mode=policy_mode, **power,
+            )
+        result = batch_to_dataframe(
+            batch,
+            timestamps=series[0]['timestamp_hour'].to_numpy(),
+            home_ids=[home[0] for home in homes],
+            pv_production_kwh=pv,
+            load_consumption_kwh=load,
+            battery_capacity_kwh=battery_kwh,
+            solar_capacity_kw=np.array([home[1] for home in homes]),
+            policy_mode=policy_mode,
+        )
+        # Same hour-major row order as simulate_community_pool
+        return result.sort_values(['timestamp_hour', 'home_id'], kind='stable').reset_index(drop=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="NeighborGrid multi-home community dispatch simulation"
@@ -183,88 +381,200 @@ def main():
         default="public/data/community_metadata.csv",
         help="Output CSV for home metadata (default: public/data/community_metadata.csv)",
     )
+    parser.add_argument(
+        "--out-daily-rollups",
+        type=str,
+        default=None,
+        help="Also write per-day community and home totals as JSON (default: off)",
+    )
+    parser.add_argument(
+        "--out-charts",
+        type=str,
+        default=None,
+        help="Also write downsampled multi-resolution chart JSON to this directory (default: off)",
+    )
+    parser.add_argument(
+        "--chart-max-points",
+        type=int,
+        default=CHART_MAX_POINTS,
+        help=f"Maximum points per chart series (default: {CHART_MAX_POINTS})",
+    )
+    parser.add_argument(
+        "--out-ledger",
+        type=str,
+        default=None,
+        help="Also record every pool allocation to this .npz ledger (self_first only; default: off)",
+    )
+    parser.add_argument(
+        "--out-format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Timeseries output format (default: csv)",
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=["none", PARTITION_DAY, PARTITION_HOME],
+        default="none",
+        help="Parquet partitioning for the timeseries (default: none)",
+    )
+    parser.add_argument(
+        "--policy",
+        choices=[POLICY_SELF_FIRST, POLICY_COMMUNITY_FIRST, POLICY_OPTIMAL],
+        default=POLICY_SELF_FIRST,
+        help="Dispatch policy (default: self_first)",
+    )
+    parser.add_argument(
+        "--allocation",
+        choices=[ALLOCATION_GREEDY, ALLOCATION_PRO_RATA],
+        default=ALLOCATION_GREEDY,
+        help="Pool allocation for self_first: greedy or pro_rata by deficit (default: greedy)",
+    )
+    parser.add_argument(
+        "--timestep-minutes",
+        type=int,
+        default=DEFAULT_TIMESTEP_MINUTES,
+        help="Simulation step in minutes, e.g. 60, 15 or 1 (default: 60)",
+    )
+    parser.add_argument(
+        "--battery-power-kw",
+        type=float,
+        default=None,
+        help="Battery charge/discharge power limit in kW (default: unlimited)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for per-home simulation (default: 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible load profiles (default: random)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse results of identical seeded runs from this directory (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=512,
+        help="Evict least recently used cache entries above this size (default: 512)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time and peak memory for each phase",
+    )
+    parser.add_argument(
+        "--profile-out",
+        type=str,
+        default=None,
+        help="Also dump cProfile stats to this pstats file (implies --profile)",
+    )
     
     args = parser.parse_args()
+    if args.out_ledger and args.policy != POLICY_SELF_FIRST:
+        parser.error(f"--out-ledger requires --policy {POLICY_SELF_FIRST}")
+    if args.allocation != ALLOCATION_GREEDY and args.policy != POLICY_SELF_FIRST:
+        parser.error(f"--allocation applies to --policy {POLICY_SELF_FIRST} only")
+    profiler = PhaseProfiler(enabled=args.profile, pstats_path=args.profile_out)
+    with profiler:
+        run(args, profiler)
+    profiler.print_report()
+
+
+def run(args: argparse.Namespace, profiler: PhaseProfiler) -> None:
+    """
+    Run the community simulation for parsed command-line arguments.
+    
+    Args:
+        args: Parsed arguments from main
+        profiler: Phase profiler (disabled unless --profile is given)
+    """
     hours = args.days * 24
     
     print(f"\n🏘️  NeighborGrid — Community Simulation")
-    print(f"Homes: {len(COMMUNITY_HOMES)}  |  Days: {args.days}  |  Hours: {hours}")
+    print(f"Homes: {len(COMMUNITY_HOMES)}  |  Days: {args.days}  |  Hours: {hours}  |  Policy: {args.policy}")
+    if args.allocation != ALLOCATION_GREEDY:
+        print(f"Pool allocation: {args.allocation}")
+    if args.timestep_minutes != 60:
+        print(f"Timestep: {args.timestep_minutes} min ({n_steps(hours, args.timestep_minutes)} steps per home)")
     print(f"=" * 60)
     
-    # Generate individual home dispatches
-    all_results = []
-    metadata_rows = []
+    print("Homes:")
+    for home_id, solar_kw, battery_kwh, _, _, solar_offset, _, _ in COMMUNITY_HOMES:
+        orientation = ORIENTATIONS[solar_offset + 2]
+        print(f"  {home_id}  Solar: {solar_kw}kW {orientation}, Battery: {battery_kwh}kWh")
+    if args.workers > 1:
+        print(f"\nSimulating homes across {args.workers} worker processes, then applying community pool sharing...")
+    else:
+        print(f"\n{'Simulating homes and applying community pool sharing...'}")
     
-    for home_id, solar_kw, battery_kwh, load_base, load_peak, solar_offset, load_shift, is_net_consumer in COMMUNITY_HOMES:
-        orientation = ["east", "east-south", "south", "south-west", "west"][solar_offset + 2]
-        print(f"Simulating {home_id}... (Solar: {solar_kw}kW {orientation}, Battery: {battery_kwh}kWh)")
-        
-        # Generate timeseries
-        timeseries = make_single_home_timeseries(
+    # Generate individual home dispatches and simulate community pool
+    ledger = PoolLedger() if args.out_ledger else None
+    
+    def compute():
+        return simulate_community(
+            COMMUNITY_HOMES,
             start_date=args.start,
             hours=hours,
-            solar_kw=solar_kw,
-            load_base_kwh=load_base,
-            load_peak_kwh=load_peak,
-            solar_orientation_offset=solar_offset,
-            load_pattern_shift=load_shift,
+            seed=args.seed,
+            workers=args.workers,
+            profiler=profiler,
+            policy_mode=args.policy,
+            timestep_minutes=args.timestep_minutes,
+            battery_power_kw=args.battery_power_kw,
+            ledger=ledger,
+            allocation=args.allocation,
         )
-        
-        # Run individual dispatch (no community pool yet)
-        result = run_dispatch_single(
-            timeseries=timeseries,
-            battery_capacity_kwh=battery_kwh,
-            solar_capacity_kw=solar_kw,
-            initial_soc=0.5,
-            pool_availability_kwh=[0] * hours,  # No pool initially
+    
+    if args.cache_dir is None or args.seed is None or ledger is not None:
+        if args.cache_dir is not None and args.seed is None:
+            print("Result cache skipped: unseeded runs are not reproducible (pass --seed)")
+        elif args.cache_dir is not None:
+            print("Result cache skipped: cached results do not include the pool ledger")
+        community_result = compute()
+    else:
+        cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        key = cache_key(
+            "run_multi",
+            homes=COMMUNITY_HOMES,
+            start=args.start,
+            hours=hours,
+            seed=args.seed,
+            policy=args.policy,
+            allocation=args.allocation,
+            timestep_minutes=args.timestep_minutes,
+            battery_power_kw=args.battery_power_kw,
         )
-        
-        # Update home_id
-        result['home_id'] = home_id
-        all_results.append(result)
-        
-        # Collect metadata
-        orientation = ["east", "east-south", "south", "south-west", "west"][solar_offset + 2]
-        metadata_rows.append({
-            'home_id': home_id,
-            'solar_capacity_kw': solar_kw,
-            'battery_capacity_kwh': battery_kwh,
-            'load_base_kwh': load_base,
-            'load_peak_kwh': load_peak,
-            'solar_orientation': orientation,
-            'load_pattern_shift_hours': load_shift,
-            'is_net_consumer': is_net_consumer,
-        })
-    
-    print(f"\n{'Applying community pool sharing...'}")
-    
-    # Simulate community pool
-    community_result = simulate_community_pool(all_results, args.start, hours)
+        with profiler.phase("result cache"):
+            community_result, hit = cache.get_or_compute(key, compute)
+        print(f"Result cache {'hit' if hit else 'miss'}: {key[:12]}")
+    metadata_rows = [home_metadata(home) for home in COMMUNITY_HOMES]
     
     # Compute summary statistics
-    total_pv = community_result['pv_production_kwh'].sum()
-    total_load = community_result['load_consumption_kwh'].sum()
-    total_pool_shared = community_result['from_pool_kwh'].sum()
-    total_grid = community_result['grid_import_kwh'].sum()
-    
-    # Compute self-consumption (PV used directly without going through battery or pool)
-    self_consumption_total = 0
-    for home_id in community_result['home_id'].unique():
-        home_data = community_result[community_result['home_id'] == home_id]
-        for idx, row in home_data.iterrows():
-            direct_use = min(row['pv_production_kwh'], row['load_consumption_kwh'])
-            self_consumption_total += direct_use
+    with profiler.phase("summary stats"):
+        rollups = compute_rollups(community_result)
+        totals = rollups[LEVEL_COMMUNITY].iloc[0]
+        total_load = totals['load_consumption_kwh']
+        total_pool_shared = totals['from_pool_kwh']
+        total_grid = totals['grid_import_kwh']
     
     print(f"\n{'Community Summary:'}")
-    print(f"  Total PV Production:     {total_pv:>8.1f} kWh")
+    print(f"  Total PV Production:     {totals['pv_production_kwh']:>8.1f} kWh")
     print(f"  Total Load Consumption:  {total_load:>8.1f} kWh")
     print(f"  Microgrid Shared:        {total_pool_shared:>8.1f} kWh ({total_pool_shared/total_load*100:.1f}% of load)")
     print(f"  Grid Import:             {total_grid:>8.1f} kWh ({total_grid/total_load*100:.1f}% of load)")
-    print(f"  Self-Consumption:        {self_consumption_total:>8.1f} kWh")
+    print(f"  Self-Consumption:        {totals['self_consumption_kwh']:>8.1f} kWh")
     
     # Calculate fair-rate economics
-    total_earnings = community_result['to_pool_kwh'].sum() * FAIR_RATE_PER_KWH
-    total_payments = community_result['from_pool_kwh'].sum() * FAIR_RATE_PER_KWH
+    total_earnings = totals['pool_earnings_usd']
+    total_payments = totals['pool_payments_usd']
     print(f"\n{'Fair-Rate Economics ($0.18/kWh):'}")
     print(f"  Total Pool Earnings:  ${total_earnings:>8.2f}")
     print(f"  Total Pool Payments:  ${total_payments:>8.2f}")
@@ -272,12 +582,34 @@ def main():
     
     # Write outputs
     print(f"\n{'Writing outputs...'}")
-    community_result.to_csv(args.out_timeseries, index=False)
-    print(f"  ✅ Timeseries: {args.out_timeseries}")
-    
-    metadata_df = pd.DataFrame(metadata_rows)
-    metadata_df.to_csv(args.out_metadata, index=False)
-    print(f"  ✅ Metadata:   {args.out_metadata}")
+    with profiler.phase("output writing"):
+        if args.out_format == "parquet":
+            out_timeseries = args.out_timeseries
+            if out_timeseries.endswith(".csv"):
+                out_timeseries = os.path.splitext(out_timeseries)[0] + ".parquet"
+            partition_by = None if args.partition_by == "none" else args.partition_by
+            write_dispatch_parquet(community_result, out_timeseries, partition_by=partition_by)
+            print(f"  ✅ Timeseries: {out_timeseries}")
+        else:
+            community_result.to_csv(args.out_timeseries, index=False)
+            print(f"  ✅ Timeseries: {args.out_timeseries}")
+        
+        metadata_df = pd.DataFrame(metadata_rows)
+        metadata_df.to_csv(args.out_metadata, index=False)
+        print(f"  ✅ Metadata:   {args.out_metadata}")
+        
+        if args.out_daily_rollups:
+            with open(args.out_daily_rollups, 'w') as f:
+                json.dump(daily_rollups(rollups), f, indent=2)
+            print(f"  ✅ Rollups:    {args.out_daily_rollups}")
+        
+        if args.out_charts:
+            chart_files = write_chart_data(community_result, args.out_charts, max_points=args.chart_max_points)
+            print(f"  ✅ Charts:     {args.out_charts} ({len(chart_files)} files)")
+        
+        if ledger is not None:
+            ledger.save(args.out_ledger)
+            print(f"  ✅ Ledger:     {args.out_ledger} ({len(ledger)} allocations)")
     
     print(f"\n{'✨ Community simulation complete!'}\n")
 
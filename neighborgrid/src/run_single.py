@@ -6,6 +6,8 @@ import argparse
 from neighborgrid.src.simulator import make_single_home_timeseries
 from neighborgrid.src.dispatch import run_dispatch_single, compute_summary_stats
 from neighborgrid.src.io_utils import write_dispatch_csv
+from neighborgrid.src.profiling import PhaseProfiler
+from neighborgrid.src.cache import ResultCache, cache_key
 from neighborgrid.src.config import (
     DEFAULT_SOLAR_KW,
     DEFAULT_BATTERY_KWH,
@@ -54,30 +56,97 @@ def main():
         default=0.5,
         help="Initial battery SOC as fraction 0-1 (default: 0.5)",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for a reproducible load profile (default: random)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse results of identical seeded runs from this directory (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=512,
+        help="Evict least recently used cache entries above this size (default: 512)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time and peak memory for each phase",
+    )
+    parser.add_argument(
+        "--profile-out",
+        type=str,
+        default=None,
+        help="Also dump cProfile stats to this pstats file (implies --profile)",
+    )
     
     args = parser.parse_args()
+    profiler = PhaseProfiler(enabled=args.profile, pstats_path=args.profile_out)
+    with profiler:
+        run(args, profiler)
+    profiler.print_report()
+
+
+def run(args: argparse.Namespace, profiler: PhaseProfiler) -> None:
+    """
+    Run the single-home simulation for parsed command-line arguments.
+    
+    Args:
+        args: Parsed arguments from main
+        profiler: Phase profiler (disabled unless --profile is given)
+    """
     
     # Print header
     print(f"\nNeighborGrid — Single Home (H001)")
     print(f"Hours: {args.hours}  |  Solar kW: {args.solar_kw}  |  Battery kWh: {args.battery_kwh}")
     
-    # Generate timeseries
-    timeseries = make_single_home_timeseries(
-        start_date=args.start,
-        hours=args.hours,
-        solar_kw=args.solar_kw,
-    )
+    def compute():
+        # Generate timeseries
+        with profiler.phase("timeseries generation"):
+            timeseries = make_single_home_timeseries(
+                start_date=args.start,
+                hours=args.hours,
+                solar_kw=args.solar_kw,
+                seed=args.seed,
+            )
+        
+        # Run dispatch
+        with profiler.phase("dispatch"):
+            return run_dispatch_single(
+                timeseries=timeseries,
+                battery_capacity_kwh=args.battery_kwh,
+                solar_capacity_kw=args.solar_kw,
+                initial_soc=args.initial_soc,
+            )
     
-    # Run dispatch
-    dispatch_df = run_dispatch_single(
-        timeseries=timeseries,
-        battery_capacity_kwh=args.battery_kwh,
-        solar_capacity_kw=args.solar_kw,
-        initial_soc=args.initial_soc,
-    )
+    if args.cache_dir is None or args.seed is None:
+        if args.cache_dir is not None:
+            print("Result cache skipped: unseeded runs are not reproducible (pass --seed)")
+        dispatch_df = compute()
+    else:
+        cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        key = cache_key(
+            "run_single",
+            start=args.start,
+            hours=args.hours,
+            solar_kw=args.solar_kw,
+            battery_kwh=args.battery_kwh,
+            initial_soc=args.initial_soc,
+            seed=args.seed,
+        )
+        with profiler.phase("result cache"):
+            dispatch_df, hit = cache.get_or_compute(key, compute)
+        print(f"Result cache {'hit' if hit else 'miss'}: {key[:12]}")
     
     # Compute summary
-    stats = compute_summary_stats(dispatch_df)
+    with profiler.phase("summary stats"):
+        stats = compute_summary_stats(dispatch_df)
     
     # Calculate fair-rate economics
     earned = stats['total_to_pool_kwh'] * FAIR_RATE_PER_KWH
@@ -104,7 +173,8 @@ def main():
     )
     
     # Write output
-    write_dispatch_csv(dispatch_df, args.out)
+    with profiler.phase("csv writing"):
+        write_dispatch_csv(dispatch_df, args.out)
     print()
 
 
@@ -0,0 +1,92 @@
+"""
+Command-line runner for battery and solar sizing sweeps
+"""
+
+import argparse
+from neighborgrid.src.sweep import run_sweep
+from neighborgrid.src.config import DEFAULT_HOURS, FAIR_RATE_PER_KWH
+
+
+def _float_list(value: str) -> list:
+    return [float(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="NeighborGrid single-home sizing sweep"
+    )
+    parser.add_argument(
+        "--hours",
+        type=int,
+        default=DEFAULT_HOURS,
+        help=f"Number of hours to simulate (default: {DEFAULT_HOURS})",
+    )
+    parser.add_argument(
+        "--start",
+        type=str,
+        default="2025-10-04",
+        help="Start date in YYYY-MM-DD format (default: 2025-10-04)",
+    )
+    parser.add_argument(
+        "--solar-kw",
+        type=_float_list,
+        default=[4.0, 6.0, 8.0],
+        help="Comma-separated solar capacities in kW (default: 4,6,8)",
+    )
+    parser.add_argument(
+        "--battery-kwh",
+        type=_float_list,
+        default=[5.0, 10.0, 13.5],
+        help="Comma-separated battery capacities in kWh (default: 5,10,13.5)",
+    )
+    parser.add_argument(
+        "--initial-soc",
+        type=_float_list,
+        default=[0.5],
+        help="Comma-separated initial SOC fractions 0-1 (default: 0.5)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for the shared load profile (default: random)",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default="sweep_results.csv",
+        help="Output CSV filepath (default: sweep_results.csv)",
+    )
+    
+    args = parser.parse_args()
+    n_runs = len(args.solar_kw) * len(args.battery_kwh) * len(args.initial_soc)
+    
+    print(f"\nNeighborGrid — Sizing Sweep")
+    print(f"Hours: {args.hours}  |  Combinations: {n_runs}")
+    
+    table = run_sweep(
+        start_date=args.start,
+        hours=args.hours,
+        solar_kw_values=args.solar_kw,
+        battery_kwh_values=args.battery_kwh,
+        initial_soc_values=args.initial_soc,
+        seed=args.seed,
+    )
+    table['net_credit_usd'] = (
+        (table['total_to_pool_kwh'] - table['total_from_pool_kwh']) * FAIR_RATE_PER_KWH
+    ).round(2)
+    
+    best = table.sort_values(['total_grid_import_kwh', 'battery_kwh', 'solar_kw']).iloc[0]
+    print(
+        f"Lowest grid import: {best['total_grid_import_kwh']} kWh  |  "
+        f"Solar kW: {best['solar_kw']}  |  "
+        f"Battery kWh: {best['battery_kwh']}  |  "
+        f"Initial SOC: {best['initial_soc']}"
+    )
+    
+    table.to_csv(args.out, index=False)
+    print(f"CSV written to: {args.out}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,127 @@ Synthetic timeseries generation for solar PV and home load consumption
 
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Optional, Tuple
+from neighborgrid.src.config import DEFAULT_TIMESTEP_MINUTES
+
+
+def timestep_hours(timestep_minutes: int) -> float:
+    """
+    Length of a simulation step in hours.
+    
+    Args:
+        timestep_minutes: Step length in minutes; must divide a day evenly
+    
+    Returns:
+        Step length in hours (kWh per step = kW x this)
+    """
+    if timestep_minutes <= 0 or (24 * 60) % timestep_minutes != 0:
+        raise ValueError(f"timestep_minutes must divide 1440, got {timestep_minutes}")
+    return timestep_minutes / 60.0
+
+
+def n_steps(hours: int, timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES) -> int:
+    """
+    Number of simulation steps covering a horizon.
+    
+    Args:
+        hours: Horizon in hours
+        timestep_minutes: Step length in minutes
+    
+    Returns:
+        Number of steps
+    """
+    return int(round(hours / timestep_hours(timestep_minutes)))
+
+
+def make_community_timeseries(
+    start_date: str,
+    hours: int,
+    solar_kw,
+    load_base_kwh=0.6,
+    load_peak_kwh=1.2,
+    solar_orientation_offset=0,
+    load_pattern_shift=0,
+    seed: Optional[int] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """
+    Generate synthetic timeseries for many homes at once.
+    
+    Profiles for all homes and steps are computed with array operations.
+    Each home draws its load noise from its own numpy.random.Generator,
+    seeded with a child of `seed`, so results are reproducible and do not
+    depend on how many other homes are generated alongside it.
+    
+    Solar output (kW) and load rates (kWh per hour) are evaluated at the
+    start of each step and converted to kWh per step, so the default
+    60-minute step reproduces the hourly series exactly.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        hours: Number of hours to simulate
+        solar_kw: Solar capacity per home in kW (scalar or shape (homes,))
+        load_base_kwh: Base load per hour per home (scalar or shape (homes,))
+        load_peak_kwh: Peak load per hour per home (scalar or shape (homes,))
+        solar_orientation_offset: Solar peak hour offset per home (-2=east, 0=south, +2=west)
+        load_pattern_shift: Load pattern hour offset per home (0=normal, +2=late schedule)
+        seed: Seed for the per-home random streams (None = fresh entropy)
+        timestep_minutes: Step length in minutes (60 = hourly, 15, 1, ...)
+    
+    Returns:
+        Tuple of (timestamps, pv_production_kwh, load_consumption_kwh), where
+        the energy arrays have shape (homes, steps) in kWh per step
+    """
+    params = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(solar_kw, dtype=float)),
+        np.atleast_1d(np.asarray(load_base_kwh, dtype=float)),
+        np.atleast_1d(np.asarray(load_peak_kwh, dtype=float)),
+        np.atleast_1d(np.asarray(solar_orientation_offset, dtype=float)),
+        np.atleast_1d(np.asarray(load_pattern_shift, dtype=int)),
+    )
+    solar, base, peak, offset, shift = (p[:, np.newaxis] for p in params)
+    n_homes = solar.shape[0]
+    
+    step_hours = timestep_hours(timestep_minutes)
+    steps = n_steps(hours, timestep_minutes)
+    timestamps = pd.date_range(
+        datetime.fromisoformat(start_date), periods=steps, freq=f'{timestep_minutes}min'
+    )
+    hour_of_day = timestamps.hour.to_numpy()[np.newaxis, :]
+    if timestep_minutes < 60:
+        hour_of_day = hour_of_day + timestamps.minute.to_numpy()[np.newaxis, :] / 60.0
+    
+    # Solar production: bell curve peaking at noon (with orientation offset)
+    # Production only between 6 AM and 6 PM
+    t = (hour_of_day - 6) / 12.0
+    peak_t = (12 + offset - 6) / 12.0
+    solar_factor = np.exp(-((t - peak_t) ** 2) / 0.08)
+    daylight = (hour_of_day >= 6) & (hour_of_day <= 18)
+    pv = np.where(daylight, solar * solar_factor, 0.0)
+    
+    # Independent uniform noise in [-1, 1) per home, one child stream each
+    children = np.random.SeedSequence(seed).spawn(n_homes)
+    noise = np.empty((n_homes, steps))
+    for i, child in enumerate(children):
+        noise[i] = np.random.default_rng(child).uniform(-1.0, 1.0, size=steps)
+    
+    # Load consumption: higher in morning/evening, lower at night (with pattern shift)
+    shifted_hour = (np.floor(hour_of_day).astype(int) - shift) % 24
+    is_peak = ((shifted_hour >= 6) & (shifted_hour <= 9)) | ((shifted_hour >= 17) & (shifted_hour <= 22))
+    is_night = (shifted_hour <= 5) | (shifted_hour == 23)
+    load = np.where(
+        is_peak,
+        peak + noise * 0.1,
+        np.where(is_night, base * 0.5 + noise * 0.05, base + noise * 0.1),
+    )
+    
+    pv = np.maximum(0.0, pv)
+    load = np.maximum(0.1, load)
+    if step_hours != 1.0:
+        pv *= step_hours
+        load *= step_hours
+    return timestamps, pv, load
 
 
 def make_single_home_timeseries(
@@ -15,9 +135,11 @@ def make_single_home_timeseries(
     load_peak_kwh: float = 1.2,
     solar_orientation_offset: int = 0,
     load_pattern_shift: int = 0,
+    seed: Optional[int] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
 ) -> pd.DataFrame:
     """
-    Generate synthetic hourly timeseries for a single home.
+    Generate synthetic timeseries for a single home.
     
     Args:
         start_date: Start date in YYYY-MM-DD format
@@ -27,66 +149,54 @@ def make_single_home_timeseries(
         load_peak_kwh: Peak load consumption per hour (kWh)
         solar_orientation_offset: Hour offset for solar peak (-2=east, 0=south, +2=west)
         load_pattern_shift: Hour offset for load pattern (0=normal, +2=late schedule)
+        seed: Seed for the load noise (None = fresh entropy)
+        timestep_minutes: Step length in minutes (60 = hourly)
     
     Returns:
         DataFrame with columns: timestamp_hour, pv_production_kwh, load_consumption_kwh
+        (one row per step; timestamp_hour is the step start, energies are kWh per step)
     """
-    start = datetime.fromisoformat(start_date)
-    timestamps = [start + timedelta(hours=h) for h in range(hours)]
-    
-    pv_production = []
-    load_consumption = []
-    
-    for ts in timestamps:
-        hour_of_day = ts.hour
-        
-        # Solar production: bell curve peaking at noon (with orientation offset)
-        # Production only between 6 AM and 6 PM
-        solar_peak_hour = 12 + solar_orientation_offset  # Shift peak based on orientation
-        if 6 <= hour_of_day <= 18:
-            # Normalize hour to 0-1 range (0 = 6am, 1 = 6pm)
-            t = (hour_of_day - 6) / 12.0
-            # Bell curve: peak adjusted by orientation
-            peak_t = (solar_peak_hour - 6) / 12.0
-            solar_factor = np.exp(-((t - peak_t) ** 2) / 0.08)
-            pv = solar_kw * solar_factor
-        else:
-            pv = 0.0
-        
-        # Load consumption: higher in morning/evening, lower at night (with pattern shift)
-        shifted_hour = (hour_of_day - load_pattern_shift) % 24
-        if 6 <= shifted_hour <= 9 or 17 <= shifted_hour <= 22:
-            # Peak usage times
-            load = load_peak_kwh + np.random.uniform(-0.1, 0.1)
-        elif 0 <= shifted_hour <= 5 or 23 <= shifted_hour <= 23:
-            # Night time - lower usage
-            load = load_base_kwh * 0.5 + np.random.uniform(-0.05, 0.05)
-        else:
-            # Daytime - moderate usage
-            load = load_base_kwh + np.random.uniform(-0.1, 0.1)
-        
-        pv_production.append(max(0.0, pv))
-        load_consumption.append(max(0.1, load))
+    timestamps, pv, load = make_community_timeseries(
+        start_date=start_date,
+        hours=hours,
+        solar_kw=solar_kw,
+        load_base_kwh=load_base_kwh,
+        load_peak_kwh=load_peak_kwh,
+        solar_orientation_offset=solar_orientation_offset,
+        load_pattern_shift=load_pattern_shift,
+        seed=seed,
+        timestep_minutes=timestep_minutes,
+    )
     
     df = pd.DataFrame({
         'timestamp_hour': timestamps,
-        'pv_production_kwh': pv_production,
-        'load_consumption_kwh': load_consumption
+        'pv_production_kwh': pv[0],
+        'load_consumption_kwh': load[0]
     })
     
     return df
 
 
-def make_pool_availability(hours: int, base_capacity_kwh: float = 5.0) -> list:
+def make_pool_availability(
+    hours: int,
+    base_capacity_kwh: float = 5.0,
+    seed: Optional[int] = None,
+    timestep_minutes: int = DEFAULT_TIMESTEP_MINUTES,
+) -> list:
     """
-    Generate synthetic pool availability for each hour.
+    Generate synthetic pool availability for each step.
     
     Args:
         hours: Number of hours
         base_capacity_kwh: Base pool capacity per hour
+        seed: Seed for the random variation (None = fresh entropy)
+        timestep_minutes: Step length in minutes (60 = hourly)
     
     Returns:
-        List of available kWh from community pool for each hour
+        List of available kWh from community pool for each step
     """
-    return [base_capacity_kwh + np.random.uniform(-1.0, 2.0) for _ in range(hours)]
-
+    rng = np.random.default_rng(seed)
+    capacity = base_capacity_kwh + rng.uniform(-1.0, 2.0, size=n_steps(hours, timestep_minutes))
+    if timestep_minutes != 60:
+        capacity *= timestep_hours(timestep_minutes)
+    return capacity.tolist()
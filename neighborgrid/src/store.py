@@ -0,0 +1,374 @@
+"""
+Memory-mapped on-disk store for fleet-scale timeseries
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from neighborgrid.src.config import POLICY_SELF_FIRST
+from neighborgrid.src.dispatch import run_dispatch_batch
+from neighborgrid.src.pool import compute_net_available, match_pool_greedy, grid_import_after_pool
+from neighborgrid.src.results import DispatchResult
+
+DATA_FILE = 'timeseries.npy'
+INDEX_FILE = 'index.json'
+STORE_VERSION = 1
+
+# Channels of an input store and of the store written by dispatch_store
+INPUT_CHANNELS = ('pv_production_kwh', 'load_consumption_kwh')
+DISPATCH_CHANNELS = (
+    'battery_soc_pct',
+    'battery_flow_kwh',
+    'to_pool_kwh',
+    'from_pool_kwh',
+    'grid_import_kwh',
+    'credits_balance_kwh',
+)
+
+
+class FleetStore:
+    """
+    Homes x hours x channels array memory-mapped from disk.
+    
+    A store is a directory holding the array as a .npy file plus a small
+    JSON index (home IDs, start time, channel names, per-home sizes).
+    Channel and home accessors return views of the mapped file, so nothing
+    is read until it is used and fleets larger than RAM can be processed
+    block by block. Pickling a store only sends its path, so worker
+    processes share the inputs through the page cache.
+    """
+    
+    def __init__(self, path: str, mode: str = 'r'):
+        """
+        Open an existing store.
+        
+        Args:
+            path: Store directory
+            mode: 'r' (read-only) or 'r+' (read-write)
+        """
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported fleet store version: {index.get('version')}")
+        self.home_ids: List[str] = index['home_ids']
+        self.channels: List[str] = index['channels']
+        self.start = pd.Timestamp(index['start'])
+        self.solar_capacity_kw = _optional_array(index.get('solar_capacity_kw'))
+        self.battery_capacity_kwh = _optional_array(index.get('battery_capacity_kwh'))
+        self.data = np.load(os.path.join(path, DATA_FILE), mmap_mode=mode)
+        self._rows = {home_id: row for row, home_id in enumerate(self.home_ids)}
+    
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        home_ids: Sequence[str],
+        start,
+        hours: int,
+        channels: Sequence[str] = INPUT_CHANNELS,
+        dtype=np.float64,
+        solar_capacity_kw=None,
+        battery_capacity_kwh=None,
+    ) -> "FleetStore":
+        """
+        Create an empty store on disk and open it read-write.
+        
+        Args:
+            path: Store directory (created if missing)
+            home_ids: Home ID for each row
+            start: Timestamp of the first hour
+            hours: Number of hours
+            channels: Channel names, in storage order
+            dtype: Element dtype
+            solar_capacity_kw: Optional solar capacity per home
+            battery_capacity_kwh: Optional battery capacity per home
+        
+        Returns:
+            FleetStore opened with mode 'r+'
+        """
+        home_ids = [str(home_id) for home_id in home_ids]
+        if len(set(home_ids)) != len(home_ids):
+            raise ValueError("home_ids must be unique")
+        os.makedirs(path, exist_ok=True)
+        
+        data = np.lib.format.open_memmap(
+            os.path.join(path, DATA_FILE), mode='w+', dtype=dtype,
+            shape=(len(home_ids), hours, len(channels)),
+        )
+        del data  # Flushes the header and allocates the file
+        
+        index = {
+            'version': STORE_VERSION,
+            'home_ids': home_ids,
+            'start': pd.Timestamp(start).isoformat(),
+            'channels': list(channels),
+            'solar_capacity_kw': _optional_list(solar_capacity_kw, len(home_ids)),
+            'battery_capacity_kwh': _optional_list(battery_capacity_kwh, len(home_ids)),
+        }
+        with open(os.path.join(path, INDEX_FILE), 'w') as f:
+            json.dump(index, f)
+        return cls(path, mode='r+')
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        path: str,
+        home_ids: Sequence[str],
+        start,
+        pv_production_kwh: np.ndarray,
+        load_consumption_kwh: np.ndarray,
+        solar_capacity_kw=None,
+        battery_capacity_kwh=None,
+    ) -> "FleetStore":
+        """
+        Create an input store from (homes, hours) PV and load arrays.
+        
+        Args:
+            path: Store directory
+            home_ids: Home ID for each row
+            start: Timestamp of the first hour
+            pv_production_kwh: Array of shape (homes, hours)
+            load_consumption_kwh: Array of shape (homes, hours)
+            solar_capacity_kw: Optional solar capacity per home
+            battery_capacity_kwh: Optional battery capacity per home
+        
+        Returns:
+            FleetStore opened with mode 'r+'
+        """
+        n_homes, hours = np.shape(pv_production_kwh)
+        store = cls.create(
+            path, home_ids, start, hours,
+            solar_capacity_kw=solar_capacity_kw,
+            battery_capacity_kwh=battery_capacity_kwh,
+        )
+        store.channel('pv_production_kwh')[:] = pv_production_kwh
+        store.channel('load_consumption_kwh')[:] = load_consumption_kwh
+        store.flush()
+        return store
+    
+    def __reduce__(self):
+        return (FleetStore, (self.path, self.mode))
+    
+    def __len__(self) -> int:
+        return len(self.home_ids)
+    
+    @property
+    def hours(self) -> int:
+        return self.data.shape[1]
+    
+    @property
+    def timestamps(self) -> pd.DatetimeIndex:
+        return pd.date_range(start=self.start, periods=self.hours, freq='h')
+    
+    def row(self, home_id: str) -> int:
+        """Row of the array holding home_id."""
+        try:
+            return self._rows[home_id]
+        except KeyError:
+            raise KeyError(f"Home {home_id} is not in the store") from None
+    
+    def channel(self, name: str) -> np.ndarray:
+        """(homes, hours) view of one channel."""
+        return self.data[:, :, self.channels.index(name)]
+    
+    def home(self, home_id: str) -> np.ndarray:
+        """(hours, channels) view of one home."""
+        return self.data[self.row(home_id)]
+    
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        if self.mode != 'r':
+            self.data.flush()
+
+
+def _optional_list(values, n_homes: int) -> Optional[list]:
+    if values is None:
+        return None
+    return np.broadcast_to(np.asarray(values, dtype=float), (n_homes,)).tolist()
+
+
+def _optional_array(values) -> Optional[np.ndarray]:
+    return None if values is None else np.asarray(values, dtype=float)
+
+
+def dispatch_store(
+    inputs: FleetStore,
+    out_path: str,
+    battery_capacity_kwh=None,
+    initial_soc=0.5,
+    pool_availability_kwh=None,
+    block_homes: int = 4096,
+    workers: int = 1,
+    backend: Optional[str] = None,
+    policy_mode: str = POLICY_SELF_FIRST,
+) -> FleetStore:
+    """
+    Run batch dispatch over a store, one block of homes at a time.
+    
+    Each block reads its PV and load straight from the mapped inputs and
+    writes its results into a new store with DISPATCH_CHANNELS, so memory
+    use is bounded by block_homes whatever the fleet size.
+    
+    Args:
+        inputs: Store with INPUT_CHANNELS
+        out_path: Directory for the output store
+        battery_capacity_kwh: Battery capacity per home (scalar or one per
+            home; None = capacities recorded in the input store)
+        initial_soc: Initial SOC per home (scalar)
+        pool_availability_kwh: Pool availability per hour, broadcastable to
+            (homes, hours) (None = unlimited)
+        block_homes: Homes dispatched per block
+        workers: Worker processes (1 = run in this process)
+        backend: Kernel backend "auto", "numba" or "python" (None = config default)
+        policy_mode: 'self_first' or 'community_first' (community_first
+            shares within each block only)
+    
+    Returns:
+        Output FleetStore
+    """
+    if battery_capacity_kwh is None:
+        if inputs.battery_capacity_kwh is None:
+            raise ValueError("Input store has no battery capacities; pass battery_capacity_kwh")
+        battery_capacity_kwh = inputs.battery_capacity_kwh
+    capacity = np.broadcast_to(np.asarray(battery_capacity_kwh, dtype=float), (len(inputs),))
+    
+    outputs = FleetStore.create(
+        out_path, inputs.home_ids, inputs.start, inputs.hours,
+        channels=DISPATCH_CHANNELS,
+        solar_capacity_kw=inputs.solar_capacity_kw,
+        battery_capacity_kwh=capacity,
+    )
+    starts = range(0, len(inputs), block_homes)
+    tasks = [
+        (inputs, outputs, start, min(start + block_homes, len(inputs)),
+         initial_soc, pool_availability_kwh, backend, policy_mode)
+        for start in starts
+    ]
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_dispatch_block, *zip(*tasks)))
+        return FleetStore(out_path, mode='r+')
+    
+    for task in tasks:
+        _dispatch_block(*task)
+    return outputs
+
+
+def _dispatch_block(
+    inputs: FleetStore,
+    outputs: FleetStore,
+    start: int,
+    stop: int,
+    initial_soc,
+    pool_availability_kwh,
+    backend: Optional[str],
+    policy_mode: str,
+) -> None:
+    batch = run_dispatch_batch(
+        inputs.channel('pv_production_kwh')[start:stop],
+        inputs.channel('load_consumption_kwh')[start:stop],
+        outputs.battery_capacity_kwh[start:stop],
+        initial_soc=initial_soc,
+        pool_availability_kwh=pool_availability_kwh,
+        backend=backend,
+        policy_mode=policy_mode,
+    )
+    for channel in DISPATCH_CHANNELS:
+        outputs.channel(channel)[start:stop] = batch[channel]
+    outputs.flush()
+
+
+def match_store_pool(
+    inputs: FleetStore,
+    outputs: FleetStore,
+    block_hours: int = 24 * 7,
+    initial_credits_kwh: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Apply community pool matching to a dispatched store in place.
+    
+    Matching is independent hour by hour, so the fleet is processed in
+    blocks of hours with the credit balance carried between blocks; the
+    result equals matching the whole horizon at once, as in
+    simulate_community_pool.
+    
+    Args:
+        inputs: Store with INPUT_CHANNELS
+        outputs: Store written by dispatch_store (opened 'r+')
+        block_hours: Hours matched per block
+        initial_credits_kwh: Credit balance per home carried in (None = zero)
+    """
+    credits_balance = None
+    if initial_credits_kwh is not None:
+        credits_balance = np.asarray(initial_credits_kwh, dtype=float).reshape(1, len(inputs))
+    
+    for start in range(0, inputs.hours, block_hours):
+        hours = slice(start, min(start + block_hours, inputs.hours))
+        
+        def hour_major(store, channel):
+            return np.ascontiguousarray(store.channel(channel)[:, hours].T)
+        
+        net = compute_net_available(
+            hour_major(inputs, 'pv_production_kwh'),
+            hour_major(inputs, 'load_consumption_kwh'),
+            hour_major(outputs, 'battery_flow_kwh'),
+        )
+        to_pool, from_pool = match_pool_greedy(net)
+        grid_import = grid_import_after_pool(net, from_pool, hour_major(outputs, 'grid_import_kwh'))
+        
+        credits_delta = to_pool - from_pool
+        if credits_balance is None:
+            balance = np.cumsum(credits_delta, axis=0)
+        else:
+            balance = np.cumsum(np.vstack([credits_balance, credits_delta]), axis=0)[1:]
+        credits_balance = balance[-1:]
+        
+        outputs.channel('to_pool_kwh')[:, hours] = to_pool.T
+        outputs.channel('from_pool_kwh')[:, hours] = from_pool.T
+        outputs.channel('grid_import_kwh')[:, hours] = grid_import.T
+        outputs.channel('credits_balance_kwh')[:, hours] = balance.T
+    outputs.flush()
+
+
+def read_store_result(
+    inputs: FleetStore,
+    outputs: FleetStore,
+    home_ids: Optional[Sequence[str]] = None,
+    pool_availability_kwh=None,
+    policy_mode: str = POLICY_SELF_FIRST,
+) -> DispatchResult:
+    """
+    Load dispatch results for some homes as a DispatchResult.
+    
+    Args:
+        inputs: Store with INPUT_CHANNELS
+        outputs: Store written by dispatch_store
+        home_ids: Homes to load (None = all)
+        pool_availability_kwh: Pool availability used for dispatch (None = unlimited)
+        policy_mode: Dispatch policy recorded in the output
+    
+    Returns:
+        DispatchResult for the selected homes
+    """
+    rows = slice(None) if home_ids is None else [inputs.row(home_id) for home_id in home_ids]
+    batch: Dict[str, np.ndarray] = {
+        channel: np.asarray(outputs.channel(channel)[rows]) for channel in DISPATCH_CHANNELS
+    }
+    solar = inputs.solar_capacity_kw
+    return DispatchResult.from_batch(
+        batch,
+        timestamps=inputs.timestamps.to_numpy(),
+        home_ids=np.asarray(inputs.home_ids, dtype=object)[rows],
+        pv_production_kwh=np.asarray(inputs.channel('pv_production_kwh')[rows]),
+        load_consumption_kwh=np.asarray(inputs.channel('load_consumption_kwh')[rows]),
+        battery_capacity_kwh=outputs.battery_capacity_kwh[rows],
+        solar_capacity_kw=np.nan if solar is None else solar[rows],
+        pool_availability_kwh=pool_availability_kwh,
+        policy_mode=policy_mode,
+    )
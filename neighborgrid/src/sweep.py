@@ -0,0 +1,83 @@
+"""
+Parameter sweeps over battery and solar sizing for a single home
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from neighborgrid.src.simulator import make_community_timeseries
+from neighborgrid.src.dispatch import run_dispatch_batch, compute_summary_stats_batch
+
+
+def run_sweep(
+    start_date: str,
+    hours: int,
+    solar_kw_values: List[float],
+    battery_kwh_values: List[float],
+    initial_soc_values: List[float] = (0.5,),
+    load_base_kwh: float = 0.6,
+    load_peak_kwh: float = 1.2,
+    seed: Optional[int] = None,
+    pool_availability_kwh: Optional[List[float]] = None,
+    batch_size: int = 256,
+    backend: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Dispatch every combination of solar size, battery size and initial SOC.
+    
+    The load profile and the PV shape are generated once and shared by all
+    combinations (PV scales linearly with solar capacity). Combinations are
+    dispatched together with run_dispatch_batch, batch_size at a time, and
+    no hourly results are kept.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format
+        hours: Number of hours to simulate
+        solar_kw_values: Solar capacities in kW
+        battery_kwh_values: Battery capacities in kWh
+        initial_soc_values: Initial SOC fractions 0-1
+        load_base_kwh: Base load consumption per hour (kWh)
+        load_peak_kwh: Peak load consumption per hour (kWh)
+        seed: Seed for the shared load profile (None = fresh entropy)
+        pool_availability_kwh: Available kWh from pool per hour (None = unlimited)
+        batch_size: Combinations dispatched per batch (bounds memory)
+        backend: Dispatch kernel backend (None = config default)
+    
+    Returns:
+        DataFrame with one row per combination: solar_kw, battery_kwh,
+        initial_soc and the compute_summary_stats columns
+    """
+    # Unit (1 kW) PV shape and the load profile, shared by every combination
+    _, unit_pv, load = make_community_timeseries(
+        start_date=start_date,
+        hours=hours,
+        solar_kw=1.0,
+        load_base_kwh=load_base_kwh,
+        load_peak_kwh=load_peak_kwh,
+        seed=seed,
+    )
+    
+    grid = np.array(
+        list(itertools.product(solar_kw_values, battery_kwh_values, initial_soc_values)),
+        dtype=float,
+    ).reshape(-1, 3)
+    
+    stats = []
+    for start in range(0, len(grid), batch_size):
+        solar, battery, soc = grid[start:start + batch_size].T
+        pv = solar[:, np.newaxis] * unit_pv
+        batch_load = np.broadcast_to(load, pv.shape)
+        
+        batch = run_dispatch_batch(
+            pv,
+            batch_load,
+            battery,
+            initial_soc=soc,
+            pool_availability_kwh=pool_availability_kwh,
+            backend=backend,
+        )
+        stats.append(pd.DataFrame(compute_summary_stats_batch(batch, pv, batch_load)))
+    
+    table = pd.DataFrame(grid, columns=['solar_kw', 'battery_kwh', 'initial_soc'])
+    return pd.concat([table, pd.concat(stats, ignore_index=True)], axis=1)
@@ -0,0 +1,73 @@
+"""
+Test multi-level rollups of dispatch results
+"""
+
+import numpy as np
+import pandas as pd
+from neighborgrid.src.run_multi import simulate_community, COMMUNITY_HOMES
+from neighborgrid.src.aggregate import (
+    compute_rollups,
+    daily_rollups,
+    SUM_COLUMNS,
+    LEVEL_HOME,
+    LEVEL_DAY,
+    LEVEL_HOME_DAY,
+    LEVEL_HOUR_OF_DAY,
+    LEVEL_COMMUNITY,
+)
+
+
+def _community(hours=72):
+    return simulate_community(COMMUNITY_HOMES[:4], "2025-06-01", hours, seed=5)
+
+
+def test_rollup_levels_are_consistent():
+    """Test that every level sums to the same community totals as the raw rows"""
+    df = _community()
+    rollups = compute_rollups(df)
+    
+    for column in ['pv_production_kwh', 'load_consumption_kwh', 'from_pool_kwh', 'grid_import_kwh']:
+        expected = df[column].sum()
+        for level in [LEVEL_HOME, LEVEL_DAY, LEVEL_HOME_DAY, LEVEL_HOUR_OF_DAY, LEVEL_COMMUNITY]:
+            assert np.isclose(rollups[level][column].sum(), expected)
+    
+    assert len(rollups[LEVEL_HOME]) == 4
+    assert len(rollups[LEVEL_DAY]) == 3
+    assert len(rollups[LEVEL_HOUR_OF_DAY]) == 24
+    assert set(SUM_COLUMNS) <= set(rollups[LEVEL_COMMUNITY].columns)
+
+
+def test_rollups_match_row_loop():
+    """Test that per-home totals and ratios match a straightforward per-home loop"""
+    df = _community()
+    home = compute_rollups(df)[LEVEL_HOME]
+    
+    for home_id, rows in df.groupby('home_id'):
+        self_consumption = sum(min(pv, load) for pv, load in zip(rows['pv_production_kwh'], rows['load_consumption_kwh']))
+        load = rows['load_consumption_kwh'].sum()
+        totals = home.loc[home_id]
+        
+        assert np.isclose(totals['self_consumption_kwh'], self_consumption)
+        assert np.isclose(totals['self_sufficiency_pct'], (1 - rows['grid_import_kwh'].sum() / load) * 100)
+        assert np.isclose(totals['pool_share_pct'], rows['from_pool_kwh'].sum() / load * 100)
+        assert np.isclose(totals['net_pool_usd'], totals['pool_earnings_usd'] - totals['pool_payments_usd'])
+
+
+def test_daily_rollups_shape():
+    """Test that daily records follow the simulator's DailyRollup layout"""
+    df = _community(48)
+    records = daily_rollups(compute_rollups(df))
+    
+    assert [record['date'] for record in records] == ['2025-06-01', '2025-06-02']
+    day = records[0]
+    assert set(day) == {
+        'date', 'production_kwh', 'microgrid_used_kwh', 'grid_import_kwh',
+        'grid_export_kwh', 'unserved_kwh', 'homes',
+    }
+    assert [h['id'] for h in day['homes']] == sorted(df['home_id'].unique())
+    assert np.isclose(sum(h['produced_kwh'] for h in day['homes']), day['production_kwh'])
+    assert np.isclose(sum(h['received_kwh'] for h in day['homes']), day['microgrid_used_kwh'])
+    assert day['grid_export_kwh'] >= 0
+    
+    first_day = df[pd.to_datetime(df['timestamp_hour']) < pd.Timestamp('2025-06-02')]
+    assert np.isclose(day['grid_import_kwh'], first_day['grid_import_kwh'].sum())
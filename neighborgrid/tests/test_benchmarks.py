@@ -0,0 +1,18 @@
+"""
+Smoke test for the benchmark harness
+"""
+
+import json
+from neighborgrid.benchmarks.run_benchmarks import run_benchmarks
+
+
+def test_benchmark_report_is_json_serializable():
+    """Test that a tiny benchmark grid produces one record per function and size"""
+    report = run_benchmarks(homes=[2], hours=[24], repeat=1)
+    
+    names = {record['benchmark'] for record in report['results']}
+    assert 'run_dispatch_single' in names
+    assert 'simulate_community_pool' in names
+    assert 'simulate_community_pool_pro_rata' in names
+    assert all(record['best_s'] >= 0 for record in report['results'])
+    json.dumps(report)
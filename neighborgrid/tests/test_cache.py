@@ -0,0 +1,58 @@
+"""
+Test the simulation result cache
+"""
+
+import os
+import pandas as pd
+from neighborgrid.src import config
+from neighborgrid.src.run_multi import COMMUNITY_HOMES, simulate_community
+from neighborgrid.src.cache import ResultCache, cache_key, code_version
+
+
+def test_cache_key_covers_inputs(monkeypatch):
+    """Test that keys are stable for equal inputs and change with inputs or config"""
+    key = cache_key("run_multi", homes=COMMUNITY_HOMES, seed=1, hours=24)
+    
+    assert key == cache_key("run_multi", hours=24, seed=1, homes=COMMUNITY_HOMES)
+    assert key != cache_key("run_multi", homes=COMMUNITY_HOMES, seed=2, hours=24)
+    assert key != cache_key("run_single", homes=COMMUNITY_HOMES, seed=1, hours=24)
+    assert code_version().startswith("0.")
+    
+    monkeypatch.setattr(config, "BATTERY_EFFICIENCY", 0.9)
+    assert key != cache_key("run_multi", homes=COMMUNITY_HOMES, seed=1, hours=24)
+
+
+def test_get_or_compute_hits(tmp_path):
+    """Test that a second identical request is served from disk without recomputing"""
+    cache = ResultCache(str(tmp_path))
+    key = cache_key("run_multi", homes=COMMUNITY_HOMES[:3], seed=5, hours=48)
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        return simulate_community(COMMUNITY_HOMES[:3], "2025-10-01", 48, seed=5)
+    
+    first, first_hit = cache.get_or_compute(key, compute)
+    second, second_hit = cache.get_or_compute(key, compute)
+    
+    assert (first_hit, second_hit) == (False, True)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_lru_eviction(tmp_path):
+    """Test that least recently used entries are evicted once over the size limit"""
+    frame = pd.DataFrame({'value': range(1000)})
+    cache = ResultCache(str(tmp_path), max_bytes=10 ** 9)
+    cache.put("a", frame)
+    entry_size = os.path.getsize(tmp_path / "a.pkl")
+    cache.max_bytes = 2 * entry_size
+    
+    cache.put("b", frame)
+    os.utime(tmp_path / "a.pkl", ns=(0, 0))
+    os.utime(tmp_path / "b.pkl", ns=(1, 1))
+    assert cache.get("a") is not None  # Touching "a" makes "b" the oldest
+    cache.put("c", frame)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
@@ -0,0 +1,67 @@
+"""
+Test multi-resolution chart data and LTTB downsampling
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from neighborgrid.src.run_multi import simulate_community, COMMUNITY_HOMES
+from neighborgrid.src.charts import (
+    lttb_indices,
+    resample_dispatch,
+    write_chart_data,
+    RESOLUTIONS,
+)
+
+
+def test_resample_matches_groupby():
+    """Test that daily and weekly buckets match a pandas resample of each home"""
+    df = simulate_community(COMMUNITY_HOMES[:3], "2025-06-01", 24 * 10, seed=4)
+    
+    for resolution, period in [('daily', 'D'), ('weekly', 'W')]:
+        times, home_ids, metrics = resample_dispatch(df, resolution)
+        for h, home_id in enumerate(home_ids):
+            rows = df[df['home_id'] == home_id]
+            buckets = pd.to_datetime(rows['timestamp_hour']).dt.to_period(period)
+            expected = rows.groupby(buckets)[['grid_import_kwh', 'battery_soc_pct']]
+            assert np.allclose(metrics['grid_import_kwh'][:, h], expected.sum()['grid_import_kwh'])
+            assert np.allclose(metrics['battery_soc_pct'][:, h], expected.mean()['battery_soc_pct'])
+    assert times[0] == pd.Timestamp('2025-05-26')  # Monday starting the first week
+
+
+def test_lttb_keeps_extremes_and_endpoints():
+    """Test that LTTB keeps endpoints, preserves order and picks up isolated spikes"""
+    y = np.zeros((2, 5000))
+    y[0, 1234] = 10.0
+    y[1] = np.sin(np.linspace(0, 30, 5000))
+    kept = lttb_indices(y, 200)
+    
+    assert kept.shape == (2, 200)
+    assert (kept[:, 0] == 0).all() and (kept[:, -1] == 4999).all()
+    assert (np.diff(kept, axis=1) > 0).all()
+    assert 1234 in kept[0]
+    assert np.abs(y[1, kept[1]]).max() > 0.99
+    
+    short = lttb_indices(y[:, :50], 200)
+    assert (short == np.arange(50)).all()
+
+
+def test_chart_files_are_capped(tmp_path):
+    """Test that written series never exceed max_points and totals survive undownsampled"""
+    df = simulate_community(COMMUNITY_HOMES[:2], "2025-06-01", 24 * 30, seed=4)
+    paths = write_chart_data(df, str(tmp_path), max_points=100)
+    
+    assert len(paths) == 4  # index, community, two homes
+    index = json.loads((tmp_path / 'index.json').read_text())
+    assert index['resolutions'] == list(RESOLUTIONS)
+    assert index['start'] == '2025-06-01T00:00:00'
+    
+    community = json.loads((tmp_path / 'community.json').read_text())
+    for resolution, charts in community.items():
+        for series in charts.values():
+            assert len(series['t']) == len(series['v']) <= 100
+    assert len(community['hourly']['pv_production_kwh']['t']) == 100
+    assert np.isclose(sum(community['daily']['pv_production_kwh']['v']), df['pv_production_kwh'].sum())
+    
+    home = json.loads((tmp_path / 'homes' / f"{index['homes'][0]}.json").read_text())
+    assert set(home) == set(RESOLUTIONS)
@@ -0,0 +1,98 @@
+"""
+Test incremental community simulation state
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from neighborgrid.src.simulator import make_community_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single
+from neighborgrid.src.run_multi import COMMUNITY_HOMES, simulate_community_pool
+from neighborgrid.src.community import CommunityState
+
+HOURS = 72
+
+
+@pytest.fixture(scope="module")
+def community_inputs():
+    homes = COMMUNITY_HOMES[::-1]  # Not sorted by home_id
+    timestamps, pv, load = make_community_timeseries(
+        start_date="2025-10-01",
+        hours=HOURS,
+        solar_kw=[home[1] for home in homes],
+        load_base_kwh=[home[3] for home in homes],
+        load_peak_kwh=[home[4] for home in homes],
+        solar_orientation_offset=[home[5] for home in homes],
+        load_pattern_shift=[home[6] for home in homes],
+        seed=3,
+    )
+    return homes, timestamps, pv, load
+
+
+def _full_run(homes, timestamps, pv, load):
+    results = []
+    for i, home in enumerate(homes):
+        timeseries = pd.DataFrame({
+            'timestamp_hour': timestamps,
+            'pv_production_kwh': pv[i],
+            'load_consumption_kwh': load[i],
+        })
+        result = run_dispatch_single(timeseries, home[2], home[1], 0.5, [0] * HOURS)
+        result['home_id'] = home[0]
+        results.append(result)
+    return simulate_community_pool(results, "2025-10-01", HOURS)
+
+
+def test_advance_matches_full_run(community_inputs, tmp_path):
+    """Test that advancing in steps reproduces a full-horizon simulation"""
+    homes, timestamps, pv, load = community_inputs
+    expected = _full_run(homes, timestamps, pv, load)
+    
+    state = CommunityState.from_homes(homes, "2025-10-01")
+    parts = []
+    position = 0
+    for step in [1, 1, 22, 24, 24]:
+        parts.append(state.advance(pv[:, position:position + step], load[:, position:position + step]))
+        position += step
+        if position == 24:
+            # Round-trip through disk mid-run
+            state.save(str(tmp_path / "state.npz"))
+            state = CommunityState.load(str(tmp_path / "state.npz"))
+    
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), expected)
+    assert state.steps_simulated == HOURS
+    assert state.next_timestamp == pd.Timestamp("2025-10-04")
+
+
+def test_state_tracks_final_credits(community_inputs):
+    """Test that stored credits equal each home's last credit balance"""
+    homes, _, pv, load = community_inputs
+    state = CommunityState.from_homes(homes, "2025-10-01")
+    
+    result = state.advance(pv, load)
+    
+    last = result.groupby('home_id')['credits_balance_kwh'].last()
+    np.testing.assert_array_equal(state.credits_kwh, last.loc[state.home_ids].to_numpy())
+    assert ((state.soc >= 0.2) & (state.soc <= 0.95)).all()
+
+
+def test_sub_hourly_single_steps(tmp_path):
+    """Test that one-step advances at 15-minute steps match one long advance"""
+    homes = COMMUNITY_HOMES[:4]
+    _, pv, load = make_community_timeseries(
+        start_date="2025-10-01",
+        hours=24,
+        solar_kw=[home[1] for home in homes],
+        seed=5,
+        timestep_minutes=15,
+    )
+    expected = CommunityState.from_homes(homes, "2025-10-01", timestep_minutes=15).advance(pv, load)
+    
+    state = CommunityState.from_homes(homes, "2025-10-01", timestep_minutes=15)
+    parts = [state.advance(pv[:, :1], load[:, :1])]
+    state.save(str(tmp_path / "state.npz"))
+    state = CommunityState.load(str(tmp_path / "state.npz"))
+    parts += [state.advance(pv[:, i:i + 1], load[:, i:i + 1]) for i in range(1, pv.shape[1])]
+    
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), expected)
+    assert state.next_timestamp == pd.Timestamp("2025-10-02")
@@ -0,0 +1,88 @@
+"""
+Test the bulk exporter against the SQLite stand-in schema
+"""
+
+import sqlite3
+import pandas as pd
+from neighborgrid.src.run_multi import simulate_community, COMMUNITY_HOMES
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single
+from neighborgrid.src.db_export import (
+    export_results,
+    pool_ledger_frame,
+    tick_state_frame,
+    SQLiteLoader,
+    TABLE_COLUMNS,
+)
+
+MICROGRID_ID = '00000000-0000-0000-0000-000000000001'
+
+
+def _export(df, path, **kwargs):
+    loader = SQLiteLoader(str(path))
+    counts = export_results(df, loader, MICROGRID_ID, **kwargs)
+    loader.close()
+    return counts, sqlite3.connect(str(path))
+
+
+def test_export_community_tables(tmp_path):
+    """Test that all five tables are filled and agree with the dispatch totals"""
+    df = simulate_community(COMMUNITY_HOMES[:5], "2025-06-01", 48, seed=3)
+    counts, conn = _export(df, tmp_path / "grid.db", batch_rows=100)
+    
+    assert counts['tick_state'] == len(df)
+    assert counts['tick_state_community'] == 48
+    assert counts['rollup_daily_home'] == 10
+    assert counts['rollup_daily_community'] == 2
+    for table in TABLE_COLUMNS:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == counts[table]
+    
+    pv_w, import_w = conn.execute("SELECT SUM(pv_w), SUM(grid_import_w) FROM tick_state").fetchone()
+    assert abs(pv_w - df['pv_production_kwh'].sum() * 1000) <= len(df)
+    assert abs(import_w - df['grid_import_kwh'].sum() * 1000) <= len(df)
+    
+    prod_wh = conn.execute("SELECT SUM(prod_wh) FROM rollup_daily_community").fetchone()[0]
+    home_prod_wh = conn.execute("SELECT SUM(prod_wh) FROM rollup_daily_home").fetchone()[0]
+    assert abs(prod_wh - home_prod_wh) <= 10
+    
+    ts = conn.execute("SELECT ts FROM tick_state_community ORDER BY ts LIMIT 1").fetchone()[0]
+    assert ts == '2025-06-01 00:00:00+0000'
+
+
+def test_sub_hourly_ticks_are_power():
+    """Test that sub-hourly energy per step is written as average power in W"""
+    df = pd.DataFrame({
+        'timestamp_hour': ['2025-06-01 12:00:00'],
+        'home_id': ['H001'],
+        'pv_production_kwh': [0.5],
+        'load_consumption_kwh': [0.25],
+        'battery_soc_pct': [55.0],
+        'battery_flow_kwh': [0.25],
+        'to_pool_kwh': [0.0],
+        'from_pool_kwh': [0.0],
+        'grid_import_kwh': [0.0],
+    })
+    ticks = tick_state_frame(df, MICROGRID_ID, timestep_minutes=15)
+    
+    assert list(ticks.columns) == TABLE_COLUMNS['tick_state']
+    assert (ticks.loc[0, 'pv_w'], ticks.loc[0, 'load_w'], ticks.loc[0, 'soc_pct']) == (2000, 1000, 55)
+    assert ticks.loc[0, 'grid_export_w'] == 0
+
+
+def test_pool_ledger_pairs():
+    """Test that ledger pairs split each step's pool energy pro rata and skip self flows"""
+    df = pd.DataFrame({
+        'timestamp_hour': ['2025-06-01 12:00:00'] * 3 + ['2025-06-01 13:00:00'] * 3,
+        'home_id': ['H001', 'H002', 'H003'] * 2,
+        'to_pool_kwh': [3.0, 1.0, 0.0, 4.0, 0.0, 0.0],
+        'from_pool_kwh': [0.0, 0.0, 4.0, 0.0, 2.0, 2.0],
+    })
+    ledger = pool_ledger_frame(df, MICROGRID_ID)
+    flows = {(row.from_home, row.to_home): row.kwh for row in ledger.itertuples()}
+    
+    assert flows == {('H001', 'H003'): 5, ('H001', 'H002'): 2, ('H002', 'H003'): 1}
+    assert ledger['ts'].unique().tolist() == ['2025-06-01 00:00:00+0000']
+    
+    single = run_dispatch_single(make_single_home_timeseries("2025-06-01", 48, solar_kw=6.0, seed=1), 10.0, 6.0)
+    assert len(pool_ledger_frame(single, MICROGRID_ID)) == 0
+    assert single['to_pool_kwh'].sum() > 0
@@ -3,10 +3,17 @@ Test dispatch algorithm invariants and logic
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 from neighborgrid.src.simulator import make_single_home_timeseries
-from neighborgrid.src.dispatch import run_dispatch_single, compute_summary_stats
-from neighborgrid.src.config import BATTERY_MIN_SOC, BATTERY_MAX_SOC
+from neighborgrid.src.dispatch import (
+    run_dispatch_single,
+    run_dispatch_batch,
+    batch_to_dataframe,
+    iter_dispatch_chunks,
+    compute_summary_stats,
+)
+from neighborgrid.src.config import BATTERY_MIN_SOC, BATTERY_MAX_SOC, POLICY_COMMUNITY_FIRST
 
 
 def test_dispatch_basic_run():
@@ -209,3 +216,133 @@ def test_no_solar_scenario():
     assert stats['total_pv_kwh'] == 0.0
     assert stats['total_grid_import_kwh'] > 0, "Should need grid import without solar"
 
+
+def test_batch_matches_single_dispatch():
+    """Test that batch dispatch reproduces the scalar dispatch for every home"""
+    homes = [(8.0, 13.5, 0.3), (3.5, 5.0, 0.9), (6.0, 10.0, 0.5), (15.0, 7.0, 0.2)]
+    timeseries = [
+        make_single_home_timeseries(start_date="2025-10-04", hours=72, solar_kw=solar_kw)
+        for solar_kw, _, _ in homes
+    ]
+    pv = np.array([ts['pv_production_kwh'].values for ts in timeseries])
+    load = np.array([ts['load_consumption_kwh'].values for ts in timeseries])
+    pool = np.random.default_rng(7).uniform(0.0, 2.0, size=pv.shape)
+    
+    batch = run_dispatch_batch(
+        pv,
+        load,
+        battery_capacity_kwh=[h[1] for h in homes],
+        initial_soc=[h[2] for h in homes],
+        pool_availability_kwh=pool,
+    )
+    batch_df = batch_to_dataframe(
+        batch,
+        timestamps=timeseries[0]['timestamp_hour'].values,
+        home_ids=['H001'] * len(homes),
+        pv_production_kwh=pv,
+        load_consumption_kwh=load,
+        battery_capacity_kwh=[h[1] for h in homes],
+        solar_capacity_kw=[h[0] for h in homes],
+        pool_availability_kwh=pool,
+    )
+    
+    for i, (solar_kw, battery_kwh, initial_soc) in enumerate(homes):
+        expected = run_dispatch_single(
+            timeseries=timeseries[i],
+            battery_capacity_kwh=battery_kwh,
+            solar_capacity_kw=solar_kw,
+            initial_soc=initial_soc,
+            pool_availability_kwh=list(pool[i]),
+        )
+        actual = batch_df.iloc[i * 72:(i + 1) * 72].reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            actual.drop(columns=['timestamp_hour']),
+            expected.drop(columns=['timestamp_hour']),
+            check_dtype=False,
+            atol=1e-9,
+        )
+
+
+def test_batch_final_state():
+    """Test that batch dispatch reports the end-of-horizon SOC and credits"""
+    pv = np.array([[0.0] * 24, [5.0] * 24])
+    load = np.array([[0.8] * 24, [1.0] * 24])
+    
+    batch = run_dispatch_batch(pv, load, battery_capacity_kwh=10.0, initial_soc=0.5)
+    
+    assert batch['final_soc'][0] == pytest.approx(BATTERY_MIN_SOC)
+    assert batch['final_soc'][1] == pytest.approx(BATTERY_MAX_SOC)
+    assert batch['final_soc'] * 100 == pytest.approx(batch['battery_soc_pct'][:, -1])
+    assert batch['final_credits_kwh'] == pytest.approx(batch['credits_balance_kwh'][:, -1])
+
+
+def test_chunked_dispatch_matches_full_run():
+    """Test that SOC and credits carry across chunk boundaries"""
+    timeseries = make_single_home_timeseries(
+        start_date="2025-10-04",
+        hours=24 * 10,
+        solar_kw=8.0,
+        seed=5,
+    )
+    pool = np.random.default_rng(5).uniform(0.0, 2.0, size=len(timeseries))
+    
+    expected = run_dispatch_single(timeseries, 10.0, 8.0, initial_soc=0.4, pool_availability_kwh=list(pool))
+    chunks = (timeseries.iloc[start:start + 37] for start in range(0, len(timeseries), 37))
+    actual = pd.concat(
+        iter_dispatch_chunks(chunks, 10.0, 8.0, initial_soc=0.4, pool_availability_kwh=pool),
+        ignore_index=True,
+    )
+    
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_short_pool_availability_rejected():
+    """Test that a pool availability list shorter than the timeseries is rejected"""
+    timeseries = make_single_home_timeseries("2025-10-04", 24, solar_kw=6.0, seed=1)
+    with pytest.raises(ValueError, match="shorter than the timeseries"):
+        run_dispatch_single(timeseries, 10.0, 6.0, pool_availability_kwh=[0.0] * 12)
+
+
+def test_community_first_shares_before_charging():
+    """Test that surplus covers a neighbour's deficit before charging the home's battery"""
+    pv = np.array([[3.0], [0.0]])
+    load = np.array([[1.0], [1.5]])
+    
+    batch = run_dispatch_batch(pv, load, 10.0, initial_soc=0.5, policy_mode=POLICY_COMMUNITY_FIRST)
+    
+    assert batch['from_pool_kwh'][1, 0] == pytest.approx(1.5)
+    assert batch['grid_import_kwh'][1, 0] == 0.0
+    assert batch['battery_flow_kwh'][1, 0] == 0.0  # Neighbour's battery untouched
+    assert batch['battery_flow_kwh'][0, 0] == pytest.approx(0.5)  # Only leftover charges
+    assert batch['to_pool_kwh'][0, 0] == pytest.approx(1.5)
+    assert batch['credits_balance_kwh'][:, 0] == pytest.approx([1.5, -1.5])
+
+
+def test_community_first_energy_balance():
+    """Test that community-first dispatch conserves energy for every home and hour"""
+    rng = np.random.default_rng(5)
+    pv = rng.uniform(0.0, 3.0, size=(12, 96))
+    load = rng.uniform(0.2, 2.0, size=(12, 96))
+    capacity = rng.choice([0.0, 5.0, 13.5], size=12)
+    
+    batch = run_dispatch_batch(pv, load, capacity, policy_mode=POLICY_COMMUNITY_FIRST)
+    
+    # Whatever is left over is grid export, and only surplus homes export
+    exported = (
+        pv - load - batch['battery_flow_kwh'] - batch['to_pool_kwh']
+        + batch['from_pool_kwh'] + batch['grid_import_kwh']
+    )
+    assert np.all(exported >= -1e-9)
+    assert np.allclose(exported[pv <= load], 0.0)
+    # Every kWh sent to the pool is received by a neighbour in the same hour
+    assert np.allclose(batch['to_pool_kwh'].sum(0), batch['from_pool_kwh'].sum(0))
+    assert np.allclose(batch['credits_balance_kwh'][:, -1].sum(), 0.0)
+    assert np.all(batch['battery_soc_pct'] >= BATTERY_MIN_SOC * 100 - 1e-9)
+    assert np.all(batch['battery_soc_pct'] <= BATTERY_MAX_SOC * 100 + 1e-9)
+
+
+def test_single_dispatch_rejects_community_first():
+    """Test that single-home dispatch refuses community-first, which needs the whole community"""
+    timeseries = make_single_home_timeseries("2025-10-04", 24, solar_kw=6.0, seed=1)
+    with pytest.raises(ValueError):
+        run_dispatch_single(timeseries, 10.0, 6.0, policy_mode=POLICY_COMMUNITY_FIRST)
@@ -0,0 +1,161 @@
+"""
+Test dispatch result input/output
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single, iter_dispatch_chunks
+from neighborgrid.src.run_multi import COMMUNITY_HOMES, simulate_community
+from neighborgrid.src.io_utils import (
+    write_dispatch_csv,
+    read_dispatch_csv,
+    write_dispatch_parquet,
+    read_dispatch_parquet,
+    read_timeseries_chunks,
+    DispatchCsvWriter,
+    DispatchParquetWriter,
+    load_meter_data,
+    meter_table_to_arrays,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="module")
+def community_result():
+    return simulate_community(COMMUNITY_HOMES[:4], "2025-10-01", hours=72, seed=3)
+
+
+def test_csv_round_trip(tmp_path, community_result):
+    """Test that CSV output reads back with parsed timestamps"""
+    filepath = tmp_path / "out.csv"
+    write_dispatch_csv(community_result, str(filepath))
+    
+    df = read_dispatch_csv(str(filepath))
+    
+    assert len(df) == len(community_result)
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp_hour'])
+
+
+@pytest.mark.parametrize("partition_by", [None, "day", "home_id"])
+def test_parquet_round_trip(tmp_path, community_result, partition_by):
+    """Test Parquet output with compact dtypes and pushed-down filters"""
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "out.parquet"
+    write_dispatch_parquet(community_result, str(path), partition_by=partition_by)
+    
+    df = read_dispatch_parquet(str(path))
+    assert list(df.columns) == list(community_result.columns)
+    assert len(df) == len(community_result)
+    assert isinstance(df['home_id'].dtype, pd.CategoricalDtype)
+    assert df['grid_import_kwh'].dtype == np.float32
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp_hour'])
+    
+    subset = read_dispatch_parquet(
+        str(path),
+        columns=['timestamp_hour', 'home_id', 'grid_import_kwh'],
+        start="2025-10-02",
+        end="2025-10-03",
+        home_ids=['H002'],
+    )
+    assert list(subset.columns) == ['timestamp_hour', 'home_id', 'grid_import_kwh']
+    assert len(subset) == 24
+    assert (subset['home_id'] == 'H002').all()
+    assert subset['timestamp_hour'].min() == pd.Timestamp("2025-10-02")
+
+
+def test_streaming_writers(tmp_path):
+    """Test that chunked dispatch streams from CSV input to CSV and Parquet"""
+    timeseries = make_single_home_timeseries("2025-10-01", hours=24 * 7, solar_kw=6.0, seed=2)
+    input_path = tmp_path / "timeseries.csv"
+    timeseries.to_csv(input_path, index=False)
+    expected = run_dispatch_single(timeseries, 10.0, 6.0)
+    
+    csv_path = tmp_path / "stream.csv"
+    with DispatchCsvWriter(str(csv_path)) as writer:
+        for chunk in iter_dispatch_chunks(read_timeseries_chunks(str(input_path), 24), 10.0, 6.0):
+            writer.write(chunk)
+    streamed = read_dispatch_csv(str(csv_path))
+    assert len(streamed) == len(expected)
+    assert np.allclose(streamed['credits_balance_kwh'], expected['credits_balance_kwh'])
+    
+    pytest.importorskip("pyarrow")
+    parquet_path = tmp_path / "stream.parquet"
+    with DispatchParquetWriter(str(parquet_path)) as writer:
+        for chunk in iter_dispatch_chunks(read_timeseries_chunks(str(input_path), 24), 10.0, 6.0):
+            writer.write(chunk)
+    streamed = read_dispatch_parquet(str(parquet_path))
+    assert len(streamed) == len(expected)
+    assert np.allclose(streamed['battery_soc_pct'], expected['battery_soc_pct'], atol=1e-4)
+
+
+def test_meter_table_to_arrays(community_result):
+    """Test that a long meter table reshapes into sorted (homes, hours) arrays"""
+    table = community_result.sample(frac=1.0, random_state=0)  # Arbitrary row order
+    arrays = meter_table_to_arrays(table)
+    
+    assert list(arrays['home_ids']) == sorted(community_result['home_id'].unique())
+    assert arrays['pv_production_kwh'].shape == (4, 72)
+    home = community_result[community_result['home_id'] == arrays['home_ids'][1]]
+    home = home.sort_values('timestamp_hour')
+    assert np.array_equal(arrays['load_consumption_kwh'][1], home['load_consumption_kwh'].to_numpy())
+    assert np.array_equal(arrays['battery_capacity_kwh'], [13.5, 10.0, 12.0, 8.0])
+    
+    with pytest.raises(ValueError):
+        meter_table_to_arrays(table.iloc[1:])
+
+
+def test_meter_data_cache(tmp_path, community_result):
+    """Test that parsed meter data is cached and the cache follows the file contents"""
+    filepath = tmp_path / "meters.csv"
+    cache_dir = tmp_path / "cache"
+    community_result.to_csv(filepath, index=False)
+    
+    first = load_meter_data(str(filepath), cache_dir=str(cache_dir))
+    cached = load_meter_data(str(filepath), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+    for key in first:
+        assert np.array_equal(first[key], cached[key])
+    
+    community_result.assign(pv_production_kwh=0.0).to_csv(filepath, index=False)
+    changed = load_meter_data(str(filepath), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+    assert changed['pv_production_kwh'].sum() == 0.0
+
+
+def test_meter_workbook_with_metadata():
+    """Test that the shipped workbooks load with sizes taken from the metadata workbook"""
+    pytest.importorskip("openpyxl")
+    arrays = load_meter_data(
+        str(REPO_ROOT / "neighborgrid_10homes_5days.xlsx"),
+        metadata_path=str(REPO_ROOT / "neighborgrid_homes_metadata.xlsx"),
+    )
+    
+    assert arrays['pv_production_kwh'].shape == (10, 120)
+    assert not np.isnan(arrays['solar_capacity_kw']).any()
+    assert arrays['home_ids'][0] == 'H001'
+
+
+def test_meter_sheet_does_not_apply_to_metadata(tmp_path, community_result):
+    """Test that the meter sheet name is not used to read the metadata workbook"""
+    pytest.importorskip("openpyxl")
+    meters = tmp_path / "meters.xlsx"
+    with pd.ExcelWriter(meters) as writer:
+        pd.DataFrame({'note': ['summary']}).to_excel(writer, sheet_name="Summary", index=False)
+        community_result.drop(columns=['solar_capacity_kw', 'battery_capacity_kwh']).to_excel(
+            writer, sheet_name="Readings", index=False
+        )
+    metadata = tmp_path / "homes.xlsx"
+    pd.DataFrame({
+        'home_id': ['H001', 'H002', 'H003', 'H004'],
+        'solar_capacity_kw': [8.0, 6.5, 7.5, 5.0],
+        'battery_capacity_kwh': [13.5, 10.0, 12.0, 8.0],
+    }).to_excel(metadata, index=False)
+    
+    arrays = load_meter_data(str(meters), metadata_path=str(metadata), sheet_name="Readings")
+    
+    assert arrays['pv_production_kwh'].shape == (4, 72)
+    assert np.array_equal(arrays['battery_capacity_kwh'], [13.5, 10.0, 12.0, 8.0])
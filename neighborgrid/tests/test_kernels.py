@@ -0,0 +1,74 @@
+"""
+Test dispatch kernel backends
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single, run_dispatch_batch
+from neighborgrid.src.kernels import resolve_backend, numba_available
+
+
+def test_resolve_backend():
+    """Test backend selection and fallback"""
+    expected_auto = "numba" if numba_available() else "python"
+    assert resolve_backend("auto") == expected_auto
+    assert resolve_backend("python") == "python"
+    with pytest.raises(ValueError):
+        resolve_backend("fortran")
+
+
+def test_numba_backend_matches_python():
+    """Test that the compiled kernel gives the same results as pure Python"""
+    pytest.importorskip("numba")
+    timeseries = make_single_home_timeseries(
+        start_date="2025-10-04",
+        hours=24 * 7,
+        solar_kw=8.0,
+    )
+    
+    expected = run_dispatch_single(timeseries, 10.0, 8.0, initial_soc=0.3, backend="python")
+    actual = run_dispatch_single(timeseries, 10.0, 8.0, initial_soc=0.3, backend="numba")
+    assert expected.equals(actual)
+    
+    rng = np.random.default_rng(3)
+    pv = rng.uniform(0.0, 5.0, size=(20, 96))
+    load = rng.uniform(0.2, 2.0, size=(20, 96))
+    capacity = rng.uniform(5.0, 15.0, size=20)
+    expected_batch = run_dispatch_batch(pv, load, capacity, backend="python")
+    actual_batch = run_dispatch_batch(pv, load, capacity, backend="numba")
+    for key in expected_batch:
+        np.testing.assert_array_equal(actual_batch[key], expected_batch[key])
+
+
+def test_power_limit_backends_agree():
+    """Test that battery power limits give the same results on every backend and path"""
+    rng = np.random.default_rng(4)
+    pv = rng.uniform(0.0, 1.5, size=(12, 4 * 48))
+    load = rng.uniform(0.05, 0.6, size=(12, 4 * 48))
+    capacity = rng.uniform(5.0, 15.0, size=12)
+    power = dict(battery_power_kw=rng.uniform(1.0, 4.0, size=12), timestep_minutes=15)
+    
+    expected = run_dispatch_batch(pv, load, capacity, backend="python", **power)
+    flow = expected['battery_flow_kwh']
+    assert np.all(np.abs(flow) <= power['battery_power_kw'][:, np.newaxis] / 4 + 1e-12)
+    assert np.any(np.isclose(np.abs(flow), power['battery_power_kw'][:, np.newaxis] / 4))
+    
+    for backend in ["python", "numba"] if numba_available() else ["python"]:
+        single = run_dispatch_single(
+            _frame(pv[0], load[0]), capacity[0], 6.0, backend=backend,
+            battery_power_kw=power['battery_power_kw'][0], timestep_minutes=15,
+        )
+        np.testing.assert_array_equal(single['battery_flow_kwh'], np.round(flow[0], 4))  # 15-min export keeps 4 dp
+        batch = run_dispatch_batch(pv, load, capacity, backend=backend, **power)
+        for key in expected:
+            np.testing.assert_array_equal(batch[key], expected[key])
+
+
+def _frame(pv, load):
+    return pd.DataFrame({
+        'timestamp_hour': pd.date_range("2025-06-01", periods=len(pv), freq="15min"),
+        'pv_production_kwh': pv,
+        'load_consumption_kwh': load,
+    })
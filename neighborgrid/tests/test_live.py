@@ -0,0 +1,83 @@
+"""
+Test the live tick engine and its SSE server
+"""
+
+import asyncio
+import json
+from neighborgrid.src.run_multi import COMMUNITY_HOMES
+from neighborgrid.src.live import LiveEngine, Subscriber, serve
+
+SSE_DELTA_KEYS = {'ts', 'homes', 'grid', 'community'}
+SSE_HOME_KEYS = {'id', 'pv', 'load', 'soc', 'share', 'recv', 'imp', 'exp', 'creditsDelta'}
+
+
+def test_step_produces_sse_delta():
+    """Test that each step advances the virtual clock and encodes a TypeScript-shaped delta"""
+    engine = LiveEngine(homes=COMMUNITY_HOMES[:3], start_date="2025-06-01", tick_seconds=0, timestep_minutes=15)
+    deltas = [json.loads(engine.step()) for _ in range(48)]
+    engine.close()
+    
+    assert set(deltas[0]) == SSE_DELTA_KEYS
+    assert set(deltas[0]['homes'][0]) == SSE_HOME_KEYS
+    assert [d['ts'] for d in deltas[:2]] == ['2025-06-01T00:00:00', '2025-06-01T00:15:00']
+    assert engine.state.steps_simulated == 48
+    assert deltas[0]['community']['prod'] == 0  # Midnight
+    assert deltas[-1]['ts'] == '2025-06-01T11:45:00'
+    assert deltas[-1]['community']['prod'] > 0
+
+
+def test_slow_subscriber_drops_oldest():
+    """Test that a full client queue drops its oldest ticks and history is bounded"""
+    engine = LiveEngine(homes=COMMUNITY_HOMES[:2], history_ticks=5, client_queue=3)
+    subscriber = engine.subscribe()
+    for i in range(10):
+        engine.publish(f'{{"n":{i}}}')
+    
+    queued = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+    assert queued == [b'id: 8\ndata: {"n":7}\n\n', b'id: 9\ndata: {"n":8}\n\n', b'id: 10\ndata: {"n":9}\n\n']
+    assert subscriber.dropped == 7
+    assert [tick_id for tick_id, _ in engine.history] == [6, 7, 8, 9, 10]
+    
+    # Reconnecting with Last-Event-ID replays what is still in the history
+    replay = engine.subscribe(last_event_id=8)
+    assert replay.queue.qsize() == 2
+    assert isinstance(replay, Subscriber)
+    engine.close()
+
+
+def test_server_streams_ticks():
+    """Test that concurrent SSE clients receive the same ticks and /state returns the latest"""
+    async def scenario():
+        engine = LiveEngine(homes=COMMUNITY_HOMES[:2], tick_seconds=0)
+        server = await serve(engine, port=0)
+        port = server.sockets[0].getsockname()[1]
+        
+        clients = []
+        for _ in range(3):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b"GET /stream HTTP/1.1\r\nHost: test\r\n\r\n")
+            await writer.drain()
+            clients.append((reader, writer))
+        for reader, _ in clients:
+            assert (await reader.readuntil(b"\r\n\r\n")).startswith(b"HTTP/1.1 200 OK")
+        
+        await engine.run(max_ticks=5)
+        events = [[await reader.readuntil(b"\n\n") for _ in range(5)] for reader, _ in clients]
+        
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /state HTTP/1.1\r\n\r\n")
+        state = (await reader.read()).split(b"\r\n\r\n", 1)[1]
+        
+        for _, client_writer in clients:
+            client_writer.close()
+        server.close()
+        await server.wait_closed()
+        engine.close()
+        return events, state
+    
+    events, state = asyncio.run(scenario())
+    assert events[0] == events[1] == events[2]
+    assert events[0][0].startswith(b"id: 1\ndata: ")
+    last = json.loads(events[0][-1].split(b"data: ", 1)[1])
+    assert json.loads(state) == last
+    assert last['ts'] == '2025-10-04T00:04:00'
@@ -0,0 +1,113 @@
+"""
+Test community pool matching
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single
+from neighborgrid.src.pool import match_pool_greedy, match_pool_pro_rata
+from neighborgrid.src.ledger import PoolLedger
+from neighborgrid.src.run_multi import COMMUNITY_HOMES, simulate_community, simulate_community_pool
+
+
+def _community_results(n_homes, hours):
+    results = []
+    for i in range(n_homes):
+        # Alternate large producers and near-empty consumers so the pool is used
+        solar_kw = 9.0 if i % 2 == 0 else 1.0
+        timeseries = make_single_home_timeseries(
+            start_date="2025-10-01",
+            hours=hours,
+            solar_kw=solar_kw,
+            load_pattern_shift=i % 4,
+        )
+        result = run_dispatch_single(
+            timeseries=timeseries,
+            battery_capacity_kwh=2.0 + i % 3,
+            solar_capacity_kw=solar_kw,
+            initial_soc=0.2,
+            pool_availability_kwh=[0] * hours,
+        )
+        result['home_id'] = f"H{i + 1:03d}"
+        results.append(result)
+    return results
+
+
+def test_greedy_matching_largest_first():
+    """Test that the largest producer serves the largest consumer first"""
+    net = np.array([[3.0, -1.0, 1.0, -2.5, 0.005]])
+    
+    to_pool, from_pool = match_pool_greedy(net)
+    
+    assert to_pool[0].tolist() == [3.0, 0.0, 0.5, 0.0, 0.0]
+    assert from_pool[0].tolist() == [0.0, 1.0, 0.0, 2.5, 0.0]
+
+
+def test_pro_rata_shares_by_deficit():
+    """Test that pro-rata matching splits the pool in proportion to surplus and deficit"""
+    net = np.array([[3.0, -1.0, 1.0, -2.5, 0.005], [1.0, -4.0, 0.0, -4.0, 0.0]])
+    
+    to_pool, from_pool = match_pool_pro_rata(net)
+    
+    assert np.allclose(to_pool, [[2.625, 0.0, 0.875, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0, 0.0]])
+    assert np.allclose(from_pool, [[0.0, 1.0, 0.0, 2.5, 0.0], [0.0, 0.5, 0.0, 0.5, 0.0]])
+    
+    # The ledger keeps one leg per home and step, and the pairs follow from them
+    ledger = PoolLedger()
+    ledger.append_pro_rata(ledger.step_offset(list("ABCDE"), "2025-10-01", 60, "pro_rata"), to_pool, from_pool)
+    assert len(ledger) == 7
+    hourly = list(ledger.period_pairs('h'))
+    assert [hour for hour, *_ in hourly] == list(pd.date_range("2025-10-01", periods=2, freq='h'))
+    pairs = [(p, c) for _, producer, consumer, _ in hourly for p, c in zip(producer.tolist(), consumer.tolist())]
+    assert pairs == [(0, 1), (0, 3), (2, 1), (2, 3), (0, 1), (0, 3)]
+    assert np.allclose(np.concatenate([kwh for *_, kwh in hourly]), [0.75, 1.875, 0.25, 0.625, 0.5, 0.5])
+
+
+def test_pro_rata_matches_greedy_totals():
+    """Test that pro-rata moves the same energy per hour as greedy, split differently"""
+    hours = 48
+    results = _community_results(10, hours)
+    greedy = simulate_community_pool(results, "2025-10-01", hours)
+    ledger = PoolLedger()
+    pro_rata = simulate_community_pool(results, "2025-10-01", hours, ledger=ledger, allocation="pro_rata")
+    
+    hourly = pro_rata.groupby('timestamp_hour')[['to_pool_kwh', 'from_pool_kwh']].sum()
+    assert np.allclose(hourly['to_pool_kwh'], hourly['from_pool_kwh'])
+    greedy_hourly = greedy.groupby('timestamp_hour')['from_pool_kwh'].sum()
+    assert np.allclose(hourly['from_pool_kwh'], greedy_hourly, atol=0.01)
+    assert np.allclose(pro_rata['grid_import_kwh'].sum(), greedy['grid_import_kwh'].sum(), atol=0.1)
+    
+    received = np.zeros((hours, 10))
+    legs = ledger.to_home >= 0  # Receiving legs
+    np.add.at(received, (ledger.step[legs], ledger.to_home[legs]), ledger.kwh[legs])
+    assert len(ledger) <= hours * 10
+    assert np.allclose(received.ravel(), pro_rata['from_pool_kwh'].to_numpy())
+    
+    with pytest.raises(ValueError):
+        simulate_community_pool(results, "2025-10-01", hours, allocation="first_come")
+
+
+@pytest.mark.parametrize("n_homes", [3, 10, 25])
+def test_pool_conserves_energy_any_community_size(n_homes):
+    """Test that pool sends equal pool receipts every hour for any number of homes"""
+    hours = 48
+    result = simulate_community_pool(_community_results(n_homes, hours), "2025-10-01", hours)
+    
+    assert len(result) == n_homes * hours
+    hourly = result.groupby('timestamp_hour')[['to_pool_kwh', 'from_pool_kwh']].sum()
+    assert np.allclose(hourly['to_pool_kwh'], hourly['from_pool_kwh'])
+    assert hourly['from_pool_kwh'].sum() > 0, "Some energy should be shared"
+    
+    for _, home in result.groupby('home_id'):
+        assert np.allclose(home['credits_balance_kwh'], home['credits_delta_kwh'].cumsum())
+
+
+def test_parallel_community_matches_serial():
+    """Test that worker processes give the same seeded result as a serial run"""
+    serial = simulate_community(COMMUNITY_HOMES, "2025-10-01", hours=48, seed=11, workers=1)
+    parallel = simulate_community(COMMUNITY_HOMES, "2025-10-01", hours=48, seed=11, workers=2)
+    
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial['home_id'].nunique() == len(COMMUNITY_HOMES)
@@ -0,0 +1,51 @@
+"""
+Test phase profiling instrumentation
+"""
+
+import pstats
+import time
+from neighborgrid.src.profiling import PhaseProfiler
+
+
+def test_phases_accumulate_time_and_memory(tmp_path):
+    """Test that repeated phases accumulate and the pstats file is written"""
+    pstats_path = tmp_path / "run.pstats"
+    
+    with PhaseProfiler(pstats_path=str(pstats_path)) as profiler:
+        for _ in range(3):
+            with profiler.phase("allocate"):
+                data = [0.0] * 200_000
+        with profiler.phase("idle"):
+            pass
+    
+    assert profiler.enabled
+    assert profiler.phases["allocate"]["calls"] == 3
+    assert profiler.phases["allocate"]["peak_mb"] > 1.0
+    assert profiler.phases["idle"]["wall_s"] >= 0.0
+    assert len(profiler.report_lines()) == 4
+    pstats.Stats(str(pstats_path))
+
+
+def test_nested_phases_count_once():
+    """Test that a nested phase is not added to the total twice and its peak counts for the outer phase"""
+    with PhaseProfiler(enabled=True) as profiler:
+        with profiler.phase("outer"):
+            with profiler.phase("inner"):
+                data = [0.0] * 200_000
+                del data
+            time.sleep(0.01)
+    
+    outer, inner = profiler.phases["outer"], profiler.phases["inner"]
+    assert outer["peak_mb"] >= inner["peak_mb"] > 1.0
+    total = float(profiler.report_lines()[-1].split()[-1])
+    assert abs(total - outer["wall_s"]) < 1e-3
+    assert profiler.report_lines()[2].startswith("    inner")
+
+
+def test_disabled_profiler_records_nothing():
+    """Test that a disabled profiler is a no-op"""
+    with PhaseProfiler() as profiler:
+        with profiler.phase("work"):
+            pass
+    
+    assert profiler.phases == {}
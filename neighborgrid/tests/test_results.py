@@ -0,0 +1,66 @@
+"""
+Test the compact dispatch result container
+"""
+
+import numpy as np
+import pandas as pd
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single, iter_dispatch_chunks
+from neighborgrid.src.results import DispatchResult, HOURLY_COLUMNS
+
+
+def _timeseries(hours=24 * 14):
+    return make_single_home_timeseries("2025-06-01", hours, solar_kw=6.0, seed=11)
+
+
+def test_result_matches_dataframe():
+    """Test that to_dataframe() on the result reproduces the default DataFrame output"""
+    timeseries = _timeseries()
+    df = run_dispatch_single(timeseries, 10.0, 6.0)
+    result = run_dispatch_single(timeseries, 10.0, 6.0, as_frame=False)
+    
+    assert isinstance(result, DispatchResult)
+    assert (result.n_homes, result.hours) == (1, len(timeseries))
+    pd.testing.assert_frame_equal(result.to_dataframe(), df)
+
+
+def test_result_is_unrounded_and_smaller():
+    """Test that results keep full precision and use less memory than the DataFrame"""
+    timeseries = _timeseries(24 * 90)
+    df = run_dispatch_single(timeseries, 10.0, 6.0)
+    result = run_dispatch_single(timeseries, 10.0, 6.0, as_frame=False)
+    
+    unrounded = result.to_dataframe(rounded=False)
+    assert np.allclose(unrounded['battery_flow_kwh'], df['battery_flow_kwh'], atol=5e-4)
+    assert not np.array_equal(unrounded['battery_soc_pct'], df['battery_soc_pct'])
+    assert result.nbytes < df.memory_usage(deep=True).sum()
+    
+    compact = result.astype(np.float32)
+    assert all(getattr(compact, column).dtype == np.float32 for column in HOURLY_COLUMNS)
+    assert compact.nbytes < result.nbytes
+
+
+def test_chunk_results_carry_state():
+    """Test that chunked results concatenate to the full-horizon output"""
+    timeseries = _timeseries()
+    full = run_dispatch_single(timeseries, 10.0, 6.0)
+    chunks = [timeseries.iloc[i:i + 50].reset_index(drop=True)
+              for i in range(0, len(timeseries), 50)]
+    
+    results = list(iter_dispatch_chunks(chunks, 10.0, 6.0, as_frame=False))
+    combined = pd.concat([result.to_dataframe() for result in results], ignore_index=True)
+    pd.testing.assert_frame_equal(combined, full)
+
+
+def test_string_timestamps_accepted():
+    """Test that string timestamps dispatch like datetimes, with rounding set by timestep_minutes"""
+    timeseries = make_single_home_timeseries("2025-06-01", 24, solar_kw=6.0, seed=11, timestep_minutes=15)
+    as_strings = timeseries.assign(timestamp_hour=timeseries['timestamp_hour'].astype(str))
+    
+    expected = run_dispatch_single(timeseries, 10.0, 6.0, timestep_minutes=15)
+    df = run_dispatch_single(as_strings, 10.0, 6.0, timestep_minutes=15)
+    
+    assert df['timestamp_hour'].tolist() == as_strings['timestamp_hour'].tolist()
+    pd.testing.assert_frame_equal(df.drop(columns='timestamp_hour'), expected.drop(columns='timestamp_hour'))
+    hourly = run_dispatch_single(as_strings.iloc[::4].reset_index(drop=True), 10.0, 6.0)
+    assert len(hourly) == 24
@@ -0,0 +1,90 @@
+"""
+Test the memory-mapped fleet store
+"""
+
+import pickle
+import pytest
+import numpy as np
+import pandas as pd
+from neighborgrid.src.simulator import make_community_timeseries
+from neighborgrid.src.dispatch import run_dispatch_batch, batch_to_dataframe
+from neighborgrid.src.pool import compute_net_available, match_pool_greedy
+from neighborgrid.src.store import (
+    FleetStore,
+    DISPATCH_CHANNELS,
+    dispatch_store,
+    match_store_pool,
+    read_store_result,
+)
+
+N_HOMES = 40
+HOURS = 96
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    rng = np.random.default_rng(8)
+    timestamps, pv, load = make_community_timeseries(
+        "2025-07-01", HOURS, solar_kw=rng.uniform(0.0, 9.0, N_HOMES), seed=8
+    )
+    home_ids = [f"H{i:03d}" for i in range(N_HOMES)]
+    capacity = rng.choice([0.0, 5.0, 10.0, 13.5], N_HOMES)
+    return home_ids, timestamps, pv, load, capacity
+
+
+@pytest.fixture
+def inputs(tmp_path, fleet):
+    home_ids, timestamps, pv, load, capacity = fleet
+    FleetStore.from_arrays(str(tmp_path / "inputs"), home_ids, timestamps[0], pv, load,
+                           solar_capacity_kw=6.0, battery_capacity_kwh=capacity)
+    return FleetStore(str(tmp_path / "inputs"))
+
+
+def test_store_round_trip(inputs, fleet):
+    """Test that a reopened store maps the same values and home index"""
+    home_ids, timestamps, pv, load, capacity = fleet
+    
+    assert isinstance(inputs.data, np.memmap)
+    assert len(inputs) == N_HOMES and inputs.hours == HOURS
+    assert inputs.timestamps.equals(timestamps)
+    assert np.array_equal(inputs.channel('pv_production_kwh'), pv)
+    assert np.array_equal(inputs.home('H007')[:, 1], load[7])
+    assert np.array_equal(inputs.battery_capacity_kwh, capacity)
+    with pytest.raises(KeyError):
+        inputs.row('H999')
+    
+    clone = pickle.loads(pickle.dumps(inputs))  # Workers reopen by path
+    assert clone.path == inputs.path and np.array_equal(clone.data, inputs.data)
+
+
+def test_dispatch_store_matches_batch(tmp_path, inputs, fleet):
+    """Test that block-wise store dispatch equals one in-memory batch"""
+    home_ids, timestamps, pv, load, capacity = fleet
+    outputs = dispatch_store(inputs, str(tmp_path / "out"), block_homes=7,
+                             pool_availability_kwh=0.0)
+    expected = run_dispatch_batch(pv, load, capacity, pool_availability_kwh=0.0)
+    
+    for channel in DISPATCH_CHANNELS:
+        assert np.array_equal(outputs.channel(channel), expected[channel])
+    
+    result = read_store_result(inputs, outputs, ['H003', 'H001'], pool_availability_kwh=0.0)
+    frame = batch_to_dataframe(
+        {key: values[[3, 1]] for key, values in expected.items()},
+        timestamps, ['H003', 'H001'], pv[[3, 1]], load[[3, 1]], capacity[[3, 1]], 6.0,
+        pool_availability_kwh=0.0,
+    )
+    pd.testing.assert_frame_equal(result.to_dataframe(), frame)
+
+
+def test_match_store_pool_blocks(tmp_path, inputs, fleet):
+    """Test that pool matching in hour blocks equals matching the whole horizon"""
+    home_ids, timestamps, pv, load, capacity = fleet
+    outputs = dispatch_store(inputs, str(tmp_path / "out"), pool_availability_kwh=0.0)
+    battery_flow = np.array(outputs.channel('battery_flow_kwh'))
+    match_store_pool(inputs, outputs, block_hours=25)
+    
+    net = compute_net_available(pv.T, load.T, battery_flow.T)
+    to_pool, from_pool = match_pool_greedy(net)
+    assert np.array_equal(outputs.channel('to_pool_kwh'), to_pool.T)
+    assert np.array_equal(outputs.channel('from_pool_kwh'), from_pool.T)
+    assert np.array_equal(outputs.channel('credits_balance_kwh'), np.cumsum(to_pool - from_pool, axis=0).T)
@@ -0,0 +1,48 @@
+"""
+Test battery and solar sizing sweeps
+"""
+
+import pytest
+from neighborgrid.src.simulator import make_single_home_timeseries
+from neighborgrid.src.dispatch import run_dispatch_single, compute_summary_stats
+from neighborgrid.src.sweep import run_sweep
+
+
+def test_sweep_matches_individual_runs():
+    """Test that each sweep row equals a separate run_single-style run"""
+    table = run_sweep(
+        start_date="2025-10-04",
+        hours=24 * 7,
+        solar_kw_values=[4.0, 8.0],
+        battery_kwh_values=[5.0, 13.5],
+        initial_soc_values=[0.2, 0.9],
+        seed=9,
+        batch_size=3,
+    )
+    
+    assert len(table) == 8
+    for _, row in table.iterrows():
+        timeseries = make_single_home_timeseries(
+            start_date="2025-10-04",
+            hours=24 * 7,
+            solar_kw=row['solar_kw'],
+            seed=9,
+        )
+        result = run_dispatch_single(timeseries, row['battery_kwh'], row['solar_kw'], row['initial_soc'])
+        for key, value in compute_summary_stats(result).items():
+            assert row[key] == pytest.approx(value, abs=1e-9), key
+
+
+def test_sweep_larger_battery_reduces_grid_import():
+    """Test that grid import does not grow with battery size"""
+    table = run_sweep(
+        start_date="2025-10-04",
+        hours=48,
+        solar_kw_values=[6.0],
+        battery_kwh_values=[0.0, 5.0, 10.0, 20.0],
+        pool_availability_kwh=[0.0] * 48,
+        seed=1,
+    )
+    
+    grid_import = table.sort_values('battery_kwh')['total_grid_import_kwh'].tolist()
+    assert grid_import == sorted(grid_import, reverse=True)
@@ -3,7 +3,13 @@ Test synthetic timeseries generation
 """
 
 import pytest
-from neighborgrid.src.simulator import make_single_home_timeseries, make_pool_availability
+import numpy as np
+from neighborgrid.src.simulator import (
+    make_single_home_timeseries,
+    make_community_timeseries,
+    make_pool_availability,
+    n_steps,
+)
 
 
 def test_timeseries_basic_shape():
@@ -84,3 +90,60 @@ def test_different_solar_capacities():
     
     assert total_large > total_small, "Larger solar capacity should produce more"
 
+
+def test_community_timeseries_shape():
+    """Test that community generation returns one row per home"""
+    timestamps, pv, load = make_community_timeseries(
+        start_date="2025-10-04",
+        hours=48,
+        solar_kw=[3.0, 6.0, 9.0],
+        load_pattern_shift=[0, 2, 3],
+        seed=1,
+    )
+    
+    assert len(timestamps) == 48
+    assert pv.shape == (3, 48)
+    assert load.shape == (3, 48)
+    assert (pv[:, :6] == 0.0).all(), "No solar before 6 AM"
+    assert (load > 0).all()
+
+
+def test_seeded_generation_is_reproducible():
+    """Test that a seed gives identical data and each home has its own stream"""
+    _, _, load_a = make_community_timeseries("2025-10-04", 72, [5.0, 6.0], seed=42)
+    _, _, load_b = make_community_timeseries("2025-10-04", 72, [5.0, 6.0, 7.0], seed=42)
+    _, _, load_c = make_community_timeseries("2025-10-04", 72, [5.0, 6.0], seed=43)
+    
+    np.testing.assert_array_equal(load_a, load_b[:2])
+    assert not np.array_equal(load_a, load_c)
+    
+    single_a = make_single_home_timeseries("2025-10-04", 24, 6.0, seed=7)
+    single_b = make_single_home_timeseries("2025-10-04", 24, 6.0, seed=7)
+    assert single_a.equals(single_b)
+    assert make_pool_availability(24, seed=7) == make_pool_availability(24, seed=7)
+
+
+@pytest.mark.parametrize("timestep_minutes", [15, 5, 1])
+def test_sub_hourly_timestep(timestep_minutes):
+    """Test that sub-hourly series have one row per step and the hourly energy totals"""
+    hours = 48
+    steps_per_hour = 60 // timestep_minutes
+    timestamps, pv, load = make_community_timeseries(
+        "2025-06-01", hours, solar_kw=[6.0, 3.0], seed=9, timestep_minutes=timestep_minutes,
+    )
+    _, hourly_pv, hourly_load = make_community_timeseries("2025-06-01", hours, solar_kw=[6.0, 3.0], seed=9)
+    
+    assert pv.shape == load.shape == (2, hours * steps_per_hour)
+    assert len(timestamps) == n_steps(hours, timestep_minutes)
+    assert (timestamps[1] - timestamps[0]).total_seconds() == timestep_minutes * 60
+    
+    # Each hour's steps add up to roughly the hourly value
+    assert np.allclose(load.reshape(2, hours, steps_per_hour).sum(axis=2), hourly_load, atol=0.15)
+    assert abs(pv.sum() - hourly_pv.sum()) / hourly_pv.sum() < 0.05
+    assert len(make_pool_availability(hours, seed=1, timestep_minutes=timestep_minutes)) == pv.shape[1]
+
+
+def test_invalid_timestep():
+    """Test that timesteps must divide a day evenly"""
+    with pytest.raises(ValueError):
+        make_community_timeseries("2025-06-01", 24, solar_kw=6.0, timestep_minutes=7)
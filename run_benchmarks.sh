@@ -0,0 +1,6 @@
+#!/bin/bash
+# Helper script to run engine benchmarks with correct PYTHONPATH
+
+cd "$(dirname "$0")"
+export PYTHONPATH="$(pwd)"
+python3 -m neighborgrid.benchmarks.run_benchmarks "$@"
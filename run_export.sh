@@ -0,0 +1,6 @@
+#!/bin/bash
+# Helper script to load results into the database with correct PYTHONPATH
+
+cd "$(dirname "$0")"
+export PYTHONPATH="$(pwd)"
+python3 -m neighborgrid.src.run_export "$@"
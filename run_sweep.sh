@@ -0,0 +1,6 @@
+#!/bin/bash
+# Helper script to run sizing sweeps with correct PYTHONPATH
+
+cd "$(dirname "$0")"
+export PYTHONPATH="$(pwd)"
+python3 -m neighborgrid.src.run_sweep "$@"